@@ -0,0 +1,175 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.query_builder import Criterion
+from frappe.query_builder.functions import IfNull
+from frappe.utils import cint, flt, getdate, now
+from frappe.utils.background_jobs import enqueue, is_job_enqueued
+
+BALANCE_KEY_FIELDS = ("company", "account", "posting_date", "party_type", "party", "cost_center")
+BALANCE_FIELDS = ("debit", "credit", "debit_in_account_currency", "credit_in_account_currency")
+
+
+class AccountDailyBalance(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		account: DF.Link | None
+		account_currency: DF.Link | None
+		company: DF.Link | None
+		cost_center: DF.Link | None
+		credit: DF.Currency
+		credit_in_account_currency: DF.Currency
+		debit: DF.Currency
+		debit_in_account_currency: DF.Currency
+		party: DF.DynamicLink | None
+		party_type: DF.Link | None
+		posting_date: DF.Date | None
+	# end: auto-generated types
+
+	pass
+
+
+def is_account_daily_balance_enabled() -> bool:
+	return cint(frappe.db.get_single_value("Accounts Settings", "maintain_account_daily_balances"))
+
+
+def use_account_daily_balances() -> bool:
+	"""Balances can be read from Account Daily Balance once it is built for the existing GL Entries."""
+	return is_account_daily_balance_enabled() and cint(
+		frappe.db.get_single_value("Accounts Settings", "account_daily_balances_ready")
+	)
+
+
+def update_account_daily_balances(gl_entries, cancel=False):
+	"""Add the amounts of GL Entries to their daily balances, or remove them if the entries are cancelled."""
+	if not gl_entries or not is_account_daily_balance_enabled():
+		return
+
+	from erpnext.accounts.utils import get_currency_precision
+
+	precision = get_currency_precision()
+	sign = -1 if cancel else 1
+
+	balances = {}
+	for gle in gl_entries:
+		if cint(gle.get("is_cancelled")) and not cancel:
+			continue
+
+		key = tuple(
+			getdate(gle.get(field)) if field == "posting_date" else gle.get(field) or None
+			for field in BALANCE_KEY_FIELDS
+		)
+		row = balances.setdefault(
+			key,
+			frappe._dict(
+				{"account_currency": gle.get("account_currency"), **dict.fromkeys(BALANCE_FIELDS, 0.0)}
+			),
+		)
+		for field in BALANCE_FIELDS:
+			row[field] += sign * flt(gle.get(field), precision)
+
+	for key, amounts in balances.items():
+		update_account_daily_balance(frappe._dict(zip(BALANCE_KEY_FIELDS, key, strict=True)), amounts)
+
+
+def update_account_daily_balance(balance_key, amounts):
+	adb = frappe.qb.DocType("Account Daily Balance")
+
+	conditions = [
+		adb.company == balance_key.company,
+		adb.account == balance_key.account,
+		adb.posting_date == balance_key.posting_date,
+	]
+	for field in ("party_type", "party", "cost_center"):
+		conditions.append(IfNull(adb[field], "") == (balance_key[field] or ""))
+
+	existing = (
+		frappe.qb.from_(adb).select(adb.name).where(Criterion.all(conditions)).limit(1).for_update()
+	).run()
+
+	if existing:
+		query = frappe.qb.update(adb).where(adb.name == existing[0][0])
+		for field in BALANCE_FIELDS:
+			query = query.set(adb[field], adb[field] + amounts[field])
+		query.run()
+	else:
+		doc = frappe.new_doc("Account Daily Balance")
+		doc.update(balance_key)
+		doc.update(amounts)
+		doc.db_insert()
+
+
+def enqueue_rebuild_account_daily_balances():
+	job_id = "rebuild_account_daily_balances"
+	if not is_job_enqueued(job_id):
+		enqueue(
+			rebuild_account_daily_balances,
+			queue="long",
+			timeout=4 * 60 * 60,
+			job_id=job_id,
+			now=frappe.flags.in_test,
+		)
+
+
+def rebuild_account_daily_balances():
+	"""Build daily balances of all ledger accounts from their GL Entries."""
+	from erpnext.accounts.utils import get_currency_precision
+
+	frappe.db.set_single_value("Accounts Settings", "account_daily_balances_ready", 0)
+	if not frappe.flags.in_test:
+		frappe.db.commit()
+
+	precision = get_currency_precision()
+	for account in frappe.get_all("Account", filters={"is_group": 0}, pluck="name"):
+		if not is_account_daily_balance_enabled():
+			return
+
+		rebuild_account_daily_balance(account, precision)
+		if not frappe.flags.in_test:
+			frappe.db.commit()
+
+	frappe.db.set_single_value("Accounts Settings", "account_daily_balances_ready", 1)
+
+
+def rebuild_account_daily_balance(account, precision):
+	"""Rebuild the daily balances of an account in one transaction. The GL Entries are read with a
+	locking read, which waits for postings to the account in progress and holds off new ones until
+	the balances are replaced."""
+	balances = frappe.db.sql(
+		"""
+		SELECT company, account, posting_date, party_type, party, cost_center,
+			max(account_currency),
+			sum(round(debit, %(precision)s)), sum(round(credit, %(precision)s)),
+			sum(round(debit_in_account_currency, %(precision)s)),
+			sum(round(credit_in_account_currency, %(precision)s))
+		FROM `tabGL Entry`
+		WHERE account = %(account)s and is_cancelled = 0
+		GROUP BY company, account, posting_date, party_type, party, cost_center
+		FOR UPDATE""",
+		{"account": account, "precision": precision},
+	)
+
+	frappe.db.delete("Account Daily Balance", {"account": account})
+	if not balances:
+		return
+
+	fields = ["name", "creation", "modified", "owner", "modified_by", *BALANCE_KEY_FIELDS]
+	fields += ["account_currency", *BALANCE_FIELDS]
+
+	user = frappe.session.user
+	timestamp = now()
+	values = [(frappe.generate_hash(), timestamp, timestamp, user, user, *row) for row in balances]
+	frappe.db.bulk_insert("Account Daily Balance", fields=fields, values=values)
+
+
+def on_doctype_update():
+	frappe.db.add_index("Account Daily Balance", ["account", "posting_date"])
+	frappe.db.add_index("Account Daily Balance", ["party_type", "party", "posting_date"])
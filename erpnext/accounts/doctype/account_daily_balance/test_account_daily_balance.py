@@ -0,0 +1,96 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests import IntegrationTestCase, UnitTestCase
+
+from erpnext.accounts.doctype.account_daily_balance.account_daily_balance import (
+	rebuild_account_daily_balances,
+)
+from erpnext.accounts.doctype.journal_entry.test_journal_entry import make_journal_entry
+from erpnext.accounts.doctype.purchase_invoice.test_purchase_invoice import (
+	setup_provisional_accounting,
+	toggle_provisional_accounting_setting,
+)
+from erpnext.accounts.utils import get_balance_on
+from erpnext.stock.doctype.purchase_receipt.purchase_receipt import make_purchase_invoice
+from erpnext.stock.doctype.purchase_receipt.test_purchase_receipt import make_purchase_receipt
+
+# On IntegrationTestCase, the doctype test records and all
+# link-field test record depdendencies are recursively loaded
+# Use these module variables to add/remove to/from that list
+EXTRA_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
+IGNORE_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
+
+
+class UnitTestAccountDailyBalance(UnitTestCase):
+	"""
+	Unit tests for AccountDailyBalance.
+	Use this class for testing individual functions and methods.
+	"""
+
+	pass
+
+
+class IntegrationTestAccountDailyBalance(IntegrationTestCase):
+	"""
+	Integration tests for AccountDailyBalance.
+	Use this class for testing interactions between multiple components.
+	"""
+
+	def assertBalancesMatchLedger(self, **kwargs):
+		balance = get_balance_on(**kwargs)
+		with patch("erpnext.accounts.utils.use_account_daily_balances", return_value=False):
+			self.assertEqual(balance, get_balance_on(**kwargs))
+
+	def test_balance_from_daily_balances(self):
+		with self.change_settings("Accounts Settings", {"maintain_account_daily_balances": 1}):
+			self.assertTrue(frappe.db.get_single_value("Accounts Settings", "account_daily_balances_ready"))
+
+			entries = [
+				make_journal_entry("_Test Bank - _TC", "_Test Cash - _TC", amount, submit=True)
+				for amount in (100, 250.5)
+			]
+			backdated = make_journal_entry(
+				"_Test Cash - _TC", "_Test Bank - _TC", 40, posting_date="2024-01-01", submit=True
+			)
+
+			for account in ("_Test Bank - _TC", "_Test Cash - _TC"):
+				self.assertBalancesMatchLedger(account=account)
+				self.assertBalancesMatchLedger(account=account, date="2024-01-01")
+
+			entries[0].cancel()
+			backdated.cancel()
+			self.assertBalancesMatchLedger(account="_Test Bank - _TC")
+			self.assertBalancesMatchLedger(account="_Test Bank - _TC", date="2024-01-01")
+
+	def test_cancel_provisional_entries(self):
+		with self.change_settings("Accounts Settings", {"maintain_account_daily_balances": 1}):
+			setup_provisional_accounting()
+
+			pr = make_purchase_receipt(item_code="_Test Non Stock Item")
+			pi = make_purchase_invoice(pr.name)
+			pi.items[0].expense_account = "Cost of Goods Sold - _TC"
+			pi.submit()
+			pi.cancel()
+
+			for account in ("Provision Account - _TC", "_Test Account Cost for Goods Sold - _TC"):
+				self.assertBalancesMatchLedger(account=account)
+
+			toggle_provisional_accounting_setting()
+
+	def test_rebuild_daily_balances(self):
+		with self.change_settings("Accounts Settings", {"maintain_account_daily_balances": 1}):
+			make_journal_entry("_Test Bank - _TC", "_Test Cash - _TC", 75, submit=True)
+			make_journal_entry(
+				"_Test Cash - _TC", "_Test Bank - _TC", 20, posting_date="2024-01-01", submit=True
+			)
+
+			rebuild_account_daily_balances()
+			self.assertTrue(frappe.db.get_single_value("Accounts Settings", "account_daily_balances_ready"))
+
+			for account in ("_Test Bank - _TC", "_Test Cash - _TC"):
+				self.assertBalancesMatchLedger(account=account)
+				self.assertBalancesMatchLedger(account=account, date="2024-01-01")
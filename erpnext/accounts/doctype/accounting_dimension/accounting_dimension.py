@@ -12,6 +12,9 @@ from frappe.model import core_doctypes_list
 from frappe.model.document import Document
 from frappe.utils import cstr
 
+from erpnext.accounts.doctype.accounting_dimension_filter.accounting_dimension_filter import (
+	clear_dimension_filter_cache,
+)
 from erpnext.accounts.doctype.repost_accounting_ledger.repost_accounting_ledger import (
 	get_allowed_types_from_settings,
 )
@@ -88,6 +91,7 @@ class AccountingDimension(Document):
 			)
 
 	def on_trash(self):
+		clear_dimension_filter_cache()
 		if frappe.flags.in_test:
 			delete_accounting_dimension(doc=self)
 		else:
@@ -102,6 +106,7 @@ class AccountingDimension(Document):
 
 	def on_update(self):
 		frappe.flags.accounting_dimensions = None
+		clear_dimension_filter_cache()
 
 
 def make_dimension_in_accounting_doctypes(doc, doclist=None):
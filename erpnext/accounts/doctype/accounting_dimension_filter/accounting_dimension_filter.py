@@ -6,6 +6,8 @@ import frappe
 from frappe import _, scrub
 from frappe.model.document import Document
 
+from erpnext.exceptions import InvalidAccountDimensionError, MandatoryAccountDimensionError
+
 
 class AccountingDimensionFilter(Document):
 	# begin: auto-generated types
@@ -39,6 +41,12 @@ class AccountingDimensionFilter(Document):
 	def validate(self):
 		self.validate_applicable_accounts()
 
+	def on_update(self):
+		clear_dimension_filter_cache()
+
+	def on_trash(self):
+		clear_dimension_filter_cache()
+
 	def validate_applicable_accounts(self):
 		accounts = frappe.db.sql(
 			"""
@@ -65,6 +73,93 @@ class AccountingDimensionFilter(Document):
 				)
 
 
+def get_account_dimension_filters(company):
+	"""
+	Dimension filters of the accounts of a company, compiled once and cached:
+	`{account: [(dimension, is_mandatory, allow_or_restrict, dimension values)]}`
+	"""
+	account_filters = frappe.cache().hget("account_dimension_filters", company)
+	if account_filters is None:
+		filters = frappe.db.sql(
+			"""
+			SELECT
+				a.applicable_on_account, d.dimension_value, p.accounting_dimension,
+				p.allow_or_restrict, a.is_mandatory
+			FROM
+				`tabApplicable On Account` a,
+				`tabAccounting Dimension Filter` p
+			LEFT JOIN `tabAllowed Dimension` d ON d.parent = p.name
+			WHERE
+				p.name = a.parent
+				AND p.disabled = 0
+				AND p.company = %s
+		""",
+			company,
+			as_dict=1,
+		)
+
+		dimension_filter_map = {}
+		for f in filters:
+			build_map(
+				dimension_filter_map,
+				scrub(f.accounting_dimension),
+				f.applicable_on_account,
+				f.dimension_value,
+				f.allow_or_restrict,
+				f.is_mandatory,
+			)
+
+		account_filters = {}
+		for (dimension, account), value in dimension_filter_map.items():
+			account_filters.setdefault(account, []).append(
+				(
+					dimension,
+					value["is_mandatory"],
+					value["allow_or_restrict"],
+					frozenset(value["allowed_dimensions"]),
+				)
+			)
+
+		frappe.cache().hset("account_dimension_filters", company, account_filters)
+
+	return account_filters
+
+
+def validate_dimension_filters(doc, account_filters):
+	"""Validate the accounting dimensions of a ledger entry against the filters of its account."""
+	for dimension, is_mandatory, allow_or_restrict, dimension_values in account_filters.get(doc.account, ()):
+		value = doc.get(dimension)
+		if is_mandatory and not value:
+			frappe.throw(
+				_("{0} is mandatory for account {1}").format(
+					frappe.bold(frappe.unscrub(dimension)), frappe.bold(doc.account)
+				),
+				MandatoryAccountDimensionError,
+			)
+
+		if value and (value in dimension_values) != (allow_or_restrict == "Allow"):
+			frappe.throw(
+				_("Invalid value {0} for {1} against account {2}").format(
+					frappe.bold(value),
+					frappe.bold(frappe.unscrub(dimension)),
+					frappe.bold(doc.account),
+				),
+				InvalidAccountDimensionError,
+			)
+
+
+def clear_dimension_filter_cache():
+	"""Clear the cached dimension filters, now and when the transaction ends."""
+	reset_dimension_filter_cache()
+	frappe.db.after_commit.add(reset_dimension_filter_cache)
+	frappe.db.after_rollback.add(reset_dimension_filter_cache)
+
+
+def reset_dimension_filter_cache():
+	frappe.cache().delete_value(["account_dimension_filters", "accounting_dimensions_for_offsetting"])
+	frappe.flags.dimension_filter_map = None
+
+
 def get_dimension_filter_map():
 	if not frappe.flags.get("dimension_filter_map"):
 		filters = frappe.db.sql(
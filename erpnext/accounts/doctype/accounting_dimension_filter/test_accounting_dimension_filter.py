@@ -9,6 +9,9 @@ from erpnext.accounts.doctype.accounting_dimension.test_accounting_dimension imp
 	create_dimension,
 	disable_dimension,
 )
+from erpnext.accounts.doctype.accounting_dimension_filter.accounting_dimension_filter import (
+	get_account_dimension_filters,
+)
 from erpnext.accounts.doctype.sales_invoice.test_sales_invoice import create_sales_invoice
 from erpnext.exceptions import InvalidAccountDimensionError, MandatoryAccountDimensionError
 
@@ -44,6 +47,13 @@ class TestAccountingDimensionFilter(unittest.TestCase):
 		self.assertRaises(MandatoryAccountDimensionError, si.submit)
 		self.invoice_list.append(si)
 
+	def test_dimension_filters_cache(self):
+		account_filters = get_account_dimension_filters("_Test Company")
+		self.assertEqual({d[0] for d in account_filters.get("Sales - _TC")}, {"cost_center", "department"})
+
+		disable_dimension_filter()
+		self.assertFalse(get_account_dimension_filters("_Test Company").get("Sales - _TC"))
+
 	def tearDown(self):
 		disable_dimension_filter()
 		disable_dimension()
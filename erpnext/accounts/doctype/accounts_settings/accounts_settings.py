@@ -23,6 +23,7 @@ class AccountsSettings(Document):
 		from frappe.types import DF
 
 		acc_frozen_upto: DF.Date | None
+		account_daily_balances_ready: DF.Check
 		add_taxes_from_item_tax_template: DF.Check
 		allow_multi_currency_invoices_against_single_party_account: DF.Check
 		allow_stale: DF.Check
@@ -46,10 +47,14 @@ class AccountsSettings(Document):
 		frozen_accounts_modifier: DF.Link | None
 		general_ledger_remarks_length: DF.Int
 		ignore_account_closing_balance: DF.Check
+		maintain_account_daily_balances: DF.Check
+		maintain_payment_ledger_outstanding: DF.Check
 		make_payment_via_journal_entry: DF.Check
 		merge_similar_account_heads: DF.Check
 		over_billing_allowance: DF.Currency
+		payment_ledger_outstanding_ready: DF.Check
 		post_change_gl_entries: DF.Check
+		process_receivable_payable_party_wise: DF.Check
 		receivable_payable_remarks_length: DF.Int
 		role_allowed_to_over_bill: DF.Link | None
 		round_row_wise_tax: DF.Check
@@ -90,6 +95,36 @@ class AccountsSettings(Document):
 		if clear_cache:
 			frappe.clear_cache()
 
+	def on_update(self):
+		self.toggle_account_daily_balances()
+		self.toggle_payment_ledger_outstanding()
+
+	def toggle_account_daily_balances(self):
+		if not self.has_value_changed("maintain_account_daily_balances"):
+			return
+
+		if self.maintain_account_daily_balances:
+			from erpnext.accounts.doctype.account_daily_balance.account_daily_balance import (
+				enqueue_rebuild_account_daily_balances,
+			)
+
+			enqueue_rebuild_account_daily_balances()
+		else:
+			self.db_set("account_daily_balances_ready", 0)
+
+	def toggle_payment_ledger_outstanding(self):
+		if not self.has_value_changed("maintain_payment_ledger_outstanding"):
+			return
+
+		if self.maintain_payment_ledger_outstanding:
+			from erpnext.accounts.doctype.payment_ledger_outstanding.payment_ledger_outstanding import (
+				enqueue_rebuild_payment_ledger_outstanding,
+			)
+
+			enqueue_rebuild_payment_ledger_outstanding()
+		else:
+			self.db_set("payment_ledger_outstanding_ready", 0)
+
 	def validate_stale_days(self):
 		if not self.allow_stale and cint(self.stale_days) <= 0:
 			frappe.msgprint(
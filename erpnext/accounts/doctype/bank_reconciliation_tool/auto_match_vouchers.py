@@ -0,0 +1,207 @@
+import frappe
+from frappe.utils import cint, cstr, flt
+
+from erpnext.accounts.doctype.bank_transaction.bank_transaction import get_total_allocated_amount
+
+
+class AutoMatchVouchers:
+	"""
+	Matches Bank Transactions of a Bank Account to Payment Entries and Journal Entries by reference number,
+	the same way `get_linked_payments` does during auto reconciliation.
+
+	Uncleared vouchers of the bank account in the date window are loaded once and indexed by reference
+	number, so matching a transaction does not query the database.
+	"""
+
+	def __init__(self, **kwargs) -> None:
+		self.__dict__.update(kwargs)
+		self.gl_account = frappe.db.get_value("Bank Account", self.bank_account, "account")
+		self.vouchers_by_reference = {}
+		self.allocated_amounts = {}
+
+		reference_numbers = list(
+			{t.reference_number for t in self.bank_transactions if t.reference_number is not None}
+		)
+		if reference_numbers:
+			self.load_vouchers(reference_numbers)
+
+	def get(self, key):
+		return self.__dict__.get(key, None)
+
+	def load_vouchers(self, reference_numbers):
+		vouchers = self.get_payment_entries(reference_numbers) + self.get_journal_entries(reference_numbers)
+		for voucher in vouchers:
+			self.vouchers_by_reference.setdefault(get_reference_key(voucher.reference_no), []).append(voucher)
+
+		self.allocated_amounts = get_total_allocated_amount([(v.doctype, v.name) for v in vouchers])
+
+	def get_payment_entries(self, reference_numbers):
+		pe = frappe.qb.DocType("Payment Entry")
+
+		filter_by_date = pe.posting_date.between(self.from_date, self.to_date)
+		if cint(self.filter_by_reference_date):
+			filter_by_date = pe.reference_date.between(self.from_reference_date, self.to_reference_date)
+
+		query = (
+			frappe.qb.from_(pe)
+			.select(
+				pe.name,
+				pe.payment_type,
+				pe.paid_from,
+				pe.paid_to,
+				pe.paid_amount,
+				pe.base_paid_amount_after_tax,
+				pe.reference_no,
+				pe.reference_date,
+				pe.party,
+				pe.party_type,
+				pe.posting_date,
+				pe.paid_from_account_currency,
+				pe.paid_to_account_currency,
+			)
+			.where(pe.docstatus == 1)
+			.where(pe.payment_type.isin(["Receive", "Pay", "Internal Transfer"]))
+			.where(pe.clearance_date.isnull())
+			.where((pe.paid_to == self.gl_account) | (pe.paid_from == self.gl_account))
+			.where(pe.paid_amount > 0.0)
+			.where(pe.reference_no.isin(reference_numbers))
+			.where(filter_by_date)
+			.orderby(pe.reference_date if cint(self.filter_by_reference_date) else pe.posting_date)
+		)
+
+		return [frappe._dict(row, doctype="Payment Entry") for row in query.run(as_dict=True)]
+
+	def get_journal_entries(self, reference_numbers):
+		je = frappe.qb.DocType("Journal Entry")
+		jea = frappe.qb.DocType("Journal Entry Account")
+
+		filter_by_date = je.posting_date.between(self.from_date, self.to_date)
+		if cint(self.filter_by_reference_date):
+			filter_by_date = je.cheque_date.between(self.from_reference_date, self.to_reference_date)
+
+		query = (
+			frappe.qb.from_(jea)
+			.join(je)
+			.on(jea.parent == je.name)
+			.select(
+				je.name,
+				jea.debit_in_account_currency,
+				jea.credit_in_account_currency,
+				je.cheque_no.as_("reference_no"),
+				je.cheque_date.as_("reference_date"),
+				je.pay_to_recd_from.as_("party"),
+				jea.party_type,
+				je.posting_date,
+				jea.account_currency.as_("currency"),
+			)
+			.where(je.docstatus == 1)
+			.where(je.voucher_type != "Opening Entry")
+			.where(je.clearance_date.isnull())
+			.where(jea.account == self.gl_account)
+			.where(je.cheque_no.isin(reference_numbers))
+			.where(filter_by_date)
+			.orderby(je.cheque_date if cint(self.filter_by_reference_date) else je.posting_date)
+		)
+
+		return [frappe._dict(row, doctype="Journal Entry") for row in query.run(as_dict=True)]
+
+	def match(self, transaction) -> list:
+		"""Matching vouchers for the transaction, best ranked first, less the amounts allocated already."""
+		if transaction.reference_number is None:
+			return []
+
+		vouchers = self.vouchers_by_reference.get(get_reference_key(transaction.reference_number)) or []
+		matching_vouchers = [
+			voucher
+			for voucher in (self.get_matching_voucher(voucher, transaction) for voucher in vouchers)
+			if voucher
+		]
+
+		# vouchers are indexed with payment entries before journal entries, as with the matching queries
+		matching_vouchers.sort(key=lambda x: x["rank"], reverse=True)
+
+		for voucher in matching_vouchers:
+			rows = self.allocated_amounts.get((voucher.doctype, voucher.name)) or []
+			filtered_row = [row for row in rows if row.get("gl_account") == self.gl_account]
+			if amount := None if not filtered_row else filtered_row[0]["total"]:
+				voucher["paid_amount"] -= amount
+
+		return matching_vouchers
+
+	def get_matching_voucher(self, voucher, transaction):
+		is_deposit = transaction.deposit > 0.0
+		amount_rank = 0
+		party_rank = 0
+
+		if voucher.doctype == "Payment Entry":
+			account = voucher.paid_to if is_deposit else voucher.paid_from
+			payment_type = "Receive" if is_deposit else "Pay"
+			if account != self.gl_account or voucher.payment_type not in (payment_type, "Internal Transfer"):
+				return
+
+			amount_rank = cint(voucher.paid_amount == transaction.unallocated_amount)
+			party_rank = cint(
+				bool(voucher.party)
+				and voucher.party_type == transaction.party_type
+				and voucher.party == transaction.party
+			)
+			paid_amount = voucher.base_paid_amount_after_tax
+			currency = voucher.paid_to_account_currency if is_deposit else voucher.paid_from_account_currency
+		else:
+			amount = (
+				voucher.credit_in_account_currency if not is_deposit else voucher.debit_in_account_currency
+			)
+			if not flt(amount) > 0.0:
+				return
+
+			amount_rank = cint(amount == transaction.unallocated_amount)
+			paid_amount = amount
+			currency = voucher.currency
+
+		return frappe._dict(
+			{
+				# reference number always matches here
+				"rank": 1 + amount_rank + party_rank + 1,
+				"doctype": voucher.doctype,
+				"name": voucher.name,
+				"paid_amount": paid_amount,
+				"reference_no": voucher.reference_no,
+				"reference_date": voucher.reference_date,
+				"party": voucher.party,
+				"party_type": voucher.party_type,
+				"posting_date": voucher.posting_date,
+				"currency": currency,
+			}
+		)
+
+	def update(self, vouchers):
+		"""Refresh allocated amounts of the vouchers after reconciling them, and drop the cleared ones."""
+		docs = [(voucher.get("doctype"), voucher.get("name")) for voucher in vouchers]
+		if not docs:
+			return
+
+		self.allocated_amounts.update(get_total_allocated_amount(docs))
+
+		cleared = set()
+		for doctype in ("Payment Entry", "Journal Entry"):
+			names = [name for dt, name in docs if dt == doctype]
+			if names:
+				cleared.update(
+					(doctype, name)
+					for name in frappe.get_all(
+						doctype,
+						filters={"name": ("in", names), "clearance_date": ("is", "set")},
+						pluck="name",
+					)
+				)
+
+		if cleared:
+			for key in {get_reference_key(voucher.get("reference_no")) for voucher in vouchers}:
+				self.vouchers_by_reference[key] = [
+					v for v in self.vouchers_by_reference.get(key, []) if (v.doctype, v.name) not in cleared
+				]
+
+
+def get_reference_key(reference_number):
+	# reference numbers are compared by the database ignoring case and trailing spaces
+	return cstr(reference_number).rstrip().lower()
@@ -11,6 +11,7 @@ from frappe.query_builder.custom import ConstantColumn
 from frappe.utils import cint, flt
 
 from erpnext import get_default_cost_center
+from erpnext.accounts.doctype.bank_reconciliation_tool.auto_match_vouchers import AutoMatchVouchers
 from erpnext.accounts.doctype.bank_transaction.bank_transaction import get_total_allocated_amount
 from erpnext.accounts.party import get_party_account
 from erpnext.accounts.report.bank_reconciliation_statement.bank_reconciliation_statement import (
@@ -374,17 +375,36 @@ def auto_reconcile_vouchers(
 	reconciled, partially_reconciled = set(), set()
 
 	bank_transactions = get_bank_transactions(bank_account)
-	for transaction in bank_transactions:
-		linked_payments = get_linked_payments(
-			transaction.name,
-			["payment_entry", "journal_entry"],
-			from_date,
-			to_date,
-			filter_by_reference_date,
-			from_reference_date,
-			to_reference_date,
+
+	# vouchers are loaded once for all transactions, unless other apps add their own matching queries
+	matcher = None
+	if frappe.get_hooks("get_matching_queries") == [
+		"erpnext.accounts.doctype.bank_reconciliation_tool.bank_reconciliation_tool.get_matching_queries"
+	]:
+		matcher = AutoMatchVouchers(
+			bank_account=bank_account,
+			bank_transactions=bank_transactions,
+			from_date=from_date,
+			to_date=to_date,
+			filter_by_reference_date=filter_by_reference_date,
+			from_reference_date=from_reference_date,
+			to_reference_date=to_reference_date,
 		)
 
+	for transaction in bank_transactions:
+		if matcher:
+			linked_payments = matcher.match(transaction)
+		else:
+			linked_payments = get_linked_payments(
+				transaction.name,
+				["payment_entry", "journal_entry"],
+				from_date,
+				to_date,
+				filter_by_reference_date,
+				from_reference_date,
+				to_reference_date,
+			)
+
 		if not linked_payments:
 			continue
 
@@ -400,6 +420,8 @@ def auto_reconcile_vouchers(
 		)
 
 		updated_transaction = reconcile_vouchers(transaction.name, json.dumps(vouchers))
+		if matcher:
+			matcher.update(linked_payments)
 
 		if updated_transaction.status == "Reconciled":
 			reconciled.add(updated_transaction.name)
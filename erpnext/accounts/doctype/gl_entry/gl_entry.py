@@ -115,13 +115,18 @@ class GLEntry(Document):
 					and self.flags.update_outstanding == "Yes"
 					and not frappe.flags.is_reverse_depr_entry
 				):
-					update_outstanding_amt(
+					voucher = (
 						self.account,
 						self.party_type,
 						self.party,
 						self.against_voucher_type,
 						self.against_voucher,
 					)
+					# entries submitted together update the outstanding of each voucher once
+					if self.flags.outstanding_vouchers is not None:
+						self.flags.outstanding_vouchers.add(voucher)
+					else:
+						update_outstanding_amt(*voucher)
 
 	def check_mandatory(self):
 		mandatory = ["account", "voucher_type", "voucher_no", "company"]
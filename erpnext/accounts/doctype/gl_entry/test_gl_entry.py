@@ -8,6 +8,8 @@ from frappe.tests import IntegrationTestCase
 
 from erpnext.accounts.doctype.gl_entry.gl_entry import rename_gle_sle_docs
 from erpnext.accounts.doctype.journal_entry.test_journal_entry import make_journal_entry
+from erpnext.accounts.doctype.sales_invoice.test_sales_invoice import create_sales_invoice
+from erpnext.accounts.utils import submit_ledger_entries, validate_ledger_entry_links
 
 
 class TestGLEntry(IntegrationTestCase):
@@ -123,3 +125,46 @@ class TestGLEntry(IntegrationTestCase):
 				str(e),
 				"Party Type and Party can only be set for Receivable / Payable account_Test Account Cost for Goods Sold - _TC",
 			)
+
+	def test_entries_submitted_together(self):
+		si = create_sales_invoice(rate=100)
+
+		jv = make_journal_entry("_Test Bank - _TC", "Debtors - _TC", 50, save=False)
+		jv.accounts[1].update(
+			{
+				"party_type": "Customer",
+				"party": si.customer,
+				"credit_in_account_currency": 30,
+				"reference_type": "Sales Invoice",
+				"reference_name": si.name,
+			}
+		)
+		jv.append("accounts", {**jv.accounts[1].as_dict(), "name": None, "credit_in_account_currency": 20})
+		jv.submit()
+
+		gl_entries = frappe.get_all(
+			"GL Entry", filters={"voucher_type": "Journal Entry", "voucher_no": jv.name, "is_cancelled": 0}
+		)
+		self.assertEqual(len(gl_entries), 3)
+		self.assertEqual(frappe.db.get_value("Sales Invoice", si.name, "outstanding_amount"), 50)
+
+		gle = frappe.new_doc("GL Entry")
+		gle.update({"account": "_Test Bank - _TC", "project": "_Test Missing Project"})
+		self.assertRaises(frappe.LinkValidationError, validate_ledger_entry_links, [gle])
+
+		# field checks of `submit` run on entries submitted together
+		gle = frappe.new_doc("GL Entry")
+		gle.update(frappe.get_doc("GL Entry", gl_entries[0].name).as_dict(no_default_fields=True))
+		gle.voucher_detail_no = "x" * 200
+		self.assertRaises(frappe.CharacterLengthExceededError, submit_ledger_entries, [gle])
+
+		# meta defaults are set as on `insert`
+		gle = frappe.get_doc(
+			{
+				**frappe.get_doc("GL Entry", gl_entries[0].name).as_dict(no_default_fields=True),
+				"doctype": "GL Entry",
+				"to_rename": None,
+			}
+		)
+		submit_ledger_entries([gle])
+		self.assertEqual(frappe.db.get_value("GL Entry", gle.name, "to_rename"), 1)
@@ -10,7 +10,9 @@ from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 	get_checks_for_pl_and_bs_accounts,
 )
 from erpnext.accounts.doctype.accounting_dimension_filter.accounting_dimension_filter import (
+	get_account_dimension_filters,
 	get_dimension_filter_map,
+	validate_dimension_filters,
 )
 from erpnext.accounts.doctype.gl_entry.gl_entry import (
 	validate_balance_type,
@@ -90,40 +92,7 @@ class PaymentLedgerEntry(Document):
 			)
 
 	def validate_allowed_dimensions(self):
-		dimension_filter_map = get_dimension_filter_map()
-		for key, value in dimension_filter_map.items():
-			dimension = key[0]
-			account = key[1]
-
-			if self.account == account:
-				if value["is_mandatory"] and not self.get(dimension):
-					frappe.throw(
-						_("{0} is mandatory for account {1}").format(
-							frappe.bold(frappe.unscrub(dimension)), frappe.bold(self.account)
-						),
-						MandatoryAccountDimensionError,
-					)
-
-				if value["allow_or_restrict"] == "Allow":
-					if self.get(dimension) and self.get(dimension) not in value["allowed_dimensions"]:
-						frappe.throw(
-							_("Invalid value {0} for {1} against account {2}").format(
-								frappe.bold(self.get(dimension)),
-								frappe.bold(frappe.unscrub(dimension)),
-								frappe.bold(self.account),
-							),
-							InvalidAccountDimensionError,
-						)
-				else:
-					if self.get(dimension) and self.get(dimension) in value["allowed_dimensions"]:
-						frappe.throw(
-							_("Invalid value {0} for {1} against account {2}").format(
-								frappe.bold(self.get(dimension)),
-								frappe.bold(frappe.unscrub(dimension)),
-								frappe.bold(self.account),
-							),
-							InvalidAccountDimensionError,
-						)
+		validate_dimension_filters(self, get_account_dimension_filters(self.company))
 
 	def validate_dimensions_for_pl_and_bs(self):
 		account_type = frappe.get_cached_value("Account", self.account, "report_type")
@@ -174,9 +143,18 @@ class PaymentLedgerEntry(Document):
 			and self.flags.update_outstanding == "Yes"
 			and not frappe.flags.is_reverse_depr_entry
 		):
-			update_voucher_outstanding(
-				self.against_voucher_type, self.against_voucher_no, self.account, self.party_type, self.party
+			voucher = (
+				self.against_voucher_type,
+				self.against_voucher_no,
+				self.account,
+				self.party_type,
+				self.party,
 			)
+			# entries submitted together update the outstanding of each voucher once
+			if self.flags.outstanding_vouchers is not None:
+				self.flags.outstanding_vouchers.add(voucher)
+			else:
+				update_voucher_outstanding(*voucher)
 
 
 def on_doctype_update():
@@ -0,0 +1,275 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.query_builder import Criterion
+from frappe.query_builder.functions import IfNull, Max, Min, Sum
+from frappe.utils import cint, cstr, flt, now
+from frappe.utils.background_jobs import enqueue, is_job_enqueued
+
+OUTSTANDING_KEY_FIELDS = ("account", "party_type", "party", "voucher_type", "voucher_no")
+OUTSTANDING_FIELDS = (
+	"invoice_amount",
+	"invoice_amount_in_account_currency",
+	"outstanding",
+	"outstanding_in_account_currency",
+)
+
+
+class PaymentLedgerOutstanding(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		account: DF.Link | None
+		account_currency: DF.Link | None
+		account_type: DF.Literal["Receivable", "Payable"]
+		company: DF.Link | None
+		cost_center: DF.Link | None
+		due_date: DF.Date | None
+		invoice_amount: DF.Currency
+		invoice_amount_in_account_currency: DF.Currency
+		outstanding: DF.Currency
+		outstanding_in_account_currency: DF.Currency
+		party: DF.DynamicLink | None
+		party_type: DF.Link | None
+		posting_date: DF.Date | None
+		voucher_no: DF.DynamicLink | None
+		voucher_type: DF.Link | None
+	# end: auto-generated types
+
+	pass
+
+
+def is_payment_ledger_outstanding_enabled() -> bool:
+	return cint(frappe.db.get_single_value("Accounts Settings", "maintain_payment_ledger_outstanding"))
+
+
+def use_payment_ledger_outstanding() -> bool:
+	"""Outstanding can be read from Payment Ledger Outstanding once it is built for the existing ledger."""
+	return is_payment_ledger_outstanding_enabled() and cint(
+		frappe.db.get_single_value("Accounts Settings", "payment_ledger_outstanding_ready")
+	)
+
+
+def update_payment_ledger_outstanding(entries, cancel=False):
+	"""Add the amounts of Payment Ledger Entries to the amount and outstanding of their vouchers, or
+	remove them if the entries are delinked, deleted or re-pointed.
+
+	The vouchers are changed with atomic increments, so a posting never reads the ledger entries of
+	concurrent transactions."""
+	if not entries or not is_payment_ledger_outstanding_enabled():
+		return
+
+	sign = -1 if cancel else 1
+	outstandings = {}
+	for entry in entries:
+		if cint(entry.get("delinked")):
+			continue
+
+		voucher_key = tuple(entry.get(field) for field in OUTSTANDING_KEY_FIELDS)
+		against_voucher_key = (
+			entry.get("account"),
+			entry.get("party_type"),
+			entry.get("party"),
+			entry.get("against_voucher_type"),
+			entry.get("against_voucher_no"),
+		)
+
+		for key in (voucher_key, against_voucher_key):
+			if key not in outstandings:
+				outstandings[key] = frappe._dict(
+					dict.fromkeys(OUTSTANDING_FIELDS, 0.0),
+					company=entry.get("company"),
+					account_type=entry.get("account_type"),
+					account_currency=entry.get("account_currency"),
+				)
+
+		row = outstandings[voucher_key]
+		row.invoice_amount += sign * flt(entry.get("amount"))
+		row.invoice_amount_in_account_currency += sign * flt(entry.get("amount_in_account_currency"))
+		# details of the voucher from its own entries, as when the outstanding is rebuilt
+		for field in ("posting_date", "due_date", "cost_center"):
+			row[field] = row.get(field) or entry.get(field)
+
+		row = outstandings[against_voucher_key]
+		row.outstanding += sign * flt(entry.get("amount"))
+		row.outstanding_in_account_currency += sign * flt(entry.get("amount_in_account_currency"))
+
+	# in the same order in every transaction, to not deadlock with each other
+	for key in sorted(outstandings, key=lambda key: tuple(cstr(value) for value in key)):
+		if key[-1]:
+			add_to_voucher_outstanding(
+				frappe._dict(zip(OUTSTANDING_KEY_FIELDS, key, strict=True)), outstandings[key]
+			)
+
+
+def add_to_voucher_outstanding(voucher, values):
+	plo = frappe.qb.DocType("Payment Ledger Outstanding")
+
+	existing = (
+		frappe.qb.from_(plo)
+		.select(plo.name)
+		.where(Criterion.all(plo[field] == voucher[field] for field in OUTSTANDING_KEY_FIELDS))
+		.limit(1)
+		.for_update()
+	).run()
+
+	if existing:
+		query = frappe.qb.update(plo).where(plo.name == existing[0][0])
+		for field in OUTSTANDING_FIELDS:
+			query = query.set(plo[field], plo[field] + values[field])
+		for field in ("posting_date", "due_date", "cost_center"):
+			if values.get(field):
+				query = query.set(plo[field], IfNull(plo[field], values[field]))
+		query.run()
+	else:
+		make_payment_ledger_outstanding([frappe._dict(values, **voucher)])
+
+
+def get_outstandings_from_ledger(account):
+	"""Amount of each voucher and the outstanding against it, per account and party. The entries are
+	read with a locking read, which waits for postings to the account in progress and holds off new
+	ones until the outstanding of the account is replaced."""
+	ple = frappe.qb.DocType("Payment Ledger Entry")
+
+	voucher_amount = (
+		frappe.qb.from_(ple)
+		.select(
+			ple.company,
+			ple.account,
+			ple.account_type,
+			ple.party_type,
+			ple.party,
+			ple.voucher_type,
+			ple.voucher_no,
+			Min(ple.posting_date).as_("posting_date"),
+			Max(ple.due_date).as_("due_date"),
+			Max(ple.cost_center).as_("cost_center"),
+			Max(ple.account_currency).as_("account_currency"),
+			Sum(ple.amount).as_("amount"),
+			Sum(ple.amount_in_account_currency).as_("amount_in_account_currency"),
+		)
+		.where(ple.delinked == 0)
+		.groupby(ple.account, ple.party_type, ple.party, ple.voucher_type, ple.voucher_no)
+	)
+
+	voucher_outstanding = (
+		frappe.qb.from_(ple)
+		.select(
+			ple.company,
+			ple.account,
+			ple.account_type,
+			ple.party_type,
+			ple.party,
+			ple.against_voucher_type.as_("voucher_type"),
+			ple.against_voucher_no.as_("voucher_no"),
+			Max(ple.account_currency).as_("account_currency"),
+			Sum(ple.amount).as_("amount"),
+			Sum(ple.amount_in_account_currency).as_("amount_in_account_currency"),
+		)
+		.where(ple.delinked == 0)
+		.groupby(ple.account, ple.party_type, ple.party, ple.against_voucher_type, ple.against_voucher_no)
+	)
+
+	voucher_amount = voucher_amount.where(ple.account == account).for_update()
+	voucher_outstanding = voucher_outstanding.where(ple.account == account).for_update()
+
+	outstandings = {}
+	for row in voucher_amount.run(as_dict=True):
+		key = tuple(row[field] for field in OUTSTANDING_KEY_FIELDS)
+		row.invoice_amount = row.pop("amount")
+		row.invoice_amount_in_account_currency = row.pop("amount_in_account_currency")
+		row.outstanding = row.outstanding_in_account_currency = 0.0
+		outstandings[key] = row
+
+	for row in voucher_outstanding.run(as_dict=True):
+		key = tuple(row[field] for field in OUTSTANDING_KEY_FIELDS)
+		if key not in outstandings:
+			# payments against orders and other vouchers without a ledger entry of their own
+			outstandings[key] = frappe._dict(row, invoice_amount=0.0, invoice_amount_in_account_currency=0.0)
+
+		outstandings[key].outstanding = row.amount
+		outstandings[key].outstanding_in_account_currency = row.amount_in_account_currency
+
+	return list(outstandings.values())
+
+
+def make_payment_ledger_outstanding(outstandings):
+	if not outstandings:
+		return
+
+	fields = [
+		"company",
+		"account",
+		"account_type",
+		"party_type",
+		"party",
+		"voucher_type",
+		"voucher_no",
+		"posting_date",
+		"due_date",
+		"cost_center",
+		"account_currency",
+		*OUTSTANDING_FIELDS,
+	]
+
+	user = frappe.session.user
+	timestamp = now()
+	values = [
+		(frappe.generate_hash(), timestamp, timestamp, user, user, *(row.get(field) for field in fields))
+		for row in outstandings
+	]
+
+	frappe.db.bulk_insert(
+		"Payment Ledger Outstanding",
+		fields=["name", "creation", "modified", "owner", "modified_by", *fields],
+		values=values,
+	)
+
+
+def enqueue_rebuild_payment_ledger_outstanding():
+	job_id = "rebuild_payment_ledger_outstanding"
+	if not is_job_enqueued(job_id):
+		enqueue(
+			rebuild_payment_ledger_outstanding,
+			queue="long",
+			timeout=4 * 60 * 60,
+			job_id=job_id,
+			now=frappe.flags.in_test,
+		)
+
+
+def rebuild_payment_ledger_outstanding():
+	"""Build the outstanding of all vouchers from the Payment Ledger, one account at a time."""
+	frappe.db.set_single_value("Accounts Settings", "payment_ledger_outstanding_ready", 0)
+	if not frappe.flags.in_test:
+		frappe.db.commit()
+
+	ple = frappe.qb.DocType("Payment Ledger Entry")
+	plo = frappe.qb.DocType("Payment Ledger Outstanding")
+	accounts = frappe.qb.from_(ple).select(ple.account).distinct().run(pluck=True)
+	accounts += frappe.qb.from_(plo).select(plo.account).distinct().run(pluck=True)
+
+	for account in set(accounts):
+		if not is_payment_ledger_outstanding_enabled():
+			return
+
+		# replaced in one transaction with the locking read of its entries
+		outstandings = get_outstandings_from_ledger(account)
+		frappe.db.delete("Payment Ledger Outstanding", {"account": account})
+		make_payment_ledger_outstanding(outstandings)
+		if not frappe.flags.in_test:
+			frappe.db.commit()
+
+	frappe.db.set_single_value("Accounts Settings", "payment_ledger_outstanding_ready", 1)
+
+
+def on_doctype_update():
+	frappe.db.add_index("Payment Ledger Outstanding", ["voucher_no", "voucher_type"])
+	frappe.db.add_index("Payment Ledger Outstanding", ["party_type", "party"])
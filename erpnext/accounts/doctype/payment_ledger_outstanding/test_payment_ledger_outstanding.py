@@ -0,0 +1,112 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests import IntegrationTestCase, UnitTestCase
+from frappe.utils import today
+
+from erpnext.accounts.doctype.payment_entry.payment_entry import get_payment_entry
+from erpnext.accounts.doctype.payment_ledger_outstanding.payment_ledger_outstanding import (
+	rebuild_payment_ledger_outstanding,
+)
+from erpnext.accounts.doctype.sales_invoice.test_sales_invoice import create_sales_invoice
+from erpnext.accounts.report.accounts_receivable.accounts_receivable import execute
+from erpnext.accounts.utils import get_outstanding_invoices
+
+# On IntegrationTestCase, the doctype test records and all
+# link-field test record depdendencies are recursively loaded
+# Use these module variables to add/remove to/from that list
+EXTRA_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
+IGNORE_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
+
+
+class UnitTestPaymentLedgerOutstanding(UnitTestCase):
+	"""
+	Unit tests for PaymentLedgerOutstanding.
+	Use this class for testing individual functions and methods.
+	"""
+
+	pass
+
+
+class IntegrationTestPaymentLedgerOutstanding(IntegrationTestCase):
+	"""
+	Integration tests for PaymentLedgerOutstanding.
+	Use this class for testing interactions between multiple components.
+	"""
+
+	def get_outstanding(self, voucher_no):
+		return frappe.db.get_value(
+			"Payment Ledger Outstanding",
+			{"voucher_no": voucher_no},
+			["invoice_amount", "outstanding"],
+		)
+
+	def assertMatchesLedger(self, si):
+		filters = {
+			"company": si.company,
+			"report_date": today(),
+			"party_type": "Customer",
+			"party": [si.customer],
+			"range": "30, 60, 90, 120",
+		}
+		report = execute(filters)[1]
+		invoices = get_outstanding_invoices("Customer", si.customer, [si.debit_to])
+		ple = frappe.qb.DocType("Payment Ledger Entry")
+		common_filter = [ple.cost_center == si.cost_center]
+		filtered_invoices = get_outstanding_invoices(
+			"Customer", si.customer, [si.debit_to], common_filter=common_filter.copy()
+		)
+
+		with patch(
+			"erpnext.accounts.report.accounts_receivable.accounts_receivable.use_payment_ledger_outstanding",
+			return_value=False,
+		):
+			self.assertEqual(report, execute(filters)[1])
+
+		with patch("erpnext.accounts.utils.use_payment_ledger_outstanding", return_value=False):
+			self.assertEqual(invoices, get_outstanding_invoices("Customer", si.customer, [si.debit_to]))
+			self.assertEqual(
+				filtered_invoices,
+				get_outstanding_invoices(
+					"Customer", si.customer, [si.debit_to], common_filter=common_filter.copy()
+				),
+			)
+
+	def test_outstanding_on_payment_and_cancel(self):
+		with self.change_settings("Accounts Settings", {"maintain_payment_ledger_outstanding": 1}):
+			self.assertTrue(
+				frappe.db.get_single_value("Accounts Settings", "payment_ledger_outstanding_ready")
+			)
+
+			si = create_sales_invoice(rate=100)
+			self.assertEqual(self.get_outstanding(si.name), (100, 100))
+
+			pe = get_payment_entry(si.doctype, si.name, party_amount=40, bank_account="_Test Bank - _TC")
+			pe.reference_no = "1"
+			pe.reference_date = today()
+			pe.submit()
+			self.assertEqual(self.get_outstanding(si.name), (100, 60))
+			self.assertMatchesLedger(si)
+
+			pe.cancel()
+			self.assertEqual(self.get_outstanding(si.name), (100, 100))
+			self.assertMatchesLedger(si)
+
+	def test_rebuild_outstanding(self):
+		with self.change_settings("Accounts Settings", {"maintain_payment_ledger_outstanding": 1}):
+			si = create_sales_invoice(rate=100)
+			pe = get_payment_entry(si.doctype, si.name, party_amount=30, bank_account="_Test Bank - _TC")
+			pe.reference_no = "1"
+			pe.reference_date = today()
+			pe.submit()
+
+			rebuild_payment_ledger_outstanding()
+			self.assertTrue(
+				frappe.db.get_single_value("Accounts Settings", "payment_ledger_outstanding_ready")
+			)
+			self.assertEqual(frappe.db.count("Payment Ledger Outstanding", {"voucher_no": si.name}), 1)
+			self.assertEqual(self.get_outstanding(si.name), (100, 70))
+			self.assertMatchesLedger(si)
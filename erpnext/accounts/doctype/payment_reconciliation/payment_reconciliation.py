@@ -360,9 +360,9 @@ class PaymentReconciliation(Document):
 		)
 
 		cr_dr_notes = (
-			[x.voucher_no for x in self.return_invoices]
+			{x.voucher_no for x in self.return_invoices}
 			if self.party_type in ["Customer", "Supplier"]
-			else []
+			else set()
 		)
 		# Filter out cr/dr notes from outstanding invoices list
 		# Happens when non-standalone cr/dr notes are linked with another invoice through journal entry
@@ -430,9 +430,14 @@ class PaymentReconciliation(Document):
 		)
 
 		entries = []
+		invoices = args.get("invoices")
+		# invoices before this index are fully allocated, so later payments continue from it
+		# instead of walking the whole list again
+		invoice_idx = 0
 		for pay in args.get("payments"):
 			pay.update({"unreconciled_amount": pay.get("amount")})
-			for inv in args.get("invoices"):
+			while invoice_idx < len(invoices):
+				inv = invoices[invoice_idx]
 				if pay.get("amount") >= inv.get("outstanding_amount"):
 					res = self.get_allocated_entry(pay, inv, inv["outstanding_amount"])
 					pay["amount"] = flt(pay.get("amount")) - flt(inv.get("outstanding_amount"))
@@ -456,7 +461,8 @@ class PaymentReconciliation(Document):
 					break
 				elif inv.get("outstanding_amount") == 0:
 					entries.append(res)
-					continue
+
+				invoice_idx += 1
 
 			else:
 				break
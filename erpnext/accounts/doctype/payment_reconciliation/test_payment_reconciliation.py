@@ -488,6 +488,33 @@ class TestPaymentReconciliation(IntegrationTestCase):
 		self.assertEqual(len(pr.get("payments")), 0)
 		self.assertEqual(pr.get("invoices")[0].get("outstanding_amount"), 165)
 
+	def test_allocation_of_multiple_payments_against_multiple_invoices(self):
+		for _x in range(3):
+			self.create_sales_invoice(qty=1, rate=100)
+		for _x in range(2):
+			self.create_payment_entry(amount=150).save().submit()
+
+		pr = self.create_payment_reconciliation()
+		pr.get_unreconciled_entries()
+		invoices = [x.as_dict() for x in pr.get("invoices")]
+		payments = [x.as_dict() for x in pr.get("payments")]
+		pr.allocate_entries(frappe._dict({"invoices": invoices, "payments": payments}))
+
+		# each payment continues with the invoice the previous one left partly allocated
+		self.assertEqual(
+			[(row.reference_name, row.invoice_number, row.allocated_amount) for row in pr.allocation],
+			[
+				(payments[0].reference_name, invoices[0].invoice_number, 100),
+				(payments[0].reference_name, invoices[1].invoice_number, 50),
+				(payments[1].reference_name, invoices[1].invoice_number, 50),
+				(payments[1].reference_name, invoices[2].invoice_number, 100),
+			],
+		)
+
+		pr.reconcile()
+		self.assertEqual(pr.get("invoices"), [])
+		self.assertEqual(pr.get("payments"), [])
+
 	def test_payment_against_journal(self):
 		transaction_date = nowdate()
 
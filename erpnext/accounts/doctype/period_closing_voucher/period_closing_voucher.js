@@ -55,5 +55,11 @@ frappe.ui.form.on("Period Closing Voucher", {
 				"fa fa-table"
 			);
 		}
+
+		if (frm.doc.docstatus === 1 && frm.doc.gle_processing_status === "Failed") {
+			frm.add_custom_button(__("Resume Processing"), function () {
+				frm.call("resume_gl_processing").then(() => frm.reload_doc());
+			});
+		}
 	},
 });
@@ -3,11 +3,13 @@
 
 
 import copy
+import json
 
 import frappe
 from frappe import _
-from frappe.query_builder.functions import Sum
+from frappe.query_builder.functions import Count, Sum
 from frappe.utils import add_days, flt, formatdate, getdate
+from frappe.utils.background_jobs import is_job_enqueued
 
 from erpnext.accounts.doctype.account_closing_balance.account_closing_balance import (
 	make_closing_entries,
@@ -18,6 +20,11 @@ from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 from erpnext.accounts.utils import get_account_currency, get_fiscal_year
 from erpnext.controllers.accounts_controller import AccountsController
 
+# GL Entries processed by a single background job
+PARTITION_SIZE = 100000
+# vouchers with more GL Entries in the period are processed in background jobs
+BACKGROUND_PROCESSING_THRESHOLD = 5000
+
 
 class PeriodClosingVoucher(AccountsController):
 	# begin: auto-generated types
@@ -28,12 +35,17 @@ class PeriodClosingVoucher(AccountsController):
 	if TYPE_CHECKING:
 		from frappe.types import DF
 
+		from erpnext.accounts.doctype.period_closing_voucher_partition.period_closing_voucher_partition import (
+			PeriodClosingVoucherPartition,
+		)
+
 		amended_from: DF.Link | None
 		closing_account_head: DF.Link
 		company: DF.Link
 		error_message: DF.Text | None
 		fiscal_year: DF.Link
 		gle_processing_status: DF.Literal["In Progress", "Completed", "Failed"]
+		partitions: DF.Table[PeriodClosingVoucherPartition]
 		period_end_date: DF.Date
 		period_start_date: DF.Date
 		remarks: DF.SmallText
@@ -128,6 +140,9 @@ class PeriodClosingVoucher(AccountsController):
 		if account_currency != company_currency:
 			frappe.throw(_("Currency of the Closing Account must be {0}").format(company_currency))
 
+	def before_submit(self):
+		self.make_partitions()
+
 	def on_submit(self):
 		self.db_set("gle_processing_status", "In Progress")
 		self.make_gl_entries()
@@ -138,13 +153,70 @@ class PeriodClosingVoucher(AccountsController):
 		self.db_set("gle_processing_status", "In Progress")
 		self.cancel_gl_entries()
 
-	def make_gl_entries(self):
-		if self.get_gle_count_in_selected_period() > 5000:
-			frappe.enqueue(
-				process_gl_and_closing_entries,
-				doc=self,
-				timeout=1800,
+	def make_partitions(self):
+		"""Split the accounts into partitions whose balances are computed separately, and merged later."""
+		self.set("partitions", [])
+		for report_type in ("Profit and Loss", "Balance Sheet"):
+			for accounts in self.get_account_partitions(report_type):
+				self.append(
+					"partitions",
+					{"report_type": report_type, "accounts": json.dumps(accounts), "status": "Queued"},
+				)
+
+	def get_account_partitions(self, report_type):
+		gle = frappe.qb.DocType("GL Entry")
+		account = frappe.qb.DocType("Account")
+
+		period_condition = gle.posting_date.between(self.period_start_date, self.period_end_date) & (
+			gle.is_opening == "No"
+		)
+		if report_type == "Balance Sheet" and self.is_first_period_closing_voucher():
+			period_condition |= gle.is_opening == "Yes"
+
+		entries_per_account = (
+			frappe.qb.from_(gle)
+			.inner_join(account)
+			.on(account.name == gle.account)
+			.select(gle.account, Count(gle.name))
+			.where(
+				(gle.company == self.company)
+				& (gle.voucher_type != "Period Closing Voucher")
+				& (account.report_type == report_type)
+				& (gle.is_cancelled == 0)
+				& period_condition
 			)
+			.groupby(gle.account)
+			.orderby(gle.account)
+		).run()
+
+		accounts, entries = [], 0
+		for acc, count in entries_per_account:
+			if accounts and entries + count > PARTITION_SIZE:
+				yield accounts
+				accounts, entries = [], 0
+
+			accounts.append(acc)
+			entries += count
+
+		if accounts:
+			yield accounts
+
+	@frappe.whitelist()
+	def resume_gl_processing(self):
+		"""Process the partitions that failed or never ran, and merge them with the completed ones."""
+		if self.docstatus != 1 or self.gle_processing_status != "Failed":
+			return
+
+		for row in self.partitions:
+			if row.status == "Failed":
+				row.db_set("status", "Queued")
+
+		self.db_set("gle_processing_status", "In Progress")
+		enqueue_partitions(self.name)
+
+	def make_gl_entries(self):
+		if self.get_gle_count_in_selected_period() > BACKGROUND_PROCESSING_THRESHOLD:
+			enqueue_partitions(self.name)
 			frappe.msgprint(
 				_(
 					"The GL Entries and closing balances will be processed in the background, it can take a few minutes."
@@ -222,7 +294,7 @@ class PeriodClosingVoucher(AccountsController):
 				"company": self.company,
 				"posting_date": self.period_end_date,
 				"account": self.closing_account_head,
-				"account_currency": frappe.db.get_value(
+				"account_currency": frappe.get_cached_value(
 					"Account", self.closing_account_head, "account_currency"
 				),
 				"debit_in_account_currency": balance_in_account_currency
@@ -248,35 +320,89 @@ class PeriodClosingVoucher(AccountsController):
 		for i, dimension in enumerate(self.accounting_dimension_fields):
 			gl_entry[dimension] = dimensions[i]
 
-	def get_account_balances_based_on_dimensions(self, report_type):
+	def get_account_balances_based_on_dimensions(self, report_type, accounts=None):
 		"""Get balance for dimension-wise pl accounts"""
 		self.get_accounting_dimension_fields()
 		acc_bal_dict = frappe._dict()
 		gl_entries = []
 
+		if accounts is None and self.partitions:
+			return self.get_account_balances_from_partitions(report_type)
+
 		with frappe.db.unbuffered_cursor():
-			gl_entries = self.get_gl_entries_for_current_period(report_type, as_iterator=True)
+			gl_entries = self.get_gl_entries_for_current_period(
+				report_type, as_iterator=True, accounts=accounts
+			)
 			for gle in gl_entries:
 				acc_bal_dict = self.set_account_balance_dict(gle, acc_bal_dict)
 
 		if report_type == "Balance Sheet" and self.is_first_period_closing_voucher():
-			opening_entries = self.get_gl_entries_for_current_period(report_type, only_opening_entries=True)
+			opening_entries = self.get_gl_entries_for_current_period(
+				report_type, only_opening_entries=True, accounts=accounts
+			)
 			for gle in opening_entries:
 				acc_bal_dict = self.set_account_balance_dict(gle, acc_bal_dict)
 
 		return acc_bal_dict
 
+	def process_partition(self, partition):
+		"""Compute the account balances of a partition and keep them on it, so that it is not processed again."""
+		acc_bal_dict = self.get_account_balances_based_on_dimensions(
+			partition.report_type, accounts=json.loads(partition.accounts)
+		)
+
+		balances = []
+		for key, account_balances in acc_bal_dict.items():
+			for acc, amounts in account_balances.items():
+				if acc != "balances":
+					balances.append([list(key), acc, amounts])
+
+		partition.db_set({"status": "Completed", "balances": json.dumps(balances)})
+
+	def get_account_balances_from_partitions(self, report_type):
+		"""Merge the balances of all partitions of the report type, the same as computing them at once."""
+		acc_bal_dict = frappe._dict()
+		for partition in self.partitions:
+			if partition.report_type != report_type:
+				continue
+
+			for key, acc, amounts in json.loads(partition.balances or "[]"):
+				amounts = frappe._dict(amounts)
+				account_balances = acc_bal_dict.setdefault(tuple(key), frappe._dict())
+				account_balances[acc] = amounts
+
+				# dimension-wise total balances
+				account_balances.setdefault(
+					"balances",
+					frappe._dict({"balance_in_account_currency": 0, "balance_in_company_currency": 0}),
+				)
+				account_balances["balances"].balance_in_account_currency += flt(
+					amounts.debit_in_account_currency
+				) - flt(amounts.credit_in_account_currency)
+				account_balances["balances"].balance_in_company_currency += flt(amounts.debit) - flt(
+					amounts.credit
+				)
+
+		return acc_bal_dict
+
 	def get_accounting_dimension_fields(self):
 		default_dimensions = ["cost_center", "finance_book", "project"]
 		self.accounting_dimension_fields = default_dimensions + get_accounting_dimensions()
 
-	def get_gl_entries_for_current_period(self, report_type, only_opening_entries=False, as_iterator=False):
+	def get_gl_entries_for_current_period(
+		self, report_type, only_opening_entries=False, as_iterator=False, accounts=None
+	):
 		date_condition = ""
 		if only_opening_entries:
 			date_condition = "is_opening = 'Yes'"
 		else:
 			date_condition = f"posting_date BETWEEN '{self.period_start_date}' AND '{self.period_end_date}' and is_opening = 'No'"
 
+		values = (self.company, report_type)
+		if accounts is not None:
+			date_condition += " AND account IN %s"
+			values = (tuple(accounts) or ("",), *values)
+
 		# nosemgrep
 		return frappe.db.sql(
 			"""
@@ -301,7 +427,7 @@ class PeriodClosingVoucher(AccountsController):
 				", ".join(self.accounting_dimension_fields),
 				date_condition,
 			),
-			(self.company, report_type),
+			values,
 			as_dict=1,
 			as_iterator=as_iterator,
 		)
@@ -422,7 +548,7 @@ class PeriodClosingVoucher(AccountsController):
 			return True
 
 	def cancel_gl_entries(self):
-		if self.get_gle_count_against_current_pcv() > 5000:
+		if self.get_gle_count_against_current_pcv() > BACKGROUND_PROCESSING_THRESHOLD:
 			frappe.enqueue(
 				process_cancellation,
 				voucher_type="Period Closing Voucher",
@@ -444,10 +570,83 @@ class PeriodClosingVoucher(AccountsController):
 		)
 
 
+def enqueue_partitions(voucher_no):
+	"""Process each pending partition in its own background job, the last one to finish merges them."""
+	doc = frappe.get_doc("Period Closing Voucher", voucher_no)
+
+	pending_partitions = [row for row in doc.partitions if row.status != "Completed"]
+	for row in pending_partitions:
+		job_id = f"period_closing_voucher::{voucher_no}::{row.name}"
+		if not is_job_enqueued(job_id):
+			frappe.enqueue(
+				process_partition,
+				voucher_no=voucher_no,
+				partition=row.name,
+				queue="long",
+				timeout=3600,
+				job_id=job_id,
+				enqueue_after_commit=True,
+			)
+
+	if not pending_partitions:
+		enqueue_merge(voucher_no)
+
+
+def enqueue_merge(voucher_no):
+	job_id = f"period_closing_voucher::{voucher_no}"
+	if not is_job_enqueued(job_id):
+		frappe.enqueue(
+			merge_partitions,
+			voucher_no=voucher_no,
+			queue="long",
+			timeout=3600,
+			job_id=job_id,
+			enqueue_after_commit=True,
+		)
+
+
+def process_partition(voucher_no, partition):
+	doc = frappe.get_doc("Period Closing Voucher", voucher_no)
+	row = doc.get("partitions", {"name": partition})[0]
+
+	try:
+		frappe.db.savepoint("process_partition")
+		doc.process_partition(row)
+	except Exception as e:
+		frappe.db.rollback(save_point="process_partition")
+		frappe.log_error(e)
+		row.db_set("status", "Failed")
+		frappe.db.set_value(doc.doctype, doc.name, "gle_processing_status", "Failed")
+		return
+
+	# other partitions must see this one completed, to tell which of them finishes last
+	if not frappe.flags.in_test:
+		frappe.db.commit()
+	if not frappe.db.exists(
+		"Period Closing Voucher Partition", {"parent": voucher_no, "status": ("!=", "Completed")}
+	):
+		enqueue_merge(voucher_no)
+
+
+def merge_partitions(voucher_no):
+	# lock the voucher, so that the partitions are merged only once
+	status = frappe.db.get_value(
+		"Period Closing Voucher", voucher_no, "gle_processing_status", for_update=True
+	)
+	if status != "In Progress":
+		return
+
+	process_gl_and_closing_entries(frappe.get_doc("Period Closing Voucher", voucher_no))
+
+
 def process_gl_and_closing_entries(doc):
 	from erpnext.accounts.general_ledger import make_gl_entries
 
 	try:
+		for row in doc.partitions:
+			if row.status != "Completed":
+				doc.process_partition(row)
+
 		gl_entries = doc.get_pcv_gl_entries()
 		if gl_entries:
 			make_gl_entries(gl_entries, merge_entries=False)
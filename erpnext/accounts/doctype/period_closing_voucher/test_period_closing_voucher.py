@@ -1,6 +1,7 @@
 # Copyright (c) 2015, Frappe Technologies Pvt. Ltd. and Contributors
 # License: GNU General Public License v3. See license.txt
 import unittest
+from unittest.mock import patch
 
 import frappe
 from frappe.tests import IntegrationTestCase
@@ -63,6 +64,166 @@ class TestPeriodClosingVoucher(IntegrationTestCase):
 		self.assertEqual(pcv.gle_processing_status, "Completed")
 		self.assertEqual(pcv_gle, expected_gle)
 
+	def test_closing_entry_with_partitions(self):
+		frappe.db.sql("delete from `tabGL Entry` where company='Test PCV Company'")
+		frappe.db.sql("delete from `tabPeriod Closing Voucher` where company='Test PCV Company'")
+
+		company = create_company()
+		cost_center = create_cost_center("Test Cost Center 1")
+
+		for amount, account1, account2 in (
+			(400, "Cash - TPC", "Sales - TPC"),
+			(600, "Cost of Goods Sold - TPC", "Cash - TPC"),
+		):
+			jv = make_journal_entry(
+				posting_date="2021-03-15",
+				amount=amount,
+				account1=account1,
+				account2=account2,
+				cost_center=cost_center,
+				save=False,
+			)
+			jv.company = company
+			jv.save()
+			jv.submit()
+
+		# every account in a partition of its own
+		with patch(
+			"erpnext.accounts.doctype.period_closing_voucher.period_closing_voucher.PARTITION_SIZE", 1
+		):
+			pcv = self.make_period_closing_voucher(posting_date="2021-03-31")
+
+		pcv.reload()
+		self.assertEqual(pcv.gle_processing_status, "Completed")
+		self.assertEqual(
+			sorted((row.report_type, row.status) for row in pcv.partitions),
+			[
+				("Balance Sheet", "Completed"),
+				("Profit and Loss", "Completed"),
+				("Profit and Loss", "Completed"),
+			],
+		)
+
+		pcv_gle = frappe.db.sql(
+			"""
+			select account, debit, credit from `tabGL Entry` where voucher_no=%s order by account
+		""",
+			(pcv.name),
+		)
+		self.assertEqual(
+			pcv_gle,
+			(
+				("Cost of Goods Sold - TPC", 0.0, 600.0),
+				(pcv.closing_account_head, 200.0, 0.0),
+				("Sales - TPC", 400.0, 0.0),
+			),
+		)
+
+		cash_closing_balance = frappe.db.get_value(
+			"Account Closing Balance",
+			{"period_closing_voucher": pcv.name, "account": "Cash - TPC"},
+			["debit", "credit"],
+		)
+		self.assertEqual(cash_closing_balance, (400.0, 600.0))
+
+	def test_partitions_processed_in_background(self):
+		from erpnext.accounts.doctype.period_closing_voucher.period_closing_voucher import (
+			PeriodClosingVoucher,
+			merge_partitions,
+		)
+
+		frappe.db.sql("delete from `tabGL Entry` where company='Test PCV Company'")
+		frappe.db.sql("delete from `tabPeriod Closing Voucher` where company='Test PCV Company'")
+
+		company = create_company()
+		cost_center = create_cost_center("Test Cost Center 1")
+
+		for amount, account1, account2 in (
+			(400, "Cash - TPC", "Sales - TPC"),
+			(600, "Cost of Goods Sold - TPC", "Cash - TPC"),
+		):
+			jv = make_journal_entry(
+				posting_date="2021-03-15",
+				amount=amount,
+				account1=account1,
+				account2=account2,
+				cost_center=cost_center,
+				save=False,
+			)
+			jv.company = company
+			jv.save()
+			jv.submit()
+
+		# jobs of the voucher are kept here and run inline by the test
+		jobs = []
+
+		def enqueue(method, **kwargs):
+			if kwargs.get("job_id", "").startswith("period_closing_voucher::"):
+				jobs.append((method, kwargs))
+
+		def run_jobs():
+			while jobs:
+				method, kwargs = jobs.pop(0)
+				for key in ("queue", "timeout", "job_id", "enqueue_after_commit"):
+					kwargs.pop(key, None)
+				method(**kwargs)
+
+		failing_report_types = {"Balance Sheet"}
+		process_partition = PeriodClosingVoucher.process_partition
+
+		def fail_partition(doc, partition):
+			if partition.report_type in failing_report_types:
+				frappe.throw("Partition failed")
+			return process_partition(doc, partition)
+
+		module = "erpnext.accounts.doctype.period_closing_voucher.period_closing_voucher"
+		with (
+			patch(f"{module}.PARTITION_SIZE", 1),
+			patch(f"{module}.BACKGROUND_PROCESSING_THRESHOLD", 0),
+			patch(f"{module}.is_job_enqueued", return_value=False),
+			patch(f"{module}.frappe.enqueue", side_effect=enqueue),
+			patch.object(PeriodClosingVoucher, "process_partition", fail_partition),
+		):
+			pcv = self.make_period_closing_voucher(posting_date="2021-03-31")
+			self.assertEqual(len(jobs), 3)
+
+			run_jobs()
+			pcv.reload()
+			self.assertEqual(pcv.gle_processing_status, "Failed")
+			self.assertEqual(
+				sorted((row.report_type, row.status) for row in pcv.partitions),
+				[
+					("Balance Sheet", "Failed"),
+					("Profit and Loss", "Completed"),
+					("Profit and Loss", "Completed"),
+				],
+			)
+
+			# only the failed partition is processed again
+			failing_report_types.clear()
+			pcv.resume_gl_processing()
+			failed_partition = next(row.name for row in pcv.partitions if row.status != "Completed")
+			self.assertEqual([kwargs["partition"] for _method, kwargs in jobs], [failed_partition])
+
+			# the last partition to complete merges them, once
+			with patch(f"{module}.merge_partitions", wraps=merge_partitions) as merge:
+				run_jobs()
+			self.assertEqual(merge.call_count, 1)
+
+		pcv.reload()
+		self.assertEqual(pcv.gle_processing_status, "Completed")
+		self.assertEqual(
+			frappe.db.sql(
+				"select account, debit, credit from `tabGL Entry` where voucher_no=%s order by account",
+				pcv.name,
+			),
+			(
+				("Cost of Goods Sold - TPC", 0.0, 600.0),
+				(pcv.closing_account_head, 200.0, 0.0),
+				("Sales - TPC", 400.0, 0.0),
+			),
+		)
+
 	def test_cost_center_wise_posting(self):
 		frappe.db.sql("delete from `tabGL Entry` where company='Test PCV Company'")
 		frappe.db.sql("delete from `tabPeriod Closing Voucher` where company='Test PCV Company'")
@@ -0,0 +1,26 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+
+from frappe.model.document import Document
+
+
+class PeriodClosingVoucherPartition(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		accounts: DF.LongText | None
+		balances: DF.LongText | None
+		parent: DF.Data
+		parentfield: DF.Data
+		parenttype: DF.Data
+		report_type: DF.Literal["Profit and Loss", "Balance Sheet"]
+		status: DF.Literal["Queued", "Completed", "Failed"]
+	# end: auto-generated types
+
+	pass
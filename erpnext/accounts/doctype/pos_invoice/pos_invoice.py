@@ -17,7 +17,9 @@ from erpnext.accounts.doctype.sales_invoice.sales_invoice import (
 )
 from erpnext.accounts.party import get_due_date, get_party_account
 from erpnext.controllers.queries import item_query as _item_query
+from erpnext.stock.doctype.bin_update.bin_update import get_pending_bin_updates
 from erpnext.stock.doctype.serial_no.serial_no import get_serial_nos
+from erpnext.stock.utils import get_or_make_bin
 
 
 class POSInvoice(SalesInvoice):
@@ -118,6 +120,7 @@ class POSInvoice(SalesInvoice):
 		plc_conversion_rate: DF.Float
 		po_date: DF.Date | None
 		po_no: DF.Data | None
+		pos_client_id: DF.Data | None
 		pos_profile: DF.Link | None
 		posting_date: DF.Date
 		posting_time: DF.Time | None
@@ -211,6 +214,7 @@ class POSInvoice(SalesInvoice):
 		self.validate_payment_amount()
 		self.validate_loyalty_transaction()
 		self.validate_company_with_pos_company()
+		self.set_pos_reserved_in_bin()
 		if self.coupon_code:
 			from erpnext.accounts.doctype.pricing_rule.utils import validate_coupon_code
 
@@ -238,6 +242,7 @@ class POSInvoice(SalesInvoice):
 
 			update_coupon_code_count(self.coupon_code, "used")
 		self.clear_unallocated_mode_of_payments()
+		update_pos_reserved_qty([self])
 
 	def before_cancel(self):
 		if (
@@ -274,8 +279,18 @@ class POSInvoice(SalesInvoice):
 
 			update_coupon_code_count(self.coupon_code, "cancelled")
 
+		if not self.consolidated_invoice:
+			update_pos_reserved_qty([self], factor=-1)
+
 		self.delink_serial_and_batch_bundle()
 
+	def set_pos_reserved_in_bin(self):
+		"""Mark the rows whose stock qty is reserved in their Bin on submit, so that the same rows are
+		released on cancel and consolidation."""
+		for d in self.get("items"):
+			is_stock_item = d.item_code and frappe.get_cached_value("Item", d.item_code, "is_stock_item")
+			d.pos_reserved_in_bin = 1 if d.warehouse and is_stock_item else 0
+
 	def clear_unallocated_mode_of_payments(self):
 		self.set("payments", self.get("payments", {"amount": ["not in", [0, None, ""]]}))
 
@@ -551,7 +566,7 @@ class POSInvoice(SalesInvoice):
 
 		profile = {}
 		if self.pos_profile:
-			profile = frappe.get_doc("POS Profile", self.pos_profile)
+			profile = frappe.get_cached_doc("POS Profile", self.pos_profile)
 			self.company = profile.get("company")
 
 		if not self.get("payments") and not for_validate:
@@ -760,7 +775,7 @@ def get_bundle_availability(bundle_item_code, warehouse):
 		):
 			bundle_bin_qty = max_available_bundles
 
-	pos_sales_qty = get_pos_reserved_qty(bundle_item_code, warehouse)
+	pos_sales_qty = get_bundle_pos_reserved_qtys([bundle_item_code], warehouse).get(bundle_item_code, 0)
 	return bundle_bin_qty - pos_sales_qty
 
 
@@ -773,10 +788,21 @@ def get_bin_qty(item_code, warehouse):
 		as_dict=1,
 	)
 
-	return bin_qty[0].actual_qty or 0 if bin_qty else 0
+	if not bin_qty:
+		return 0
+
+	pending_update = get_pending_bin_updates([item_code], [warehouse]).get((item_code, warehouse))
+	return flt(bin_qty[0].actual_qty) + flt(pending_update and pending_update.actual_qty)
 
 
 def get_pos_reserved_qty(item_code, warehouse):
+	return flt(
+		frappe.db.get_value("Bin", {"item_code": item_code, "warehouse": warehouse}, "pos_reserved_qty")
+	)
+
+
+def get_pos_reserved_qty_from_invoices(item_code, warehouse):
+	"""POS reserved qty summed from the rows reserved in the Bin, to rebuild the qty maintained in it."""
 	p_inv = frappe.qb.DocType("POS Invoice")
 	p_item = frappe.qb.DocType("POS Invoice Item")
 
@@ -788,6 +814,7 @@ def get_pos_reserved_qty(item_code, warehouse):
 			(p_inv.name == p_item.parent)
 			& (IfNull(p_inv.consolidated_invoice, "") == "")
 			& (p_item.docstatus == 1)
+			& (p_item.pos_reserved_in_bin == 1)
 			& (p_item.item_code == item_code)
 			& (p_item.warehouse == warehouse)
 		)
@@ -796,6 +823,147 @@ def get_pos_reserved_qty(item_code, warehouse):
 	return flt(reserved_qty[0].stock_qty) if reserved_qty else 0
 
 
+def update_pos_reserved_qty(invoices, factor=1):
+	"""Add the stock qty of the invoices' rows reserved in the Bin to the POS reserved qty of their Bins,
+	or subtract it with `factor=-1` when the invoices are cancelled or consolidated."""
+	reserved_qtys = {}
+	for invoice in invoices:
+		for d in invoice.get("items"):
+			if d.pos_reserved_in_bin and flt(d.stock_qty):
+				key = (d.item_code, d.warehouse)
+				reserved_qtys[key] = reserved_qtys.get(key, 0) + flt(d.stock_qty)
+
+	bin = frappe.qb.DocType("Bin")
+	# update in a fixed order so that concurrent invoices lock the Bins in the same order
+	for (item_code, warehouse), qty in sorted(reserved_qtys.items()):
+		bin_name = get_or_make_bin(item_code, warehouse)
+		(
+			frappe.qb.update(bin)
+			.set(bin.pos_reserved_qty, bin.pos_reserved_qty + qty * factor)
+			.where(bin.name == bin_name)
+		).run()
+
+
+def get_stock_availabilities(item_codes, warehouse) -> dict:
+	"""Available quantity of many items in a warehouse, as `get_stock_availability` computes it for one."""
+	item_codes = list(set(item_codes))
+	if not item_codes:
+		return {}
+
+	is_stock_item = dict(
+		frappe.get_all(
+			"Item", filters={"name": ("in", item_codes)}, fields=["name", "is_stock_item"], as_list=True
+		)
+	)
+	non_stock_items = [item_code for item_code in item_codes if not is_stock_item.get(item_code)]
+
+	bundles = {}
+	if non_stock_items:
+		for bundle in frappe.get_all(
+			"Product Bundle", filters={"name": ("in", non_stock_items), "disabled": 0}, pluck="name"
+		):
+			bundles[bundle] = []
+
+	if bundles:
+		for row in frappe.get_all(
+			"Product Bundle Item",
+			filters={"parent": ("in", list(bundles)), "parenttype": "Product Bundle"},
+			fields=["parent", "item_code", "qty"],
+			order_by="idx",
+		):
+			bundles[row.parent].append(row)
+
+	bundle_items = list({row.item_code for rows in bundles.values() for row in rows} - set(is_stock_item))
+	if bundle_items:
+		is_stock_item.update(
+			frappe.get_all(
+				"Item",
+				filters={"name": ("in", bundle_items)},
+				fields=["name", "is_stock_item"],
+				as_list=True,
+			)
+		)
+
+	stock_items = [item_code for item_code in item_codes if is_stock_item.get(item_code)]
+	stock_items += [row.item_code for rows in bundles.values() for row in rows]
+
+	bin_qtys = get_bin_qtys(stock_items, warehouse)
+	reserved_qtys = get_pos_reserved_qtys(stock_items, warehouse)
+	bundle_reserved_qtys = get_bundle_pos_reserved_qtys(list(bundles), warehouse)
+
+	def get_available_qty(item_code):
+		return bin_qtys.get(item_code, 0) - reserved_qtys.get(item_code, 0)
+
+	availability = {}
+	for item_code in item_codes:
+		if is_stock_item.get(item_code):
+			availability[item_code] = (get_available_qty(item_code), True)
+		elif item_code in bundles:
+			bundle_bin_qty = 1000000
+			for row in bundles[item_code]:
+				max_available_bundles = get_available_qty(row.item_code) / row.qty
+				if bundle_bin_qty > max_available_bundles and is_stock_item.get(row.item_code):
+					bundle_bin_qty = max_available_bundles
+
+			availability[item_code] = (bundle_bin_qty - bundle_reserved_qtys.get(item_code, 0), True)
+		else:
+			availability[item_code] = (0, False)
+
+	return availability
+
+
+def get_bin_qtys(item_codes, warehouse) -> dict:
+	if not item_codes:
+		return {}
+
+	bin = frappe.qb.DocType("Bin")
+	bins = (
+		frappe.qb.from_(bin)
+		.select(bin.item_code, bin.actual_qty)
+		.where((bin.item_code.isin(list(set(item_codes)))) & (bin.warehouse == warehouse))
+	).run(as_dict=True)
+
+	return {row.item_code: flt(row.actual_qty) for row in bins}
+
+
+def get_pos_reserved_qtys(item_codes, warehouse) -> dict:
+	if not item_codes:
+		return {}
+
+	reserved_qtys = frappe.get_all(
+		"Bin",
+		filters={"item_code": ("in", list(set(item_codes))), "warehouse": warehouse},
+		fields=["item_code", "pos_reserved_qty"],
+	)
+
+	return {row.item_code: flt(row.pos_reserved_qty) for row in reserved_qtys}
+
+
+def get_bundle_pos_reserved_qtys(bundles, warehouse) -> dict:
+	"""Product bundles are not stock items and have no Bin, their POS reserved qty is read from the invoices."""
+	if not bundles:
+		return {}
+
+	p_inv = frappe.qb.DocType("POS Invoice")
+	p_item = frappe.qb.DocType("POS Invoice Item")
+
+	reserved_qtys = (
+		frappe.qb.from_(p_inv)
+		.from_(p_item)
+		.select(p_item.item_code, Sum(p_item.stock_qty).as_("stock_qty"))
+		.where(
+			(p_inv.name == p_item.parent)
+			& (IfNull(p_inv.consolidated_invoice, "") == "")
+			& (p_item.docstatus == 1)
+			& (p_item.item_code.isin(list(set(bundles))))
+			& (p_item.warehouse == warehouse)
+		)
+		.groupby(p_item.item_code)
+	).run(as_dict=True)
+
+	return {row.item_code: flt(row.stock_qty) for row in reserved_qtys}
+
+
 @frappe.whitelist()
 def make_sales_return(source_name, target_doc=None):
 	from erpnext.controllers.sales_and_purchase_return import make_return_doc
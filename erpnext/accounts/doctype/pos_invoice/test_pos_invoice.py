@@ -760,6 +760,48 @@ class TestPOSInvoice(IntegrationTestCase):
 		rounded_total = frappe.db.get_value("Sales Invoice", pos_inv2.consolidated_invoice, "rounded_total")
 		self.assertEqual(rounded_total, 400)
 
+	def test_pos_reserved_qty(self):
+		from erpnext.accounts.doctype.pos_closing_entry.test_pos_closing_entry import (
+			init_user_and_profile,
+		)
+		from erpnext.accounts.doctype.pos_invoice.pos_invoice import get_pos_reserved_qty
+		from erpnext.accounts.doctype.pos_invoice_merge_log.pos_invoice_merge_log import (
+			consolidate_pos_invoices,
+		)
+
+		frappe.db.sql("delete from `tabPOS Invoice`")
+		item_code = make_item("_Test POS Reserved Item", {"is_stock_item": 1}).name
+		make_stock_entry(target="_Test Warehouse - _TC", item_code=item_code, qty=10, basic_rate=100)
+		init_user_and_profile()
+
+		invoices = []
+		for qty in (3, 2):
+			pos_inv = create_pos_invoice(item_code=item_code, qty=qty, rate=100, do_not_submit=1)
+			pos_inv.append(
+				"payments", {"mode_of_payment": "Cash", "account": "Cash - _TC", "amount": qty * 100}
+			)
+			pos_inv.submit()
+			invoices.append(pos_inv)
+
+		self.assertEqual(get_pos_reserved_qty(item_code, "_Test Warehouse - _TC"), 5)
+
+		invoices[1].cancel()
+		self.assertEqual(get_pos_reserved_qty(item_code, "_Test Warehouse - _TC"), 3)
+
+		# rows are released as they were reserved, even if the item is no longer a stock item
+		frappe.db.set_value("Item", item_code, "is_stock_item", 0)
+		pos_inv = create_pos_invoice(item_code=item_code, qty=1, rate=100, do_not_submit=1)
+		pos_inv.append("payments", {"mode_of_payment": "Cash", "account": "Cash - _TC", "amount": 100})
+		pos_inv.submit()
+		self.assertEqual(get_pos_reserved_qty(item_code, "_Test Warehouse - _TC"), 3)
+
+		frappe.db.set_value("Item", item_code, "is_stock_item", 1)
+		pos_inv.cancel()
+		self.assertEqual(get_pos_reserved_qty(item_code, "_Test Warehouse - _TC"), 3)
+
+		consolidate_pos_invoices()
+		self.assertEqual(get_pos_reserved_qty(item_code, "_Test Warehouse - _TC"), 0)
+
 	def test_pos_batch_reservation(self):
 		from erpnext.stock.doctype.serial_and_batch_bundle.serial_and_batch_bundle import (
 			get_auto_batch_nos,
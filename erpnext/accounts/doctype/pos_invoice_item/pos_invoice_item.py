@@ -64,6 +64,7 @@ class POSInvoiceItem(SalesInvoiceItem):
 		parentfield: DF.Data
 		parenttype: DF.Data
 		pos_invoice_item: DF.Data | None
+		pos_reserved_in_bin: DF.Check
 		price_list_rate: DF.Currency
 		pricing_rules: DF.SmallText | None
 		project: DF.Link | None
@@ -12,6 +12,7 @@ from frappe.utils import cint, flt, get_time, getdate, nowdate, nowtime
 from frappe.utils.background_jobs import enqueue, is_job_enqueued
 from frappe.utils.scheduler import is_scheduler_inactive
 
+from erpnext.accounts.doctype.pos_invoice.pos_invoice import update_pos_reserved_qty
 from erpnext.accounts.doctype.pos_profile.pos_profile import required_accounting_dimensions
 from erpnext.controllers.taxes_and_totals import ItemWiseTaxDetail
 
@@ -338,6 +339,9 @@ class POSInvoiceMergeLog(Document):
 			doc.set_status(update=True)
 			doc.save()
 
+		# consolidated invoices no longer reserve stock for POS
+		update_pos_reserved_qty(invoice_docs, factor=1 if self.docstatus == 2 else -1)
+
 	def serial_and_batch_bundle_reference_for_pos_invoice(self):
 		for d in self.pos_invoices:
 			pos_invoice = frappe.get_doc("POS Invoice", d.pos_invoice)
@@ -12,6 +12,8 @@ from frappe import _, throw
 from frappe.model.document import Document
 from frappe.utils import cint, flt
 
+from erpnext.accounts.doctype.pricing_rule.pricing_rule_index import clear_pricing_rule_index
+
 apply_on_dict = {"Item Code": "items", "Item Group": "item_groups", "Brand": "brands"}
 
 other_fields = ["other_item_code", "other_item_group", "other_brand"]
@@ -144,6 +146,20 @@ class PricingRule(Document):
 		if not self.margin_type:
 			self.margin_rate_or_amount = 0.0
 
+	def clear_cache(self):
+		self.clear_pricing_rule_index()
+		return super().clear_cache()
+
+	def on_trash(self):
+		self.clear_pricing_rule_index()
+
+	def after_rename(self, old, new, merge):
+		self.clear_pricing_rule_index()
+
+	def clear_pricing_rule_index(self):
+		previous = self.get_doc_before_save()
+		clear_pricing_rule_index({self.company, previous.company if previous else self.company})
+
 	def validate_duplicate_apply_on(self):
 		if self.apply_on != "Transaction":
 			apply_on_table = apply_on_dict.get(self.apply_on)
@@ -340,6 +356,8 @@ def apply_pricing_rule(args, doc=None):
 	}
 	"""
 
+	from erpnext.accounts.doctype.pricing_rule.utils import DocumentPricingRuleCache
+
 	if isinstance(args, str):
 		args = json.loads(args)
 
@@ -368,11 +386,19 @@ def apply_pricing_rule(args, doc=None):
 	for item_code, val in query_items:
 		serialized_items.setdefault(item_code, val)
 
-	for item in item_list:
-		args_copy = copy.deepcopy(args)
-		args_copy.update(item)
-		data = get_pricing_rule_for_item(args_copy, doc=doc)
-		out.append(data)
+	if isinstance(doc, str):
+		doc = json.loads(doc)
+
+	# the document is loaded once, and the rows share the items and history of the rules they match
+	if doc:
+		doc = frappe.get_doc(doc)
+
+	with DocumentPricingRuleCache():
+		for item in item_list:
+			args_copy = copy.deepcopy(args)
+			args_copy.update(item)
+			data = get_pricing_rule_for_item(args_copy, doc=doc)
+			out.append(data)
 
 	return out
 
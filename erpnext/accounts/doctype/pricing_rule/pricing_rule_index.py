@@ -0,0 +1,181 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# License: GNU General Public License v3. See license.txt
+
+import frappe
+from frappe.query_builder.functions import Count, IfNull, Max
+
+PRICING_RULE_INDEX_VERSION = "pricing_rule_index_version"
+
+# fields of the pricing rule a transaction is matched on
+MATCH_FIELDS = (
+	"name",
+	"priority",
+	"selling",
+	"buying",
+	"company",
+	"customer",
+	"supplier",
+	"campaign",
+	"sales_partner",
+	"customer_group",
+	"territory",
+	"supplier_group",
+	"warehouse",
+	"for_price_list",
+	"valid_from",
+	"valid_upto",
+	"apply_rule_on_other",
+	"other_item_code",
+	"other_item_group",
+	"other_brand",
+)
+
+APPLY_ON_FIELDS = ("item_code", "item_group", "brand")
+
+# indexes built by this process, per site, transaction type and company
+_pricing_rule_indexes = {}
+
+
+class PricingRuleIndex:
+	"""
+	Enabled pricing rules of a transaction type and company, indexed by the item code, item group and brand
+	they apply on and by the values of their "apply rule on other" fields. Rules without a company apply
+	to every company and are in the index of each.
+
+	Only the fields rules are matched on are indexed, the complete rules are loaded when they are first matched.
+	"""
+
+	def __init__(self, transaction_type, company, version):
+		self.transaction_type = transaction_type
+		self.company = company
+		self.version = version
+		self.rules = {}
+		self.rule_details = {}
+		self.children = {field: {} for field in APPLY_ON_FIELDS}
+		self.by_value = {field: {} for field in APPLY_ON_FIELDS}
+		self.by_other_value = {field: {} for field in APPLY_ON_FIELDS}
+
+		self.load_rules()
+		for field in APPLY_ON_FIELDS:
+			self.load_children(field)
+
+	def load_rules(self):
+		pr = frappe.qb.DocType("Pricing Rule")
+		rules = (
+			frappe.qb.from_(pr)
+			.select(*(pr[field] for field in MATCH_FIELDS))
+			.where(self.get_rule_conditions(pr))
+		).run(as_dict=True)
+
+		for rule in rules:
+			self.rules[rule.name] = rule
+			for field in APPLY_ON_FIELDS:
+				if rule.apply_rule_on_other is not None and rule.get(f"other_{field}"):
+					self.by_other_value[field].setdefault(rule.get(f"other_{field}"), []).append(rule.name)
+
+	def load_children(self, field):
+		pr = frappe.qb.DocType("Pricing Rule")
+		child = frappe.qb.DocType(f"Pricing Rule {frappe.unscrub(field)}")
+		rows = (
+			frappe.qb.from_(child)
+			.join(pr)
+			.on(pr.name == child.parent)
+			.select(child.name, child.parent, child[field].as_("value"), child.uom)
+			.where((child.parenttype == "Pricing Rule") & self.get_rule_conditions(pr))
+		).run(as_dict=True)
+
+		for row in rows:
+			self.children[field].setdefault(row.parent, []).append(row)
+			self.by_value[field].setdefault(row.value, []).append(row)
+
+	def get_rule_conditions(self, pr):
+		return (
+			(pr.disable == 0)
+			& (pr[self.transaction_type] == 1)
+			& (IfNull(pr.company, "").isin(get_companies_of_index(self.company)))
+		)
+
+	def get_rows(self, field, values):
+		"""Child rows of the rules applied on any of the values."""
+		return [row for value in values for row in self.by_value[field].get(value, ())]
+
+	def get_rows_of_other_rules(self, field, value):
+		"""Child rows of the rules applied on other items through the value."""
+		return [
+			row
+			for name in self.by_other_value[field].get(value, ())
+			for row in self.children[field].get(name, ())
+		]
+
+	def get_rule(self, name):
+		return self.rules[name]
+
+	def get_rule_details(self, names):
+		"""Complete pricing rules, loaded on first use."""
+		if missing := [name for name in names if name not in self.rule_details]:
+			pr = frappe.qb.DocType("Pricing Rule")
+			for rule in frappe.qb.from_(pr).select("*").where(pr.name.isin(missing)).run(as_dict=True):
+				self.rule_details[rule.name] = rule
+
+		return {name: self.rule_details[name] for name in names if name in self.rule_details}
+
+
+def get_pricing_rule_index(transaction_type, company=None) -> PricingRuleIndex:
+	"""
+	Index of the pricing rules of the transaction type and company, rebuilt when a rule of the company
+	is changed. It is checked against the rules in the database on each call, so a caller pricing many rows
+	should get it once, e.g. through `DocumentPricingRuleCache`.
+	"""
+	company = company or ""
+	cache_version = frappe.cache().hget(PRICING_RULE_INDEX_VERSION, company)
+	if not cache_version:
+		cache_version = frappe.generate_hash()
+		frappe.cache().hset(PRICING_RULE_INDEX_VERSION, company, cache_version)
+
+	# the cached version alone would tag an index built from a snapshot taken before a rule was saved
+	# with the version set after it, the stamp is read in the same snapshot as the rules
+	version = (cache_version, get_pricing_rules_stamp(company))
+
+	key = (frappe.local.site, transaction_type, company)
+	index = _pricing_rule_indexes.get(key)
+	if not index or index.version != version:
+		index = _pricing_rule_indexes[key] = PricingRuleIndex(transaction_type, company, version)
+
+	return index
+
+
+def get_companies_of_index(company):
+	return list({company, ""})
+
+
+def get_pricing_rules_stamp(company):
+	"""Number of pricing rules of the company and the last time one was modified."""
+	pr = frappe.qb.DocType("Pricing Rule")
+	return tuple(
+		frappe.qb.from_(pr)
+		.select(Count(pr.name), Max(pr.modified))
+		.where(IfNull(pr.company, "").isin(get_companies_of_index(company)))
+		.run()[0]
+	)
+
+
+def clear_pricing_rule_index(companies=None):
+	"""
+	Make every process rebuild its pricing rule index of the companies, now and when the transaction ends.
+	A rule without a company is in the index of every company, so all of them are rebuilt.
+
+	Writes to pricing rules that don't go through the document and don't update `modified`, e.g. raw SQL
+	or `db_set(..., update_modified=False)`, are not noticed by the index, it has to be cleared after them.
+	"""
+	companies = list(companies) if companies and all(companies) else None
+	reset_pricing_rule_index_version(companies)
+	frappe.db.after_commit.add(lambda: reset_pricing_rule_index_version(companies))
+	frappe.db.after_rollback.add(lambda: reset_pricing_rule_index_version(companies))
+
+
+def reset_pricing_rule_index_version(companies=None):
+	if companies:
+		for company in companies:
+			frappe.cache().hdel(PRICING_RULE_INDEX_VERSION, company)
+	else:
+		frappe.cache().delete_value(PRICING_RULE_INDEX_VERSION)
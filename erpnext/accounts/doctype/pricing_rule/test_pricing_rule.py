@@ -7,6 +7,10 @@ import unittest
 import frappe
 from frappe.tests import IntegrationTestCase, UnitTestCase
 
+from erpnext.accounts.doctype.pricing_rule.pricing_rule_index import (
+	clear_pricing_rule_index,
+	get_pricing_rule_index,
+)
 from erpnext.accounts.doctype.purchase_invoice.test_purchase_invoice import make_purchase_invoice
 from erpnext.accounts.doctype.sales_invoice.test_sales_invoice import create_sales_invoice
 from erpnext.controllers.sales_and_purchase_return import make_return_doc
@@ -107,6 +111,7 @@ class TestPricingRule(IntegrationTestCase):
 		self.assertEqual(details.get("discount_percentage"), 5)
 
 		frappe.db.sql("update `tabPricing Rule` set priority=NULL where campaign='_Test Campaign'")
+		clear_pricing_rule_index()
 		from erpnext.accounts.doctype.pricing_rule.utils import MultiplePricingRuleConflict
 
 		self.assertRaises(MultiplePricingRuleConflict, get_item_details, args)
@@ -1432,6 +1437,96 @@ class TestPricingRule(IntegrationTestCase):
 		debit_note.delete()
 		pi.cancel()
 
+	def test_pricing_rule_index(self):
+		frappe.delete_doc_if_exists("Pricing Rule", "_Test Pricing Rule")
+		pricing_rule = make_pricing_rule(selling=1, title="_Test Pricing Rule", priority=2)
+
+		index = get_pricing_rule_index("selling", "_Test Company")
+		self.assertIn(pricing_rule.name, [row.parent for row in index.get_rows("item_code", ["_Test Item"])])
+		self.assertEqual(index.get_rule(pricing_rule.name).priority, "2")
+
+		pricing_rule.disable = 1
+		pricing_rule.save()
+
+		index = get_pricing_rule_index("selling", "_Test Company")
+		self.assertNotIn(
+			pricing_rule.name, [row.parent for row in index.get_rows("item_code", ["_Test Item"])]
+		)
+
+		pricing_rule.delete()
+
+	def test_pricing_rule_index_per_company(self):
+		from erpnext.accounts.doctype.pricing_rule.utils import DocumentPricingRuleCache
+
+		frappe.delete_doc_if_exists("Pricing Rule", "_Test Pricing Rule")
+		pricing_rule = make_pricing_rule(selling=1, title="_Test Pricing Rule")
+
+		def get_rules(index):
+			return [row.parent for row in index.get_rows("item_code", ["_Test Item"])]
+
+		self.assertIn(pricing_rule.name, get_rules(get_pricing_rule_index("selling", "_Test Company")))
+		self.assertNotIn(pricing_rule.name, get_rules(get_pricing_rule_index("selling", "_Test Company 1")))
+
+		# a rule without a company is in the index of every company
+		pricing_rule.company = None
+		pricing_rule.save()
+		self.assertIn(pricing_rule.name, get_rules(get_pricing_rule_index("selling", "_Test Company 1")))
+
+		# the index is looked up once per document
+		with DocumentPricingRuleCache() as cache:
+			index = cache.get_pricing_rule_index("selling", "_Test Company")
+			self.assertIs(cache.get_pricing_rule_index("selling", "_Test Company"), index)
+
+		pricing_rule.delete()
+
+	def test_pricing_rule_index_for_rule_on_other_item_of_item_group_rule(self):
+		frappe.delete_doc_if_exists("Pricing Rule", "_Test Pricing Rule")
+		pricing_rule = make_pricing_rule(
+			selling=1, title="_Test Pricing Rule", apply_on="Item Group", item_group="_Test Item Group"
+		)
+		pricing_rule.db_set({"apply_rule_on_other": "Item Code", "other_item_code": "_Test Item"})
+
+		index = get_pricing_rule_index("selling", "_Test Company")
+		self.assertEqual(index.get_rows_of_other_rules("item_code", "_Test Item"), [])
+
+		si = create_sales_invoice(do_not_save=True)
+		si.save()
+
+		pricing_rule.delete()
+
+	def test_cumulative_data_shared_by_rows(self):
+		from erpnext.accounts.doctype.pricing_rule.utils import (
+			DocumentPricingRuleCache,
+			get_qty_amount_data_for_cumulative,
+		)
+
+		frappe.delete_doc_if_exists("Pricing Rule", "_Test Pricing Rule")
+		pricing_rule = make_pricing_rule(selling=1, title="_Test Pricing Rule")
+		pricing_rule.db_set(
+			{
+				"is_cumulative": 1,
+				"valid_from": frappe.utils.add_days(frappe.utils.nowdate(), -1),
+				"valid_upto": frappe.utils.nowdate(),
+			}
+		)
+		pricing_rule.reload()
+
+		si = create_sales_invoice(qty=3, rate=100, do_not_submit=True)
+		si.ignore_pricing_rule = 1
+		si.submit()
+
+		args = frappe._dict({"doctype": "Sales Invoice"})
+		expected = get_qty_amount_data_for_cumulative(pricing_rule, args, ["_Test Item"])
+		self.assertGreaterEqual(expected[0], 3)
+
+		with DocumentPricingRuleCache() as cache:
+			self.assertEqual(get_qty_amount_data_for_cumulative(pricing_rule, args, ["_Test Item"]), expected)
+			self.assertEqual(get_qty_amount_data_for_cumulative(pricing_rule, args, ["_Test Item"]), expected)
+			self.assertIn("_Test Item", cache.cumulative_data[(pricing_rule.name, "Sales Invoice")])
+
+		si.cancel()
+		pricing_rule.delete()
+
 
 EXTRA_TEST_RECORD_DEPENDENCIES = ["UTM Campaign"]
 
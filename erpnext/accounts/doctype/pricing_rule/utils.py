@@ -10,11 +10,12 @@ import math
 
 import frappe
 from frappe import _, bold
-from frappe.utils import cint, flt, fmt_money, get_link_to_form, getdate, today
+from frappe.utils import cint, cstr, flt, fmt_money, get_link_to_form, getdate, today
 
+from erpnext.accounts.doctype.pricing_rule.pricing_rule_index import get_pricing_rule_index
 from erpnext.setup.doctype.item_group.item_group import get_child_item_groups
 from erpnext.stock.doctype.warehouse.warehouse import get_child_warehouses
-from erpnext.stock.get_item_details import get_conversion_factor
+from erpnext.stock.get_item_details import get_bulk_item_details_cache, get_conversion_factor
 
 
 class MultiplePricingRuleConflict(frappe.ValidationError):
@@ -24,15 +25,84 @@ class MultiplePricingRuleConflict(frappe.ValidationError):
 apply_on_table = {"Item Code": "items", "Item Group": "item_groups", "Brand": "brands"}
 
 
+class DocumentPricingRuleCache:
+	"""
+	Lookups shared by the rows of a document while pricing rules are applied on it, loaded once per rule:
+	the items a rule applies on and the quantity and amount of its items in past transactions.
+	"""
+
+	def __init__(self):
+		self.pricing_rule_items = {}
+		self.cumulative_data = {}
+		self.pricing_rule_indexes = {}
+
+	def __enter__(self):
+		self.previous = frappe.flags.get("document_pricing_rule_cache")
+		frappe.flags.document_pricing_rule_cache = self
+		return self
+
+	def __exit__(self, *args):
+		frappe.flags.document_pricing_rule_cache = self.previous
+
+	def get_pricing_rule_index(self, transaction_type, company):
+		key = (transaction_type, company)
+		if key not in self.pricing_rule_indexes:
+			self.pricing_rule_indexes[key] = get_pricing_rule_index(transaction_type, company)
+
+		return self.pricing_rule_indexes[key]
+
+	def get_pricing_rule_items(self, pr_doc, other_items=False) -> list:
+		key = (pr_doc.name, bool(other_items))
+		if key not in self.pricing_rule_items:
+			self.pricing_rule_items[key] = _get_pricing_rule_items(pr_doc, other_items)
+
+		return list(self.pricing_rule_items[key])
+
+	def get_cumulative_data(self, pr_doc, doctype, items) -> dict:
+		"""Quantity and amount of the items in submitted transactions, loaded for all items of the rule at once."""
+		data = self.cumulative_data.setdefault((pr_doc.name, doctype), {})
+		if missing := {item for item in items if item not in data}:
+			if not data:
+				missing.update(self.get_pricing_rule_items(pr_doc))
+
+			data.update(dict.fromkeys(missing, (0, 0)))
+			data.update(get_cumulative_data(pr_doc, doctype, list(missing)))
+
+		return {item: data[item] for item in items}
+
+
+def get_document_pricing_rule_cache() -> DocumentPricingRuleCache | None:
+	return frappe.flags.get("document_pricing_rule_cache")
+
+
+SELLING_DOCTYPES = [
+	"Quotation",
+	"Quotation Item",
+	"Sales Order",
+	"Sales Order Item",
+	"Delivery Note",
+	"Delivery Note Item",
+	"Sales Invoice",
+	"Sales Invoice Item",
+	"POS Invoice",
+	"POS Invoice Item",
+]
+
+
 def get_pricing_rules(args, doc=None):
 	pricing_rules = []
 	values = {}
 
-	if not frappe.db.exists("Pricing Rule", {"disable": 0, args.transaction_type: 1}):
+	if not pricing_rule_exists(args.transaction_type):
 		return
 
+	if cache := get_document_pricing_rule_cache():
+		index = cache.get_pricing_rule_index(args.transaction_type, args.company)
+	else:
+		index = get_pricing_rule_index(args.transaction_type, args.company)
+
 	for apply_on in ["Item Code", "Item Group", "Brand"]:
-		pricing_rules.extend(_get_pricing_rules(apply_on, args, values))
+		pricing_rules.extend(_get_pricing_rules(apply_on, args, values, index))
 		if pricing_rules and pricing_rules[0].has_priority:
 			continue
 
@@ -61,6 +131,18 @@ def get_pricing_rules(args, doc=None):
 	return rules
 
 
+def pricing_rule_exists(transaction_type) -> bool:
+	cache = get_bulk_item_details_cache()
+	if cache and transaction_type in cache.pricing_rule_exists:
+		return cache.pricing_rule_exists[transaction_type]
+
+	exists = bool(frappe.db.exists("Pricing Rule", {"disable": 0, transaction_type: 1}))
+	if cache:
+		cache.pricing_rule_exists[transaction_type] = exists
+
+	return exists
+
+
 def sorted_by_priority(pricing_rules, args, doc=None):
 	# If more than one pricing rules, then sort by priority
 	pricing_rules_list = []
@@ -99,78 +181,80 @@ def filter_pricing_rule_based_on_condition(pricing_rules, doc=None):
 	return filtered_pricing_rules
 
 
-def _get_pricing_rules(apply_on, args, values):
+def _get_pricing_rules(apply_on, args, values, index):
 	apply_on_field = frappe.scrub(apply_on)
 
 	if not args.get(apply_on_field):
 		return []
 
-	child_doc = f"`tabPricing Rule {apply_on}`"
+	value = args.get(apply_on_field)
 
-	conditions = item_variant_condition = item_conditions = ""
-	values[apply_on_field] = args.get(apply_on_field)
-	if apply_on_field in ["item_code", "brand"]:
-		item_conditions = f"{child_doc}.{apply_on_field}= %({apply_on_field})s"
+	if apply_on_field == "item_group":
+		rows = index.get_rows(apply_on_field, _get_tree_values(args, "Item Group", False))
+	else:
+		rows = index.get_rows(apply_on_field, [value])
 
-		if apply_on_field == "item_code":
-			if args.get("uom", None):
-				item_conditions += (
-					" and ({child_doc}.uom='{item_uom}' or IFNULL({child_doc}.uom, '')='')".format(
-						child_doc=child_doc, item_uom=args.get("uom")
-					)
-				)
-			if "variant_of" not in args:
-				args.variant_of = frappe.get_cached_value("Item", args.item_code, "variant_of")
-
-			if args.variant_of:
-				item_variant_condition = f" or {child_doc}.item_code=%(variant_of)s "
-				values["variant_of"] = args.variant_of
-	elif apply_on_field == "item_group":
-		item_conditions = _get_tree_conditions(args, "Item Group", child_doc, False)
-		if args.get("uom", None):
-			item_conditions += " and ({child_doc}.uom='{item_uom}' or IFNULL({child_doc}.uom, '')='')".format(
-				child_doc=child_doc, item_uom=args.get("uom")
-			)
+	if args.get("uom", None) and apply_on_field in ["item_code", "item_group"]:
+		rows = [row for row in rows if row.uom == args.get("uom") or not row.uom]
+
+	rows += index.get_rows_of_other_rules(apply_on_field, value)
 
-	conditions += get_other_conditions(conditions, values, args)
-	warehouse_conditions = _get_tree_conditions(args, "Warehouse", "`tabPricing Rule`")
-	if warehouse_conditions:
-		warehouse_conditions = f" and {warehouse_conditions}"
+	if apply_on_field == "item_code":
+		if "variant_of" not in args:
+			args.variant_of = frappe.get_cached_value("Item", args.item_code, "variant_of")
+
+		if args.variant_of:
+			rows += index.get_rows(apply_on_field, [args.variant_of])
 
 	if not args.price_list:
 		args.price_list = None
 
-	conditions += " and ifnull(`tabPricing Rule`.for_price_list, '') in (%(price_list)s, '')"
-	values["price_list"] = args.get("price_list")
-
-	pricing_rules = (
-		frappe.db.sql(
-			"""select `tabPricing Rule`.*,
-			{child_doc}.{apply_on_field}, {child_doc}.uom
-		from `tabPricing Rule`, {child_doc}
-		where ({item_conditions} or (`tabPricing Rule`.apply_rule_on_other is not null
-			and `tabPricing Rule`.{apply_on_other_field}=%({apply_on_field})s) {item_variant_condition})
-			and {child_doc}.parent = `tabPricing Rule`.name
-			and `tabPricing Rule`.disable = 0 and
-			`tabPricing Rule`.{transaction_type} = 1 {warehouse_cond} {conditions}
-		order by `tabPricing Rule`.priority desc,
-			`tabPricing Rule`.name desc""".format(
-				child_doc=child_doc,
-				apply_on_field=apply_on_field,
-				item_conditions=item_conditions,
-				item_variant_condition=item_variant_condition,
-				transaction_type=args.transaction_type,
-				warehouse_cond=warehouse_conditions,
-				apply_on_other_field=f"other_{apply_on_field}",
-				conditions=conditions,
-			),
-			values,
-			as_dict=1,
-		)
-		or []
+	# a child row matching more than one condition is a single candidate
+	rows = list(
+		{
+			row.name: row for row in rows if is_pricing_rule_applicable(index.get_rule(row.parent), args)
+		}.values()
 	)
 
-	return pricing_rules
+	rows.sort(key=lambda row: cstr(row.parent), reverse=True)
+	rows.sort(key=lambda row: get_priority_key(index.get_rule(row.parent)), reverse=True)
+
+	rules = index.get_rule_details([row.parent for row in rows])
+	return [
+		frappe._dict(rules[row.parent], **{apply_on_field: row.value, "uom": row.uom})
+		for row in rows
+		if row.parent in rules
+	]
+
+
+def is_pricing_rule_applicable(pricing_rule, args):
+	"""Whether the pricing rule applies to the transaction, other than for the item it is applied on."""
+	for field in ["company", "customer", "supplier", "campaign", "sales_partner"]:
+		if cstr(pricing_rule.get(field)) not in ["", cstr(args.get(field))]:
+			return False
+
+	for parenttype in ["Customer Group", "Territory", "Supplier Group", "Warehouse"]:
+		tree_values = _get_tree_values(args, parenttype)
+		if tree_values and cstr(pricing_rule.get(frappe.scrub(parenttype))) not in tree_values:
+			return False
+
+	if args.get("transaction_date") and not (
+		getdate(pricing_rule.valid_from or "2000-01-01")
+		<= getdate(args.get("transaction_date"))
+		<= getdate(pricing_rule.valid_upto or "2500-12-31")
+	):
+		return False
+
+	if cstr(pricing_rule.for_price_list) not in ["", cstr(args.get("price_list"))]:
+		return False
+
+	selling_or_buying = "selling" if args.get("doctype") in SELLING_DOCTYPES else "buying"
+	return bool(cint(pricing_rule.get(selling_or_buying)))
+
+
+def get_priority_key(pricing_rule):
+	# priority is sorted as text, with rules without one last
+	return (pricing_rule.priority is not None, cstr(pricing_rule.priority))
 
 
 def apply_multiple_pricing_rules(pricing_rules):
@@ -191,6 +275,27 @@ def _get_tree_conditions(args, parenttype, table, allow_blank=True):
 		if key in frappe.flags.tree_conditions:
 			return frappe.flags.tree_conditions[key]
 
+		parent_groups = _get_tree_values(args, parenttype, allow_blank)
+		if parent_groups:
+			condition = "ifnull({table}.{field}, '') in ({parent_groups})".format(
+				table=table, field=field, parent_groups=", ".join(frappe.db.escape(d) for d in parent_groups)
+			)
+
+			frappe.flags.tree_conditions[key] = condition
+	return condition
+
+
+def _get_tree_values(args, parenttype, allow_blank=True):
+	"""Names of the ancestors of the group or warehouse of the transaction, and of the root group."""
+	field = frappe.scrub(parenttype)
+	if not args.get(field):
+		return []
+
+	if not frappe.flags.tree_values:
+		frappe.flags.tree_values = {}
+
+	key = (parenttype, args.get(field))
+	if key not in frappe.flags.tree_values:
 		try:
 			lft, rgt = frappe.db.get_value(parenttype, args.get(field), ["lft", "rgt"])
 		except TypeError:
@@ -215,15 +320,13 @@ def _get_tree_conditions(args, parenttype, table, allow_blank=True):
 			if root_name and root_name[0][0]:
 				parent_groups.append(root_name[0][0])
 
-		if parent_groups:
-			if allow_blank:
-				parent_groups.append("")
-			condition = "ifnull({table}.{field}, '') in ({parent_groups})".format(
-				table=table, field=field, parent_groups=", ".join(frappe.db.escape(d) for d in parent_groups)
-			)
+		frappe.flags.tree_values[key] = parent_groups
 
-			frappe.flags.tree_conditions[key] = condition
-	return condition
+	parent_groups = frappe.flags.tree_values[key]
+	if parent_groups and allow_blank:
+		return [*parent_groups, ""]
+
+	return parent_groups
 
 
 def get_other_conditions(conditions, values, args):
@@ -244,18 +347,7 @@ def get_other_conditions(conditions, values, args):
 			and ifnull(`tabPricing Rule`.valid_upto, '2500-12-31')"""
 		values["transaction_date"] = args.get("transaction_date")
 
-	if args.get("doctype") in [
-		"Quotation",
-		"Quotation Item",
-		"Sales Order",
-		"Sales Order Item",
-		"Delivery Note",
-		"Delivery Note Item",
-		"Sales Invoice",
-		"Sales Invoice Item",
-		"POS Invoice",
-		"POS Invoice Item",
-	]:
+	if args.get("doctype") in SELLING_DOCTYPES:
 		conditions += """ and ifnull(`tabPricing Rule`.selling, 0) = 1"""
 	else:
 		conditions += """ and ifnull(`tabPricing Rule`.buying, 0) = 1"""
@@ -500,6 +592,21 @@ def get_qty_amount_data_for_cumulative(pr_doc, doc, items=None):
 	sum_qty, sum_amt = [0, 0]
 	doctype = doc.get("parenttype") or doc.doctype
 
+	cache = get_document_pricing_rule_cache()
+	if cache and items:
+		data_set = cache.get_cumulative_data(pr_doc, doctype, items).values()
+	else:
+		data_set = get_cumulative_data(pr_doc, doctype, items).values()
+
+	for stock_qty, amount in data_set:
+		sum_qty += stock_qty
+		sum_amt += amount
+
+	return [sum_qty, sum_amt]
+
+
+def get_cumulative_data(pr_doc, doctype, items=None) -> dict:
+	"""Quantity and amount in submitted transactions within the validity of the rule, per item it applies on."""
 	date_field = (
 		"transaction_date" if frappe.get_meta(doctype).has_field("transaction_date") else "posting_date"
 	)
@@ -526,23 +633,20 @@ def get_qty_amount_data_for_cumulative(pr_doc, doc, items=None):
 		values.extend(items)
 
 	data_set = frappe.db.sql(
-		f""" SELECT `tab{child_doctype}`.stock_qty,
-			`tab{child_doctype}`.amount
+		f""" SELECT `tab{child_doctype}`.{apply_on} as apply_on_value,
+			ifnull(sum(`tab{child_doctype}`.stock_qty), 0) as stock_qty,
+			ifnull(sum(`tab{child_doctype}`.amount), 0) as amount
 		FROM `tab{child_doctype}`, `tab{doctype}`
 		WHERE
 			`tab{child_doctype}`.parent = `tab{doctype}`.name and `tab{doctype}`.{date_field}
 			between %s and %s and `tab{doctype}`.docstatus = 1
-			{condition} group by `tab{child_doctype}`.name
+			{condition} group by `tab{child_doctype}`.{apply_on}
 	""",
 		tuple(values),
 		as_dict=1,
 	)
 
-	for data in data_set:
-		sum_qty += data.get("stock_qty")
-		sum_amt += data.get("amount")
-
-	return [sum_qty, sum_amt]
+	return {data.apply_on_value: (data.stock_qty, data.amount) for data in data_set}
 
 
 def apply_pricing_rule_on_transaction(doc):
@@ -717,6 +821,13 @@ def apply_pricing_rule_for_free_items(doc, pricing_rule_args):
 
 
 def get_pricing_rule_items(pr_doc, other_items=False) -> list:
+	if cache := get_document_pricing_rule_cache():
+		return cache.get_pricing_rule_items(pr_doc, other_items)
+
+	return _get_pricing_rule_items(pr_doc, other_items)
+
+
+def _get_pricing_rule_items(pr_doc, other_items=False) -> list:
 	apply_on_data = []
 	apply_on = frappe.scrub(pr_doc.get("apply_on"))
 
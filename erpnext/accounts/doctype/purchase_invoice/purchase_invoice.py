@@ -10,6 +10,10 @@ from frappe.utils import cint, cstr, flt, formatdate, get_link_to_form, getdate,
 
 import erpnext
 from erpnext.accounts.deferred_revenue import validate_service_stop_date
+from erpnext.accounts.doctype.account_daily_balance.account_daily_balance import (
+	is_account_daily_balance_enabled,
+	update_account_daily_balances,
+)
 from erpnext.accounts.doctype.gl_entry.gl_entry import update_outstanding_amt
 from erpnext.accounts.doctype.repost_accounting_ledger.repost_accounting_ledger import (
 	validate_docs_for_deferred_accounting,
@@ -827,15 +831,19 @@ class PurchaseInvoice(BuyingController):
 		if rows:
 			# cancel gl entries
 			gle = qb.DocType("GL Entry")
-			gle_update_query = (
-				qb.update(gle)
-				.set(gle.is_cancelled, 1)
-				.where(
-					(gle.voucher_type == "Purchase Receipt")
-					& (gle.voucher_no.isin(purchase_receipts))
-					& (gle.voucher_detail_no.isin(rows))
-				)
+			conditions = (
+				(gle.voucher_type == "Purchase Receipt")
+				& (gle.voucher_no.isin(purchase_receipts))
+				& (gle.voucher_detail_no.isin(rows))
+				& (gle.is_cancelled == 0)
 			)
+
+			if is_account_daily_balance_enabled():
+				update_account_daily_balances(
+					qb.from_(gle).select("*").where(conditions).run(as_dict=True), cancel=True
+				)
+
+			gle_update_query = qb.update(gle).set(gle.is_cancelled, 1).where(conditions)
 			gle_update_query.run()
 
 	def update_supplier_outstanding(self, update_outstanding):
@@ -11,15 +11,22 @@ from frappe.utils import cint, flt, formatdate, get_link_to_form, getdate, now
 from frappe.utils.dashboard import cache_source
 
 import erpnext
+from erpnext.accounts.doctype.account_daily_balance.account_daily_balance import (
+	is_account_daily_balance_enabled,
+	update_account_daily_balances,
+)
 from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 	get_accounting_dimensions,
 )
 from erpnext.accounts.doctype.accounting_dimension_filter.accounting_dimension_filter import (
+	get_account_dimension_filters,
 	get_dimension_filter_map,
+	validate_dimension_filters,
 )
 from erpnext.accounts.doctype.accounting_period.accounting_period import ClosedAccountingPeriod
 from erpnext.accounts.doctype.budget.budget import validate_expense_against_budget
-from erpnext.accounts.utils import create_payment_ledger_entry
+from erpnext.accounts.doctype.gl_entry.gl_entry import update_outstanding_amt
+from erpnext.accounts.utils import create_payment_ledger_entry, submit_ledger_entries
 from erpnext.exceptions import InvalidAccountDimensionError, MandatoryAccountDimensionError
 
 
@@ -91,23 +98,8 @@ def make_acc_dimensions_offsetting_entry(gl_map):
 
 
 def get_accounting_dimensions_for_offsetting_entry(gl_map, company):
-	acc_dimension = frappe.qb.DocType("Accounting Dimension")
-	dimension_detail = frappe.qb.DocType("Accounting Dimension Detail")
-
-	acc_dimensions = (
-		frappe.qb.from_(acc_dimension)
-		.inner_join(dimension_detail)
-		.on(acc_dimension.name == dimension_detail.parent)
-		.select(acc_dimension.fieldname, acc_dimension.name, dimension_detail.offsetting_account)
-		.where(
-			(acc_dimension.disabled == 0)
-			& (dimension_detail.company == company)
-			& (dimension_detail.automatically_post_balancing_accounting_entry == 1)
-		)
-	).run(as_dict=True)
-
 	accounting_dimensions_to_offset = []
-	for acc_dimension in acc_dimensions:
+	for acc_dimension in get_offsetting_accounting_dimensions(company):
 		values = set([entry.get(acc_dimension.fieldname) for entry in gl_map])
 		if len(values) > 1:
 			accounting_dimensions_to_offset.append(acc_dimension)
@@ -115,6 +107,28 @@ def get_accounting_dimensions_for_offsetting_entry(gl_map, company):
 	return accounting_dimensions_to_offset
 
 
+def get_offsetting_accounting_dimensions(company):
+	acc_dimensions = frappe.cache().hget("accounting_dimensions_for_offsetting", company)
+	if acc_dimensions is None:
+		acc_dimension = frappe.qb.DocType("Accounting Dimension")
+		dimension_detail = frappe.qb.DocType("Accounting Dimension Detail")
+
+		acc_dimensions = (
+			frappe.qb.from_(acc_dimension)
+			.inner_join(dimension_detail)
+			.on(acc_dimension.name == dimension_detail.parent)
+			.select(acc_dimension.fieldname, acc_dimension.name, dimension_detail.offsetting_account)
+			.where(
+				(acc_dimension.disabled == 0)
+				& (dimension_detail.company == company)
+				& (dimension_detail.automatically_post_balancing_accounting_entry == 1)
+			)
+		).run(as_dict=True)
+		frappe.cache().hset("accounting_dimensions_for_offsetting", company, acc_dimensions)
+
+	return acc_dimensions
+
+
 def validate_disabled_accounts(gl_map):
 	accounts = [d.account for d in gl_map if d.account]
 
@@ -364,7 +378,7 @@ def save_entries(gl_map, adv_adj, update_outstanding, from_repost=False):
 
 	process_debit_credit_difference(gl_map)
 
-	dimension_filter_map = get_dimension_filter_map()
+	account_dimension_filters = get_account_dimension_filters(gl_map[0]["company"])
 	if gl_map:
 		check_freezing_date(gl_map[0]["posting_date"], adv_adj)
 		is_opening = any(d.get("is_opening") == "Yes" for d in gl_map)
@@ -372,11 +386,38 @@ def save_entries(gl_map, adv_adj, update_outstanding, from_repost=False):
 			validate_against_pcv(is_opening, gl_map[0]["posting_date"], gl_map[0]["company"])
 
 	for entry in gl_map:
-		validate_allowed_dimensions(entry, dimension_filter_map)
-		make_entry(entry, adv_adj, update_outstanding, from_repost)
+		validate_allowed_dimensions(entry, account_dimension_filters)
+
+	# all entries are inserted together, and the outstanding of each voucher is updated once
+	outstanding_vouchers = set()
+	gl_entries = [
+		get_gl_entry_doc(entry, adv_adj, update_outstanding, from_repost, outstanding_vouchers)
+		for entry in gl_map
+	]
+	submit_ledger_entries(gl_entries)
+
+	for voucher in outstanding_vouchers:
+		update_outstanding_amt(*voucher)
+
+	if not from_repost:
+		for entry in gl_map:
+			if entry.get("voucher_type") != "Period Closing Voucher":
+				validate_expense_against_budget(entry)
+
+	update_account_daily_balances(gl_entries)
 
 
 def make_entry(args, adv_adj, update_outstanding, from_repost=False):
+	gle = get_gl_entry_doc(args, adv_adj, update_outstanding, from_repost)
+	gle.submit()
+
+	if not from_repost and gle.voucher_type != "Period Closing Voucher":
+		validate_expense_against_budget(args)
+
+	return gle
+
+
+def get_gl_entry_doc(args, adv_adj, update_outstanding, from_repost=False, outstanding_vouchers=None):
 	gle = frappe.new_doc("GL Entry")
 	gle.update(args)
 	gle.flags.ignore_permissions = 1
@@ -384,10 +425,8 @@ def make_entry(args, adv_adj, update_outstanding, from_repost=False):
 	gle.flags.adv_adj = adv_adj
 	gle.flags.update_outstanding = update_outstanding or "Yes"
 	gle.flags.notify_update = False
-	gle.submit()
-
-	if not from_repost and gle.voucher_type != "Period Closing Voucher":
-		validate_expense_against_budget(args)
+	gle.flags.outstanding_vouchers = outstanding_vouchers
+	return gle
 
 
 def validate_cwip_accounts(gl_map):
@@ -644,31 +683,42 @@ def make_reverse_gl_entries(
 			# Only cancel GL entries for unlinked reference using `voucher_detail_no`
 			gle = frappe.qb.DocType("GL Entry")
 			for x in gl_entries:
+				conditions = (
+					(gle.company == x.company)
+					& (gle.account == x.account)
+					& (gle.party_type == x.party_type)
+					& (gle.party == x.party)
+					& (gle.voucher_type == x.voucher_type)
+					& (gle.voucher_no == x.voucher_no)
+					& (gle.against_voucher_type == x.against_voucher_type)
+					& (gle.against_voucher == x.against_voucher)
+					& (gle.voucher_detail_no == x.voucher_detail_no)
+				)
 				query = (
 					frappe.qb.update(gle)
 					.set(gle.modified, now())
 					.set(gle.modified_by, frappe.session.user)
-					.where(
-						(gle.company == x.company)
-						& (gle.account == x.account)
-						& (gle.party_type == x.party_type)
-						& (gle.party == x.party)
-						& (gle.voucher_type == x.voucher_type)
-						& (gle.voucher_no == x.voucher_no)
-						& (gle.against_voucher_type == x.against_voucher_type)
-						& (gle.against_voucher == x.against_voucher)
-						& (gle.voucher_detail_no == x.voucher_detail_no)
-					)
+					.where(conditions)
 				)
 
 				if not immutable_ledger_enabled:
 					query = query.set(gle.is_cancelled, True)
 
+					if is_account_daily_balance_enabled():
+						update_account_daily_balances(
+							frappe.qb.from_(gle)
+							.select("*")
+							.where(conditions & (gle.is_cancelled == 0))
+							.run(as_dict=True),
+							cancel=True,
+						)
+
 				query.run()
 		else:
 			if not immutable_ledger_enabled:
 				set_as_cancel(gl_entries[0]["voucher_type"], gl_entries[0]["voucher_no"])
 
+		reverse_gl_entries = []
 		for entry in gl_entries:
 			new_gle = copy.deepcopy(entry)
 			new_gle["name"] = None
@@ -691,7 +741,9 @@ def make_reverse_gl_entries(
 				new_gle["posting_date"] = frappe.form_dict.get("posting_date") or getdate()
 
 			if new_gle["debit"] or new_gle["credit"]:
-				make_entry(new_gle, adv_adj, "Yes")
+				reverse_gl_entries.append(make_entry(new_gle, adv_adj, "Yes"))
+
+		update_account_daily_balances(reverse_gl_entries)
 
 
 def check_freezing_date(posting_date, adv_adj=False):
@@ -740,6 +792,16 @@ def set_as_cancel(voucher_type, voucher_no):
 	"""
 	Set is_cancelled=1 in all original gl entries for the voucher
 	"""
+	if is_account_daily_balance_enabled():
+		update_account_daily_balances(
+			frappe.get_all(
+				"GL Entry",
+				filters={"voucher_type": voucher_type, "voucher_no": voucher_no, "is_cancelled": 0},
+				fields=["*"],
+			),
+			cancel=True,
+		)
+
 	frappe.db.sql(
 		"""UPDATE `tabGL Entry` SET is_cancelled = 1,
 		modified=%s, modified_by=%s
@@ -748,40 +810,8 @@ def set_as_cancel(voucher_type, voucher_no):
 	)
 
 
-def validate_allowed_dimensions(gl_entry, dimension_filter_map):
-	for key, value in dimension_filter_map.items():
-		dimension = key[0]
-		account = key[1]
-
-		if gl_entry.account == account:
-			if value["is_mandatory"] and not gl_entry.get(dimension):
-				frappe.throw(
-					_("{0} is mandatory for account {1}").format(
-						frappe.bold(frappe.unscrub(dimension)), frappe.bold(gl_entry.account)
-					),
-					MandatoryAccountDimensionError,
-				)
-
-			if value["allow_or_restrict"] == "Allow":
-				if gl_entry.get(dimension) and gl_entry.get(dimension) not in value["allowed_dimensions"]:
-					frappe.throw(
-						_("Invalid value {0} for {1} against account {2}").format(
-							frappe.bold(gl_entry.get(dimension)),
-							frappe.bold(frappe.unscrub(dimension)),
-							frappe.bold(gl_entry.account),
-						),
-						InvalidAccountDimensionError,
-					)
-			else:
-				if gl_entry.get(dimension) and gl_entry.get(dimension) in value["allowed_dimensions"]:
-					frappe.throw(
-						_("Invalid value {0} for {1} against account {2}").format(
-							frappe.bold(gl_entry.get(dimension)),
-							frappe.bold(frappe.unscrub(dimension)),
-							frappe.bold(gl_entry.account),
-						),
-						InvalidAccountDimensionError,
-					)
+def validate_allowed_dimensions(gl_entry, account_dimension_filters):
+	validate_dimension_filters(gl_entry, account_dimension_filters)
 
 
 def is_immutable_ledger_enabled():
@@ -7,13 +7,16 @@ from collections import OrderedDict
 import frappe
 from frappe import _, qb, query_builder, scrub
 from frappe.query_builder import Criterion
-from frappe.query_builder.functions import Date, Substring, Sum
+from frappe.query_builder.functions import Count, Date, Substring, Sum
 from frappe.utils import cint, cstr, flt, getdate, nowdate
 
 from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 	get_accounting_dimensions,
 	get_dimension_with_children,
 )
+from erpnext.accounts.doctype.payment_ledger_outstanding.payment_ledger_outstanding import (
+	use_payment_ledger_outstanding,
+)
 from erpnext.accounts.utils import get_currency_precision, get_party_types_from_account_type
 
 #  This report gives a summary of all Outstanding Invoices considering the following
@@ -30,6 +33,11 @@ from erpnext.accounts.utils import get_currency_precision, get_party_types_from_
 #  8. Invoice details like Sales Persons, Delivery Notes are also fetched comma separated
 #  9. Report amounts are in party currency if in_party_currency is selected, otherwise company currency
 # 10. This report is based on Payment Ledger Entries
+# 11. If enabled in Accounts Settings, the ledger is processed a few parties at a time to limit memory usage
+# 12. If voucher outstanding is maintained, only the ledger entries of open vouchers are fetched for today
+
+# number of Payment Ledger Entries processed at a time when the report is built party-wise
+PARTY_WISE_CHUNK_SIZE = 10000
 
 
 def execute(filters=None):
@@ -77,6 +85,10 @@ class ReceivablePayableReport:
 		self.party_details = {}
 		self.invoices = set()
 		self.skip_total_row = 0
+		self.party_wise = cint(
+			frappe.db.get_single_value("Accounts Settings", "process_receivable_payable_party_wise")
+		)
+		self.parties = None
 
 		if self.filters.get("group_by_party"):
 			self.previous_party = ""
@@ -90,6 +102,10 @@ class ReceivablePayableReport:
 				self.skip_total_row = 1
 
 	def get_data(self):
+		if self.party_wise:
+			self.get_data_party_wise()
+			return
+
 		self.get_ple_entries()
 		self.get_sales_invoices_or_customers_based_on_sales_person()
 		self.voucher_balance = OrderedDict()
@@ -116,6 +132,65 @@ class ReceivablePayableReport:
 			self.update_voucher_balance(ple)
 
 		self.build_data()
+		self.append_total_rows()
+
+	def get_data_party_wise(self):
+		# balances, invoice details and future payments are only held for the parties being processed
+		self.get_sales_invoices_or_customers_based_on_sales_person()
+		self.get_exchange_rate_revaluations()
+		self.data = []
+
+		query = self.get_ple_query()
+		for parties in self.get_party_chunks():
+			self.parties = parties
+			self.ple_entries = query.where(self.ple.party.isin(parties)).run(as_dict=True)
+			if not self.ple_entries:
+				continue
+
+			self.invoices = set()
+			self.party_details = {}
+			self.voucher_balance = OrderedDict()
+			self.init_voucher_balance()
+
+			self.build_delivery_note_map()
+			self.get_invoice_details()
+			self.get_future_payments()
+			self.get_return_entries()
+
+			for ple in self.ple_entries:
+				self.update_voucher_balance(ple)
+
+			self.build_data()
+
+		self.ple_entries = []
+		self.voucher_balance = OrderedDict()
+		self.append_total_rows()
+
+	def get_party_chunks(self):
+		# group parties in ledger order so that each chunk has about PARTY_WISE_CHUNK_SIZE entries,
+		# a party with more entries than that is processed on its own
+		ple = self.ple
+		parties = (
+			qb.from_(ple)
+			.select(ple.party, Count(ple.name))
+			.where(ple.delinked == 0)
+			.where(Criterion.all(self.qb_selection_filter))
+			.where(Criterion.any(self.or_filters))
+			.groupby(ple.party)
+			.orderby(ple.party)
+		).run()
+
+		chunk, chunk_size = [], 0
+		for party, count in parties:
+			if chunk and chunk_size + count > PARTY_WISE_CHUNK_SIZE:
+				yield chunk
+				chunk, chunk_size = [], 0
+
+			chunk.append(party)
+			chunk_size += count
+
+		if chunk:
+			yield chunk
 
 	def build_voucher_dict(self, ple):
 		return frappe._dict(
@@ -341,6 +416,7 @@ class ReceivablePayableReport:
 				else:
 					self.append_row(row)
 
+	def append_total_rows(self):
 		if self.filters.get("group_by_party"):
 			self.append_subtotal_row(self.previous_party)
 			if self.data:
@@ -417,17 +493,26 @@ class ReceivablePayableReport:
 
 	def get_invoice_details(self):
 		self.invoice_details = frappe._dict()
+		values = {"report_date": self.filters.report_date, "company": self.filters.company}
+
+		voucher_condition = sales_team_condition = ""
+		if self.party_wise:
+			values["vouchers"] = tuple({row.voucher_no for row in self.voucher_balance.values()})
+			voucher_condition = "and name in %(vouchers)s"
+			sales_team_condition = "and parent in %(vouchers)s"
+
 		if self.account_type == "Receivable":
 			# nosemgrep
 			si_list = frappe.db.sql(
-				"""
+				f"""
 				select name, due_date, po_no
 				from `tabSales Invoice`
-				where posting_date <= %s
-					and company = %s
+				where posting_date <= %(report_date)s
+					and company = %(company)s
 					and docstatus = 1
+					{voucher_condition}
 			""",
-				(self.filters.report_date, self.filters.company),
+				values,
 				as_dict=1,
 			)
 			for d in si_list:
@@ -437,11 +522,13 @@ class ReceivablePayableReport:
 			if self.filters.show_sales_person:
 				# nosemgrep
 				sales_team = frappe.db.sql(
-					"""
+					f"""
 					select parent, sales_person
 					from `tabSales Team`
 					where parenttype = 'Sales Invoice'
+						{sales_team_condition}
 				""",
+					values,
 					as_dict=1,
 				)
 				for d in sales_team:
@@ -452,15 +539,16 @@ class ReceivablePayableReport:
 		if self.account_type == "Payable":
 			# nosemgrep
 			for pi in frappe.db.sql(
-				"""
+				f"""
 				select name, due_date, bill_no, bill_date
 				from `tabPurchase Invoice`
 				where
-					posting_date <= %s
-					and company = %s
+					posting_date <= %(report_date)s
+					and company = %(company)s
 					and docstatus = 1
+					{voucher_condition}
 			""",
-				(self.filters.report_date, self.filters.company),
+				values,
 				as_dict=1,
 			):
 				self.invoice_details.setdefault(pi.name, pi)
@@ -468,15 +556,16 @@ class ReceivablePayableReport:
 		# Invoices booked via Journal Entries
 		# nosemgrep
 		journal_entries = frappe.db.sql(
-			"""
+			f"""
 			select name, due_date, bill_no, bill_date
 			from `tabJournal Entry`
 			where
-				posting_date <= %s
-				and company = %s
+				posting_date <= %(report_date)s
+				and company = %(company)s
 				and docstatus = 1
+				{voucher_condition}
 		""",
-			(self.filters.report_date, self.filters.company),
+			values,
 			as_dict=1,
 		)
 
@@ -613,7 +702,7 @@ class ReceivablePayableReport:
 		pe_ref = frappe.qb.DocType("Payment Entry Reference")
 		ifelse = query_builder.CustomFunction("IF", ["condition", "then", "else"])
 
-		return (
+		query = (
 			frappe.qb.from_(pe)
 			.inner_join(pe_ref)
 			.on(pe_ref.parent == pe.name)
@@ -635,7 +724,12 @@ class ReceivablePayableReport:
 				& (pe.posting_date > self.filters.report_date)
 				& (pe.party_type.isin(self.party_type))
 			)
-		).run(as_dict=True)
+		)
+
+		if self.party_wise:
+			query = query.where(pe.party.isin(self.parties))
+
+		return query.run(as_dict=True)
 
 	def get_future_payments_from_journal_entry(self):
 		je = frappe.qb.DocType("Journal Entry")
@@ -660,6 +754,9 @@ class ReceivablePayableReport:
 			)
 		)
 
+		if self.party_wise:
+			query = query.where(jea.party.isin(self.parties))
+
 		if self.filters.get("party"):
 			if self.account_type == "Payable":
 				query = query.select(
@@ -734,6 +831,10 @@ class ReceivablePayableReport:
 			party_field = scrub(party_type)
 			if self.filters.get(party_field):
 				or_filters.update({party_field: self.filters.get(party_field)})
+
+		if self.party_wise:
+			filters["customer" if self.account_type == "Receivable" else "supplier"] = ("in", self.parties)
+
 		self.return_entries = frappe._dict(
 			frappe.get_all(
 				doctype, filters=filters, or_filters=or_filters, fields=["name", "return_against"], as_list=1
@@ -774,7 +875,9 @@ class ReceivablePayableReport:
 
 	def get_ple_entries(self):
 		# get all the GL entries filtered by the given filters
+		self.ple_entries = self.get_ple_query().run(as_dict=True)
 
+	def get_ple_query(self):
 		self.prepare_conditions()
 
 		if self.filters.show_future_payments:
@@ -788,6 +891,9 @@ class ReceivablePayableReport:
 		else:
 			self.qb_selection_filter.append(self.ple.posting_date.lte(self.filters.report_date))
 
+		if self.can_use_payment_ledger_outstanding():
+			self.qb_selection_filter.append(Criterion.any(self.get_open_voucher_conditions()))
+
 		ple = qb.DocType("Payment Ledger Entry")
 		query = (
 			qb.from_(ple)
@@ -820,12 +926,68 @@ class ReceivablePayableReport:
 			else:
 				query = query.select(ple.remarks)
 
-		if self.filters.get("group_by_party"):
+		if self.filters.get("group_by_party") or self.party_wise:
 			query = query.orderby(self.ple.party, self.ple.posting_date)
 		else:
 			query = query.orderby(self.ple.posting_date, self.ple.party)
 
-		self.ple_entries = query.run(as_dict=True)
+		return query
+
+	def can_use_payment_ledger_outstanding(self):
+		# vouchers closed as on today are closed as on a later date as well, but ledger entries
+		# filtered by cost center, finance book or dimensions can leave a closed voucher open
+		if self.filters.report_date < getdate(nowdate()):
+			return False
+
+		if self.filters.cost_center or self.filters.finance_book:
+			return False
+
+		if any(self.filters.get(d.fieldname) for d in get_accounting_dimensions(as_list=False)):
+			return False
+
+		return use_payment_ledger_outstanding()
+
+	def get_open_voucher_conditions(self):
+		# vouchers which have an outstanding or ledger entries after the report date
+		plo = qb.DocType("Payment Ledger Outstanding")
+		future_ple = qb.DocType("Payment Ledger Entry").as_("future_ple")
+
+		open_vouchers = (
+			qb.from_(plo)
+			.select(plo.voucher_no)
+			.where((plo.outstanding != 0) | (plo.outstanding_in_account_currency != 0))
+		)
+		future_vouchers = (
+			qb.from_(future_ple)
+			.select(future_ple.against_voucher_no)
+			.where((future_ple.delinked == 0) & (future_ple.posting_date > self.filters.report_date))
+		)
+
+		if self.filters.company:
+			open_vouchers = open_vouchers.where(plo.company == self.filters.company)
+			future_vouchers = future_vouchers.where(future_ple.company == self.filters.company)
+
+		conditions = [
+			self.ple.against_voucher_no.isin(open_vouchers),
+			self.ple.against_voucher_no.isin(future_vouchers),
+		]
+
+		# payments against a return are shown against the invoice it was made against
+		doctype = "Sales Invoice" if self.account_type == "Receivable" else "Purchase Invoice"
+		inv = qb.DocType(doctype)
+		conditions.append(
+			self.ple.against_voucher_no.isin(
+				qb.from_(inv)
+				.select(inv.return_against)
+				.where(
+					(inv.is_return == 1)
+					& (inv.docstatus == 1)
+					& (inv.name.isin(open_vouchers) | inv.name.isin(future_vouchers))
+				)
+			)
+		)
+
+		return conditions
 
 	def get_sales_invoices_or_customers_based_on_sales_person(self):
 		if self.filters.get("sales_person"):
@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 import frappe
 from frappe import qb
 from frappe.tests import IntegrationTestCase
@@ -735,6 +737,56 @@ class TestAccountsReceivable(AccountsTestMixin, IntegrationTestCase):
 		output_for = set([x.party for x in report[1]])
 		self.assertEqual(output_for, expected_output)
 
+	def test_party_wise_processing(self):
+		customers = [self.customer]
+		for customer in ("_Test Customer 2", "_Test Customer 3"):
+			self.create_customer(customer)
+			customers.append(self.customer)
+
+		for customer in customers:
+			si = self.create_sales_invoice(do_not_submit=True)
+			si.customer = customer
+			si.save().submit()
+
+		si = self.create_sales_invoice(no_payment_schedule=True, do_not_submit=True)
+		si.customer = customers[1]
+		si.save().submit()
+		self.create_payment_entry(si.name)
+
+		def get_rows(report):
+			fields = ("party", "voucher_no", "due_date", "invoiced", "paid", "outstanding", "range1")
+			return sorted(
+				tuple(row.get(field) for field in fields) for row in report if row.get("voucher_no")
+			)
+
+		for group_by_party in (False, True):
+			with self.subTest(group_by_party=group_by_party):
+				filters = {
+					"company": self.company,
+					"report_date": today(),
+					"range": "30, 60, 90, 120",
+					"based_on_payment_terms": 1,
+					"group_by_party": group_by_party,
+				}
+				expected = execute(filters)[1]
+
+				with (
+					self.change_settings("Accounts Settings", {"process_receivable_payable_party_wise": 1}),
+					patch(
+						"erpnext.accounts.report.accounts_receivable.accounts_receivable.PARTY_WISE_CHUNK_SIZE",
+						1,
+					),
+				):
+					report = execute(filters)[1]
+
+				self.assertEqual(get_rows(report), get_rows(expected))
+				self.assertEqual(
+					[row.get("party") for row in report if row.get("voucher_no")],
+					sorted(row.get("party") for row in report if row.get("voucher_no")),
+				)
+				if group_by_party:
+					self.assertEqual(report[-1].get("outstanding"), expected[-1].get("outstanding"))
+
 	def test_report_output_if_party_is_missing(self):
 		acc_name = "Additional Debtors"
 		if not frappe.db.get_value("Account", filters={"account_name": acc_name, "company": self.company}):
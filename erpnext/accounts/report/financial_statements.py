@@ -9,6 +9,8 @@ import re
 
 import frappe
 from frappe import _
+from frappe.query_builder import Case
+from frappe.query_builder.functions import Min, Sum
 from frappe.utils import add_days, add_months, cint, cstr, flt, formatdate, get_first_day, getdate
 from pypika.terms import ExistsCriterion
 
@@ -189,6 +191,7 @@ def get_data(
 			root.rgt,
 			root_type=root_type,
 			ignore_closing_entries=ignore_closing_entries,
+			period_list=period_list,
 		)
 
 	calculate_values(
@@ -428,8 +431,9 @@ def set_gl_entries_by_account(
 	root_type=None,
 	ignore_closing_entries=False,
 	ignore_opening_entries=False,
+	period_list=None,
 ):
-	"""Returns a dict like { "account": [gl entries], ... }"""
+	"""Returns a dict like { "account": [gl entries summed up per period], ... }"""
 	gl_entries = []
 
 	# For balance sheet
@@ -459,6 +463,7 @@ def set_gl_entries_by_account(
 				root_type,
 				ignore_closing_entries,
 				last_period_closing_voucher[0].name,
+				period_list=period_list,
 			)
 			from_date = add_days(last_period_closing_voucher[0].period_end_date, 1)
 			ignore_opening_entries = True
@@ -473,6 +478,7 @@ def set_gl_entries_by_account(
 		root_type,
 		ignore_closing_entries,
 		ignore_opening_entries=ignore_opening_entries,
+		period_list=period_list,
 	)
 
 	if filters and filters.get("presentation_currency"):
@@ -495,23 +501,31 @@ def get_accounting_entries(
 	ignore_closing_entries=None,
 	period_closing_voucher=None,
 	ignore_opening_entries=False,
+	period_list=None,
 ):
 	gl_entry = frappe.qb.DocType(doctype)
 	query = (
 		frappe.qb.from_(gl_entry)
 		.select(
 			gl_entry.account,
-			gl_entry.debit,
-			gl_entry.credit,
-			gl_entry.debit_in_account_currency,
-			gl_entry.credit_in_account_currency,
+			Sum(gl_entry.debit).as_("debit"),
+			Sum(gl_entry.credit).as_("credit"),
+			Sum(gl_entry.debit_in_account_currency).as_("debit_in_account_currency"),
+			Sum(gl_entry.credit_in_account_currency).as_("credit_in_account_currency"),
 			gl_entry.account_currency,
 		)
 		.where(gl_entry.company == filters.company)
+		.groupby(gl_entry.account, gl_entry.account_currency)
 	)
 
 	if doctype == "GL Entry":
-		query = query.select(gl_entry.posting_date, gl_entry.is_opening, gl_entry.fiscal_year)
+		# entries of the same period are summed up and carry the earliest posting date among them
+		query = query.select(
+			Min(gl_entry.posting_date).as_("posting_date"), gl_entry.is_opening, gl_entry.fiscal_year
+		)
+		query = query.groupby(
+			gl_entry.is_opening, gl_entry.fiscal_year, get_period_of_posting_date(gl_entry, period_list)
+		)
 		query = query.where(gl_entry.is_cancelled == 0)
 		query = query.where(gl_entry.posting_date <= to_date)
 
@@ -519,6 +533,7 @@ def get_accounting_entries(
 			query = query.where(gl_entry.is_opening == "No")
 	else:
 		query = query.select(gl_entry.closing_date.as_("posting_date"))
+		query = query.groupby(gl_entry.closing_date)
 		query = query.where(gl_entry.period_closing_voucher == period_closing_voucher)
 
 	query = apply_additional_conditions(doctype, query, from_date, ignore_closing_entries, filters)
@@ -533,11 +548,32 @@ def get_accounting_entries(
 	match_conditions = build_match_conditions(doctype)
 
 	if match_conditions:
-		query += "and" + match_conditions
+		# permission conditions are part of the where clause, before the grouping
+		query, group_by, group_by_fields = query.partition(" GROUP BY ")
+		query += "and" + match_conditions + group_by + group_by_fields
 
 	return frappe.db.sql(query, params, as_dict=True)
 
 
+def get_period_of_posting_date(gl_entry, period_list=None):
+	"""SQL expression for the period in which an entry is posted, entries are grouped by it."""
+	if not period_list:
+		return gl_entry.posting_date
+
+	boundaries = set()
+	for period in period_list:
+		boundaries.add(getdate(period.from_date))
+		boundaries.add(add_days(getdate(period.to_date), 1))
+		if period.get("year_start_date"):
+			boundaries.add(getdate(period.year_start_date))
+
+	period_case = Case()
+	for idx, boundary in enumerate(sorted(boundaries)):
+		period_case = period_case.when(gl_entry.posting_date < boundary, idx)
+
+	return period_case.else_(len(boundaries))
+
+
 def get_account_filter_query(root_lft, root_rgt, root_type, gl_entry):
 	acc = frappe.qb.DocType("Account")
 	exists_query = (
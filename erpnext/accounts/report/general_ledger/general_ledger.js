@@ -215,6 +215,40 @@ frappe.query_reports["General Ledger"] = {
 			fieldtype: "Check",
 		},
 	],
+
+	onload: function (report) {
+		report.page.add_inner_button(__("Export Full Ledger"), function () {
+			const filters = report.get_values();
+			if (filters.group_by) {
+				frappe.msgprint(__("The full ledger is exported entry by entry, clear Group by to export it"));
+				return;
+			}
+
+			frappe.prompt(
+				{
+					fieldname: "file_format",
+					label: __("File Format"),
+					fieldtype: "Select",
+					options: ["Excel", "CSV"],
+					default: "Excel",
+					reqd: 1,
+				},
+				({ file_format }) => {
+					frappe.call({
+						method: "erpnext.accounts.report.general_ledger.general_ledger.export_ledger",
+						args: { filters, file_format },
+						callback: function () {
+							frappe.show_alert(
+								__("Exporting the General Ledger, you will be notified once it is ready")
+							);
+						},
+					});
+				},
+				__("Export Full Ledger"),
+				__("Export")
+			);
+		});
+	},
 };
 
 erpnext.utils.add_dimensions("General Ledger", 15);
@@ -3,12 +3,17 @@
 
 
 import copy
+import csv
 from collections import OrderedDict
 
 import frappe
+import openpyxl
 from frappe import _, _dict
+from frappe.desk.query_report import get_report_doc
 from frappe.query_builder import Criterion
-from frappe.utils import cstr, getdate
+from frappe.utils import cint, cstr, flt, getdate
+from frappe.utils.background_jobs import enqueue
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
 
 from erpnext import get_company_currency, get_default_company
 from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
@@ -19,6 +24,8 @@ from erpnext.accounts.report.financial_statements import get_cost_centers_with_c
 from erpnext.accounts.report.utils import convert_to_presentation_currency, get_currency
 from erpnext.accounts.utils import get_account_currency
 
+GL_PAGE_LENGTH = 10000
+
 
 def execute(filters=None):
 	if not filters:
@@ -26,12 +33,19 @@ def execute(filters=None):
 
 	account_details = {}
 
-	if filters and filters.get("print_in_account_currency") and not filters.get("account"):
-		frappe.throw(_("Select an account to print in account currency"))
-
 	for acc in frappe.db.sql("""select name, is_group from tabAccount""", as_dict=1):
 		account_details.setdefault(acc.name, acc)
 
+	filters = prepare_filters(filters, account_details)
+
+	columns = get_columns(filters)
+
+	res = get_result(filters, account_details)
+
+	return columns, res
+
+
+def prepare_filters(filters, account_details):
 	if filters.get("party"):
 		filters.party = frappe.parse_json(filters.get("party"))
 
@@ -39,19 +53,16 @@ def execute(filters=None):
 
 	validate_party(filters)
 
-	filters = set_account_currency(filters)
-
-	columns = get_columns(filters)
-
-	res = get_result(filters, account_details)
-
-	return columns, res
+	return set_account_currency(filters)
 
 
 def validate_filters(filters, account_details):
 	if not filters.get("company"):
 		frappe.throw(_("{0} is mandatory").format(_("Company")))
 
+	if filters.get("print_in_account_currency") and not filters.get("account"):
+		frappe.throw(_("Select an account to print in account currency"))
+
 	if not filters.get("from_date") and not filters.get("to_date"):
 		frappe.throw(
 			_("{0} and {1} are mandatory").format(frappe.bold(_("From Date")), frappe.bold(_("To Date")))
@@ -149,29 +160,67 @@ def get_result(filters, account_details):
 
 def get_gl_entries(filters, accounting_dimensions):
 	currency_map = get_currency(filters)
-	select_fields = """, debit, credit, debit_in_account_currency,
-		credit_in_account_currency """
+	gl_entries = select_gl_entries(filters, accounting_dimensions, get_ledger_conditions(filters))
+
+	if filters.get("presentation_currency"):
+		return convert_to_presentation_currency(gl_entries, currency_map)
+	else:
+		return gl_entries
 
-	if filters.get("show_remarks"):
-		if remarks_length := frappe.db.get_single_value("Accounts Settings", "general_ledger_remarks_length"):
-			select_fields += f",substr(remarks, 1, {remarks_length}) as 'remarks'"
-		else:
-			select_fields += """,remarks"""
 
-	order_by_statement = "order by posting_date, account, creation"
+def get_ledger_conditions(filters):
+	if filters.get("include_default_book_entries"):
+		filters["company_fb"] = frappe.get_cached_value(
+			"Company", filters.get("company"), "default_finance_book"
+		)
+
+	return get_conditions(filters)
+
+
+def get_order_by_fields(filters):
+	order_by_fields = ["posting_date", "account", "creation"]
 
 	if filters.get("include_dimensions"):
-		order_by_statement = "order by posting_date, creation"
+		order_by_fields = ["posting_date", "creation"]
 
 	if filters.get("group_by") == "Group by Voucher":
-		order_by_statement = "order by posting_date, voucher_type, voucher_no"
+		order_by_fields = ["posting_date", "voucher_type", "voucher_no"]
 	if filters.get("group_by") == "Group by Account":
-		order_by_statement = "order by account, posting_date, creation"
+		order_by_fields = ["account", "posting_date", "creation"]
 
-	if filters.get("include_default_book_entries"):
-		filters["company_fb"] = frappe.get_cached_value(
-			"Company", filters.get("company"), "default_finance_book"
-		)
+	# name keeps the order unique, so that the next page can start right after the last entry
+	return [*order_by_fields, "name"]
+
+
+def get_page_key(filters, gle):
+	return tuple(
+		gle.gl_entry if field == "name" else gle.get(field) for field in get_order_by_fields(filters)
+	)
+
+
+def get_gl_entries_page(filters, accounting_dimensions, conditions, after=None, page_length=GL_PAGE_LENGTH):
+	"""Entries of the period in the report order, continuing after the key of the last entry of the previous page."""
+	conditions += " and posting_date >= %(from_date)s"
+	if not filters.get("show_opening_entries"):
+		conditions += " and ifnull(is_opening, '') != 'Yes'"
+
+	if after:
+		conditions += " and ({}) > %(after)s".format(", ".join(get_order_by_fields(filters)))
+
+	return select_gl_entries(
+		filters, accounting_dimensions, conditions, page_length=page_length, values={"after": after}
+	)
+
+
+def select_gl_entries(filters, accounting_dimensions, conditions, page_length=None, values=None):
+	select_fields = """, debit, credit, debit_in_account_currency,
+		credit_in_account_currency """
+
+	if filters.get("show_remarks"):
+		if remarks_length := frappe.db.get_single_value("Accounts Settings", "general_ledger_remarks_length"):
+			select_fields += f",substr(remarks, 1, {remarks_length}) as 'remarks'"
+		else:
+			select_fields += """,remarks"""
 
 	dimension_fields = ""
 	if accounting_dimensions:
@@ -183,7 +232,9 @@ def get_gl_entries(filters, accounting_dimensions):
 			"debit_in_transaction_currency, credit_in_transaction_currency, transaction_currency,"
 		)
 
-	gl_entries = frappe.db.sql(
+	limit = f"limit {cint(page_length)}" if page_length else ""
+
+	return frappe.db.sql(
 		f"""
 		select
 			name as gl_entry, posting_date, account, party_type, party,
@@ -192,17 +243,220 @@ def get_gl_entries(filters, accounting_dimensions):
 			against_voucher_type, against_voucher, account_currency,
 			against, is_opening, creation {select_fields}
 		from `tabGL Entry`
-		where company=%(company)s {get_conditions(filters)}
-		{order_by_statement}
+		where company=%(company)s {conditions}
+		order by {", ".join(get_order_by_fields(filters))}
+		{limit}
+	""",
+		{**filters, **(values or {})},
+		as_dict=1,
+	)
+
+
+def get_opening_gl_entries(filters, conditions, group_by):
+	"""Entries before the period and opening entries summed up per `group_by`, in place of the entries."""
+	opening_condition = "posting_date < %(from_date)s"
+	if not filters.get("show_opening_entries"):
+		opening_condition += " or is_opening = 'Yes'"
+
+	return frappe.db.sql(
+		f"""
+		select
+			{group_by}, account_currency, is_opening, min(posting_date) as posting_date,
+			sum(debit) as debit, sum(credit) as credit,
+			sum(debit_in_account_currency) as debit_in_account_currency,
+			sum(credit_in_account_currency) as credit_in_account_currency
+		from `tabGL Entry`
+		where company=%(company)s {conditions} and ({opening_condition})
+		group by {group_by}, account_currency, is_opening
 	""",
 		filters,
 		as_dict=1,
 	)
 
+
+def get_ledger_account_currencies(filters, conditions):
+	return frappe.db.sql_list(
+		f"""
+		select distinct account_currency
+		from `tabGL Entry`
+		where company=%(company)s {conditions}
+	""",
+		filters,
+	)
+
+
+@frappe.whitelist()
+def get_ledger_page(filters, cursor=None, page_length=GL_PAGE_LENGTH):
+	"""
+	A page of General Ledger entries in the report order, with the running balance carried over from the
+	previous page through `cursor`. The first page starts with the opening and the last one ends with the
+	totals and the closing, and returns no cursor.
+	"""
+	filters = frappe._dict(frappe.parse_json(filters))
+	cursor = frappe._dict(frappe.parse_json(cursor)) if cursor else None
+	page_length = cint(page_length) or GL_PAGE_LENGTH
+
+	filters = prepare_ledger_page_filters(filters)
+	currency_map = get_currency(filters)
+	conditions = get_ledger_conditions(filters)
+
+	accounting_dimensions = []
+	if filters.get("include_dimensions"):
+		accounting_dimensions = get_accounting_dimensions()
+
+	data, columns = [], None
+	totals = get_totals_dict()
+	amount_fields = ("debit", "credit", "debit_in_account_currency", "credit_in_account_currency")
+
+	if cursor:
+		totals.opening.update(cursor.opening)
+		totals.total.update(cursor.total)
+	else:
+		account_currencies = None
+		if filters.get("presentation_currency"):
+			account_currencies = get_ledger_account_currencies(filters, conditions)
+
+		opening_entries = get_opening_gl_entries(filters, conditions, "account")
+		if filters.get("presentation_currency"):
+			opening_entries = convert_to_presentation_currency(
+				opening_entries, currency_map, account_currencies
+			)
+
+		for gle in opening_entries:
+			for field in amount_fields:
+				totals.opening[field] += flt(gle[field])
+
+		cursor = _dict(after=None, balance=0.0, account_currencies=account_currencies)
+		columns = get_columns(filters)
+		data.append(totals.opening)
+
+	gl_entries = get_gl_entries_page(
+		filters, accounting_dimensions, conditions, cursor.after and tuple(cursor.after), page_length
+	)
 	if filters.get("presentation_currency"):
-		return convert_to_presentation_currency(gl_entries, currency_map)
+		gl_entries = convert_to_presentation_currency(gl_entries, currency_map, cursor.account_currencies)
+
+	set_bill_no(gl_entries)
+
+	balance = flt(cursor.balance) if cursor.after else get_balance(totals.opening, 0, "debit", "credit")
+	for gle in gl_entries:
+		for field in amount_fields:
+			totals.total[field] += flt(gle[field])
+
+		balance = get_balance(gle, balance, "debit", "credit")
+		gle.balance = balance
+		data.append(gle)
+
+	if len(gl_entries) < page_length:
+		for field in amount_fields:
+			totals.closing[field] = totals.opening[field] + totals.total[field]
+
+		data += [totals.total, totals.closing]
+		for row in (totals.total, totals.closing):
+			row.balance = get_balance(row, 0, "debit", "credit")
+		next_cursor = None
 	else:
-		return gl_entries
+		next_cursor = _dict(
+			after=get_page_key(filters, gl_entries[-1]),
+			balance=balance,
+			account_currencies=cursor.account_currencies,
+			opening={field: totals.opening[field] for field in amount_fields},
+			total={field: totals.total[field] for field in amount_fields},
+		)
+
+	for row in data:
+		row["account_currency"] = filters.account_currency
+
+	return _dict(columns=columns, data=data, cursor=next_cursor)
+
+
+def prepare_ledger_page_filters(filters):
+	"""Check the permissions and filters as the report does. Pages are entry by entry, they can't be grouped."""
+	get_report_doc("General Ledger")
+	frappe.has_permission("GL Entry", throw=True)
+
+	if filters.get("group_by"):
+		frappe.throw(
+			_("The full ledger is exported entry by entry, clear {0} to export it").format(
+				frappe.bold(_("Group by"))
+			)
+		)
+
+	account_details = {
+		acc.name: acc for acc in frappe.db.sql("""select name, is_group from tabAccount""", as_dict=1)
+	}
+	return prepare_filters(filters, account_details)
+
+
+@frappe.whitelist()
+def export_ledger(filters, file_format="CSV"):
+	"""Export the General Ledger to a CSV or Excel file in the background, page by page."""
+	filters = frappe.parse_json(filters)
+	if file_format not in ("CSV", "Excel"):
+		frappe.throw(_("Invalid file format {0}").format(file_format))
+
+	# fail now rather than in the background job
+	prepare_ledger_page_filters(frappe._dict(copy.deepcopy(filters)))
+
+	enqueue(
+		make_ledger_export,
+		queue="long",
+		timeout=4 * 60 * 60,
+		filters=filters,
+		file_format=file_format,
+		now=frappe.flags.in_test,
+	)
+
+
+def make_ledger_export(filters, file_format="CSV"):
+	extension = "xlsx" if file_format == "Excel" else "csv"
+	file_name = f"general_ledger_{frappe.generate_hash(length=10)}.{extension}"
+	file_path = frappe.get_site_path("private", "files", file_name)
+	rows = get_ledger_export_rows(filters)
+
+	if file_format == "Excel":
+		wb = openpyxl.Workbook(write_only=True)
+		ws = wb.create_sheet(_("General Ledger"))
+		for row in rows:
+			ws.append(
+				[ILLEGAL_CHARACTERS_RE.sub("", value) if isinstance(value, str) else value for value in row]
+			)
+		wb.save(file_path)
+	else:
+		with open(file_path, "w", newline="") as f:
+			csv.writer(f).writerows(rows)
+
+	file = frappe.get_doc(
+		{
+			"doctype": "File",
+			"file_name": file_name,
+			"file_url": f"/private/files/{file_name}",
+			"is_private": 1,
+		}
+	).insert(ignore_permissions=True)
+
+	frappe.publish_realtime(
+		"msgprint",
+		_("General Ledger export is ready: {0}").format(f'<a href="{file.file_url}">{file_name}</a>'),
+		user=frappe.session.user,
+	)
+
+
+def get_ledger_export_rows(filters):
+	"""The header and the rows of all pages of the ledger, with the visible columns."""
+	columns, cursor = [], None
+	while True:
+		page = get_ledger_page(filters, cursor)
+		if page.columns:
+			columns = [column for column in page.columns if not column.get("hidden")]
+			yield [column["label"] for column in columns]
+
+		for row in page.data:
+			yield [row.get(column["fieldname"]) for column in columns]
+
+		cursor = page.cursor
+		if not cursor:
+			break
 
 
 def get_conditions(filters):
@@ -346,7 +600,12 @@ def get_accounts_with_children(accounts):
 
 
 def set_bill_no(gl_entries):
-	inv_details = get_supplier_invoice_details()
+	purchase_invoices = {
+		gl.get("against_voucher")
+		for gl in gl_entries
+		if gl.get("against_voucher_type") == "Purchase Invoice" and gl.get("against_voucher")
+	}
+	inv_details = get_supplier_invoice_details(purchase_invoices) if purchase_invoices else {}
 	for gl in gl_entries:
 		gl["bill_no"] = inv_details.get(gl.get("against_voucher"), "")
 
@@ -565,11 +824,13 @@ def get_result_as_list(data, filters):
 	return data
 
 
-def get_supplier_invoice_details():
+def get_supplier_invoice_details(invoices=None):
 	inv_details = {}
+	invoice_condition = "and name in %(invoices)s" if invoices else ""
 	for d in frappe.db.sql(
-		""" select name, bill_no from `tabPurchase Invoice`
-		where docstatus = 1 and bill_no is not null and bill_no != '' """,
+		f""" select name, bill_no from `tabPurchase Invoice`
+		where docstatus = 1 and bill_no is not null and bill_no != '' {invoice_condition}""",
+		{"invoices": tuple(invoices or ())},
 		as_dict=1,
 	):
 		inv_details[d.name] = d.bill_no
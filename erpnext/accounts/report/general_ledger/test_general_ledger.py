@@ -2,12 +2,12 @@
 # MIT License. See license.txt
 
 import frappe
-from frappe import qb
+from frappe import _, qb
 from frappe.tests import IntegrationTestCase
 from frappe.utils import flt, today
 
 from erpnext.accounts.doctype.sales_invoice.test_sales_invoice import create_sales_invoice
-from erpnext.accounts.report.general_ledger.general_ledger import execute
+from erpnext.accounts.report.general_ledger.general_ledger import execute, get_ledger_page
 from erpnext.controllers.sales_and_purchase_return import make_return_doc
 
 
@@ -332,3 +332,67 @@ class TestGeneralLedger(IntegrationTestCase):
 		)
 		actual = set([x.voucher_no for x in data if x.voucher_no])
 		self.assertEqual(expected, actual)
+
+	def test_ledger_pages(self):
+		invoices = [create_sales_invoice(rate=rate) for rate in (100, 200, 300)]
+		filters = frappe._dict(
+			{
+				"company": self.company,
+				"from_date": today(),
+				"to_date": today(),
+				"account": [invoices[0].debit_to],
+			}
+		)
+
+		data = execute(frappe._dict(filters))[1]
+		expected_entries = [row.gl_entry for row in data if row.get("gl_entry")]
+		expected_closing = data[-1]
+
+		rows, cursor = [], None
+		while True:
+			page = get_ledger_page(frappe._dict(filters), cursor, page_length=1)
+			rows += page.data
+			cursor = page.cursor
+			if not cursor:
+				break
+
+		entries = [row.gl_entry for row in rows if row.get("gl_entry")]
+		self.assertEqual(sorted(entries), sorted(expected_entries))
+		self.assertEqual(len(entries), 3)
+
+		# running balance is carried over from one page to the next
+		self.assertEqual([row.balance for row in rows if row.get("gl_entry")], [100, 300, 600])
+		self.assertEqual(rows[-1].debit, expected_closing.debit)
+		self.assertEqual(rows[-1].balance, expected_closing.balance)
+
+	def test_ledger_export(self):
+		import openpyxl
+
+		from erpnext.accounts.report.general_ledger.general_ledger import make_ledger_export
+
+		invoice = create_sales_invoice(rate=100)
+		filters = frappe._dict(
+			{
+				"company": self.company,
+				"from_date": today(),
+				"to_date": today(),
+				"account": [invoice.debit_to],
+			}
+		)
+
+		# grouped ledgers have subtotals the pages don't have
+		self.assertRaises(
+			frappe.ValidationError,
+			get_ledger_page,
+			frappe._dict(filters, group_by="Group by Voucher (Consolidated)"),
+		)
+
+		make_ledger_export(frappe._dict(filters), file_format="Excel")
+		file = frappe.get_last_doc("File", filters={"file_name": ("like", "general_ledger_%.xlsx")})
+		rows = list(openpyxl.load_workbook(file.get_full_path()).active.values)
+
+		# header, opening, the entries, total and closing
+		self.assertIn(_("Voucher No"), rows[0])
+		self.assertIn("'Opening'", rows[1])
+		self.assertTrue([row for row in rows[2:-2] if invoice.name in row])
+		self.assertIn("'Closing (Opening + Total)'", rows[-1])
@@ -7,7 +7,7 @@ from frappe.tests import IntegrationTestCase
 from frappe.utils import getdate, today
 
 from erpnext.accounts.doctype.sales_invoice.test_sales_invoice import create_sales_invoice
-from erpnext.accounts.report.financial_statements import get_period_list
+from erpnext.accounts.report.financial_statements import get_period_list, set_gl_entries_by_account
 from erpnext.accounts.report.profit_and_loss_statement.profit_and_loss_statement import execute
 from erpnext.accounts.test.accounts_mixin import AccountsTestMixin
 
@@ -109,3 +109,36 @@ class TestProfitAndLossStatement(AccountsTestMixin, IntegrationTestCase):
 		sales_account = frappe.db.get_value("Company", self.company, "default_income_account")
 
 		self.assertIn(sales_account, contents)
+
+	def test_gl_entries_summed_up_per_period(self):
+		self.create_sales_invoice(qty=1, rate=150)
+		self.create_sales_invoice(qty=2, rate=150)
+
+		filters = self.get_report_filters()
+		period_list = get_period_list(
+			filters.from_fiscal_year,
+			filters.to_fiscal_year,
+			filters.period_start_date,
+			filters.period_end_date,
+			filters.filter_based_on,
+			filters.periodicity,
+			company=filters.company,
+		)
+
+		gl_entries_by_account = {}
+		set_gl_entries_by_account(
+			self.company,
+			period_list[0].year_start_date,
+			period_list[-1].to_date,
+			filters,
+			gl_entries_by_account,
+			root_type="Income",
+			ignore_closing_entries=True,
+			period_list=period_list,
+		)
+
+		sales_account = frappe.db.get_value("Company", self.company, "default_income_account")
+		entries = gl_entries_by_account[sales_account]
+		self.assertEqual(len(entries), 1)
+		self.assertEqual(entries[0].credit, 450)
+		self.assertEqual(entries[0].posting_date, getdate(today()))
@@ -32,7 +32,17 @@ import erpnext
 
 # imported to enable erpnext.accounts.utils.get_account_currency
 from erpnext.accounts.doctype.account.account import get_account_currency
+from erpnext.accounts.doctype.account_daily_balance.account_daily_balance import (
+	is_account_daily_balance_enabled,
+	update_account_daily_balances,
+	use_account_daily_balances,
+)
 from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import get_dimensions
+from erpnext.accounts.doctype.payment_ledger_outstanding.payment_ledger_outstanding import (
+	is_payment_ledger_outstanding_enabled,
+	update_payment_ledger_outstanding,
+	use_payment_ledger_outstanding,
+)
 from erpnext.stock import get_warehouse_account_map
 from erpnext.stock.utils import get_stock_value_on
 
@@ -206,7 +216,8 @@ def get_balance_on(
 	if not cost_center and frappe.form_dict.get("cost_center"):
 		cost_center = frappe.form_dict.get("cost_center")
 
-	cond = ["is_cancelled=0"]
+	use_daily_balances = use_account_daily_balances()
+	cond = [] if use_daily_balances else ["is_cancelled=0"]
 	if start_date:
 		cond.append("posting_date >= %s" % frappe.db.escape(cstr(start_date)))
 	if date:
@@ -292,6 +303,21 @@ def get_balance_on(
 		cond.append("""gle.company = %s """ % (frappe.db.escape(company)))
 
 	if account or (party_type and party) or account_type:
+		if use_daily_balances:
+			# amounts are rounded to currency precision when they are added to the daily balances
+			if in_account_currency:
+				select_field = "sum(debit_in_account_currency) - sum(credit_in_account_currency)"
+			else:
+				select_field = "sum(debit) - sum(credit)"
+
+			bal = frappe.db.sql(
+				"""
+				SELECT {}
+				FROM `tabAccount Daily Balance` gle
+				WHERE {}""".format(select_field, " and ".join(cond))
+			)[0][0]
+			return flt(bal)
+
 		precision = get_currency_precision()
 		if in_account_currency:
 			select_field = (
@@ -920,6 +946,23 @@ def update_accounting_ledgers_after_reference_removal(
 
 	# Payment Ledger
 	ple = qb.DocType("Payment Ledger Entry")
+	entries = []
+	if is_payment_ledger_outstanding_enabled():
+		ple_entries_query = (
+			qb.from_(ple)
+			.select("*")
+			.where(
+				(ple.against_voucher_type == ref_type)
+				& (ple.against_voucher_no == ref_no)
+				& (ple.delinked == 0)
+			)
+			.for_update()
+		)
+		if payment_name:
+			ple_entries_query = ple_entries_query.where(ple.voucher_no == payment_name)
+		entries = ple_entries_query.run(as_dict=True)
+		update_payment_ledger_outstanding(entries, cancel=True)
+
 	ple_update_query = (
 		qb.update(ple)
 		.set(ple.against_voucher_type, ple.voucher_type)
@@ -935,6 +978,10 @@ def update_accounting_ledgers_after_reference_removal(
 		ple_update_query = ple_update_query.where(ple.voucher_no == payment_name)
 	ple_update_query.run()
 
+	for entry in entries:
+		entry.against_voucher_type, entry.against_voucher_no = entry.voucher_type, entry.voucher_no
+	update_payment_ledger_outstanding(entries)
+
 
 def remove_ref_from_advance_section(ref_doc: object = None):
 	# TODO: this might need some testing
@@ -1079,14 +1126,36 @@ def fix_total_debit_credit():
 		if abs(d.diff) > 0:
 			dr_or_cr = d.voucher_type == "Sales Invoice" and "credit" or "debit"
 
+			gle = frappe.db.sql(
+				f"""select * from `tabGL Entry`
+				where voucher_type = %s and voucher_no = %s and {dr_or_cr} > 0 limit 1""",
+				(d.voucher_type, d.voucher_no),
+				as_dict=1,
+			)
+			if not gle:
+				continue
+
+			# the account currency amount moves by the same diff, at the rate of the entry
+			diff_in_account_currency = d.diff
+			if gle[0].account_currency != erpnext.get_company_currency(gle[0].company):
+				diff_in_account_currency = flt(
+					d.diff * flt(gle[0][f"{dr_or_cr}_in_account_currency"]) / flt(gle[0][dr_or_cr])
+				)
+
 			frappe.db.sql(
-				"""update `tabGL Entry` set {} = {} + {}
-				where voucher_type = {} and voucher_no = {} and {} > 0 limit 1""".format(
-					dr_or_cr, dr_or_cr, "%s", "%s", "%s", dr_or_cr
-				),
-				(d.diff, d.voucher_type, d.voucher_no),
+				f"""update `tabGL Entry` set {dr_or_cr} = {dr_or_cr} + %s,
+				{dr_or_cr}_in_account_currency = {dr_or_cr}_in_account_currency + %s
+				where name = %s""",
+				(d.diff, diff_in_account_currency, gle[0].name),
 			)
 
+			if is_account_daily_balance_enabled() and not gle[0].is_cancelled:
+				# only the difference is added to the daily balance
+				gle[0].update(debit=0, credit=0, debit_in_account_currency=0, credit_in_account_currency=0)
+				gle[0][dr_or_cr] = d.diff
+				gle[0][f"{dr_or_cr}_in_account_currency"] = diff_in_account_currency
+				update_account_daily_balances(gle)
+
 
 def get_currency_precision():
 	precision = cint(frappe.db.get_default("currency_precision"))
@@ -1158,6 +1227,7 @@ def get_outstanding_invoices(
 		accounting_dimensions=accounting_dimensions or [],
 		limit=limit,
 		voucher_no=voucher_no,
+		use_maintained_outstanding=True,
 	)
 
 	for d in invoice_list:
@@ -1425,6 +1495,7 @@ def repost_gle_for_stock_vouchers(
 	repost_doc: Optional["RepostItemValuation"] = None,
 ):
 	from erpnext.accounts.general_ledger import toggle_debit_credit_if_negative
+	from erpnext.stock.doctype.repost_item_valuation.repost_item_valuation import extend_repost_locks
 
 	if not stock_vouchers:
 		return
@@ -1443,6 +1514,9 @@ def repost_gle_for_stock_vouchers(
 		gle = get_voucherwise_gl_entries(stock_vouchers_chunk, posting_date)
 
 		for voucher_type, voucher_no in stock_vouchers_chunk:
+			if repost_doc:
+				extend_repost_locks()
+
 			existing_gle = gle.get((voucher_type, voucher_no), [])
 			voucher_obj = frappe.get_doc(voucher_type, voucher_no)
 			# Some transactions post credit as negative debit, this is handled while posting GLE
@@ -1469,11 +1543,32 @@ def repost_gle_for_stock_vouchers(
 
 def _delete_pl_entries(voucher_type, voucher_no):
 	ple = qb.DocType("Payment Ledger Entry")
+	if is_payment_ledger_outstanding_enabled():
+		update_payment_ledger_outstanding(
+			qb.from_(ple)
+			.select("*")
+			.where((ple.voucher_type == voucher_type) & (ple.voucher_no == voucher_no) & (ple.delinked == 0))
+			.for_update()
+			.run(as_dict=True),
+			cancel=True,
+		)
+
 	qb.from_(ple).delete().where((ple.voucher_type == voucher_type) & (ple.voucher_no == voucher_no)).run()
 
 
 def _delete_gl_entries(voucher_type, voucher_no):
 	gle = qb.DocType("GL Entry")
+	if is_account_daily_balance_enabled():
+		update_account_daily_balances(
+			qb.from_(gle)
+			.select("*")
+			.where(
+				(gle.voucher_type == voucher_type) & (gle.voucher_no == voucher_no) & (gle.is_cancelled == 0)
+			)
+			.run(as_dict=True),
+			cancel=True,
+		)
+
 	qb.from_(gle).delete().where((gle.voucher_type == voucher_type) & (gle.voucher_no == voucher_no)).run()
 
 
@@ -1824,6 +1919,8 @@ def create_payment_ledger_entry(
 	if gl_entries:
 		ple_map = get_payment_ledger_entries(gl_entries, cancel=cancel)
 
+		ple_list = []
+		outstanding_vouchers = set()
 		for entry in ple_map:
 			ple = frappe.get_doc(entry)
 
@@ -1834,7 +1931,116 @@ def create_payment_ledger_entry(
 			ple.flags.adv_adj = adv_adj
 			ple.flags.from_repost = from_repost
 			ple.flags.update_outstanding = update_outstanding
-			ple.submit()
+			ple.flags.outstanding_vouchers = outstanding_vouchers
+			ple_list.append(ple)
+
+		submit_ledger_entries(ple_list)
+
+		for voucher in outstanding_vouchers:
+			update_voucher_outstanding(*voucher)
+
+		# the original entries are removed when they are delinked
+		update_payment_ledger_outstanding(ple_list)
+
+
+def submit_ledger_entries(docs):
+	"""
+	Submit new ledger entries of a doctype with a single multi-row insert.
+
+	Controller methods and document hooks run for each entry in the same order as on `submit`,
+	only the entries are written together and their links are validated once for all of them.
+	Entries of a doctype with its own `doc_events` hooks are submitted one by one, as those hooks
+	may depend on the entries before them being saved.
+	"""
+	if not docs:
+		return
+
+	if frappe.get_hooks("doc_events").get(docs[0].doctype):
+		for doc in docs:
+			doc.submit()
+		return
+
+	user = frappe.session.user
+	timestamp = now()
+	for doc in docs:
+		doc._set_defaults()
+		doc.docstatus = 1
+		doc.run_method("before_insert")
+		doc.set_new_name()
+		doc.owner = doc.modified_by = user
+		doc.creation = doc.modified = timestamp
+		doc.run_method("before_validate")
+		doc.run_method("validate")
+		doc.run_method("before_submit")
+		doc._validate_mandatory()
+		doc._validate_data_fields()
+		doc._validate_selects()
+		doc._validate_non_negative()
+		doc._validate_length()
+
+	validate_ledger_entry_links(docs)
+
+	rows = [doc.get_valid_dict(convert_dates_to_str=True) for doc in docs]
+	fields = list(rows[0])
+	frappe.db.bulk_insert(
+		docs[0].doctype, fields=fields, values=[[row.get(field) for field in fields] for row in rows]
+	)
+
+	for doc in docs:
+		doc.run_method("after_insert")
+		doc.run_method("on_update")
+		doc.run_method("on_submit")
+		doc.run_method("on_change")
+
+
+def validate_ledger_entry_links(docs):
+	"""
+	Validate the links of all the ledger entries with one query per linked doctype.
+
+	As on `submit`, entries of a submittable doctype can't link to cancelled documents.
+	"""
+	meta = docs[0].meta
+	links = {}
+	cancellable_links = set()
+	for df in meta.get_link_fields() + meta.get_dynamic_link_fields():
+		for doc in docs:
+			value = doc.get(df.fieldname)
+			doctype = df.options if df.fieldtype == "Link" else doc.get(df.options)
+			if value and doctype:
+				links.setdefault(doctype, set()).add(value)
+				if meta.is_submittable and df.fieldname != "amended_from":
+					cancellable_links.add((doctype, cstr(value).casefold()))
+
+	for doctype, names in links.items():
+		is_submittable = frappe.get_meta(doctype).is_submittable
+		existing = {
+			cstr(row.name).casefold(): row
+			for row in frappe.get_all(
+				doctype,
+				filters={"name": ("in", list(names))},
+				fields=["name", "docstatus"] if is_submittable else ["name"],
+			)
+		}
+		if missing := sorted(cstr(name) for name in names if cstr(name).casefold() not in existing):
+			frappe.throw(
+				_("Could not find {0}: {1}").format(_(doctype), ", ".join(missing)),
+				frappe.LinkValidationError,
+			)
+
+		if not is_submittable:
+			continue
+
+		if cancelled := sorted(
+			row.name
+			for key, row in existing.items()
+			if row.docstatus == 2 and (doctype, key) in cancellable_links
+		):
+			frappe.throw(
+				_("Cannot link cancelled document: {0}").format(
+					", ".join(f"{_(doctype)}: {name}" for name in cancelled)
+				),
+				frappe.CancelledLinkError,
+			)
 
 
 def update_voucher_outstanding(voucher_type, voucher_no, account, party_type, party):
@@ -1879,27 +2085,38 @@ def update_voucher_outstanding(voucher_type, voucher_no, account, party_type, pa
 def delink_original_entry(pl_entry, partial_cancel=False):
 	if pl_entry:
 		ple = qb.DocType("Payment Ledger Entry")
+		conditions = (
+			(ple.company == pl_entry.company)
+			& (ple.account_type == pl_entry.account_type)
+			& (ple.account == pl_entry.account)
+			& (ple.party_type == pl_entry.party_type)
+			& (ple.party == pl_entry.party)
+			& (ple.voucher_type == pl_entry.voucher_type)
+			& (ple.voucher_no == pl_entry.voucher_no)
+			& (ple.against_voucher_type == pl_entry.against_voucher_type)
+			& (ple.against_voucher_no == pl_entry.against_voucher_no)
+		)
+
+		if partial_cancel:
+			conditions &= ple.voucher_detail_no == pl_entry.voucher_detail_no
+
+		if is_payment_ledger_outstanding_enabled():
+			update_payment_ledger_outstanding(
+				qb.from_(ple)
+				.select("*")
+				.where(conditions & (ple.delinked == 0))
+				.for_update()
+				.run(as_dict=True),
+				cancel=True,
+			)
+
 		query = (
 			qb.update(ple)
 			.set(ple.delinked, True)
 			.set(ple.modified, now())
 			.set(ple.modified_by, frappe.session.user)
-			.where(
-				(ple.company == pl_entry.company)
-				& (ple.account_type == pl_entry.account_type)
-				& (ple.account == pl_entry.account)
-				& (ple.party_type == pl_entry.party_type)
-				& (ple.party == pl_entry.party)
-				& (ple.voucher_type == pl_entry.voucher_type)
-				& (ple.voucher_no == pl_entry.voucher_no)
-				& (ple.against_voucher_type == pl_entry.against_voucher_type)
-				& (ple.against_voucher_no == pl_entry.against_voucher_no)
-			)
+			.where(conditions)
 		)
-
-		if partial_cancel:
-			query = query.where(ple.voucher_detail_no == pl_entry.voucher_detail_no)
-
 		query.run()
 
 
@@ -1921,6 +2138,7 @@ class QueryPaymentLedger:
 		self.min_outstanding = None
 		self.max_outstanding = None
 		self.limit = self.voucher_no = None
+		self.use_maintained_outstanding = False
 
 	def reset(self):
 		# clear filters
@@ -2026,25 +2244,28 @@ class QueryPaymentLedger:
 		)
 
 		# build query for voucher outstanding
-		query_voucher_outstanding = (
-			qb.from_(ple)
-			.select(
-				ple.account,
-				ple.against_voucher_type.as_("voucher_type"),
-				ple.against_voucher_no.as_("voucher_no"),
-				ple.party_type,
-				ple.party,
-				ple.posting_date,
-				ple.due_date,
-				ple.account_currency.as_("currency"),
-				Sum(ple.amount).as_("amount"),
-				Sum(ple.amount_in_account_currency).as_("amount_in_account_currency"),
+		if self.can_use_maintained_outstanding():
+			query_voucher_outstanding = self.get_maintained_outstanding_query()
+		else:
+			query_voucher_outstanding = (
+				qb.from_(ple)
+				.select(
+					ple.account,
+					ple.against_voucher_type.as_("voucher_type"),
+					ple.against_voucher_no.as_("voucher_no"),
+					ple.party_type,
+					ple.party,
+					ple.posting_date,
+					ple.due_date,
+					ple.account_currency.as_("currency"),
+					Sum(ple.amount).as_("amount"),
+					Sum(ple.amount_in_account_currency).as_("amount_in_account_currency"),
+				)
+				.where(ple.delinked == 0)
+				.where(Criterion.all(filter_on_against_voucher_no))
+				.where(Criterion.all(self.common_filter))
+				.groupby(ple.against_voucher_type, ple.against_voucher_no, ple.party_type, ple.party)
 			)
-			.where(ple.delinked == 0)
-			.where(Criterion.all(filter_on_against_voucher_no))
-			.where(Criterion.all(self.common_filter))
-			.groupby(ple.against_voucher_type, ple.against_voucher_no, ple.party_type, ple.party)
-		)
 
 		# build CTE for combining voucher amount and outstanding
 		self.cte_query_voucher_amount_and_outstanding = (
@@ -2107,6 +2328,52 @@ class QueryPaymentLedger:
 		# execute SQL
 		self.voucher_outstandings = self.cte_query_voucher_amount_and_outstanding.run(as_dict=True)
 
+	def can_use_maintained_outstanding(self):
+		if not (self.use_maintained_outstanding and use_payment_ledger_outstanding()):
+			return False
+
+		# filters on fields which are not kept per voucher need the ledger
+		meta = frappe.get_meta("Payment Ledger Outstanding")
+		return all(
+			meta.has_field(field.name)
+			for criterion in self.common_filter
+			for field in criterion.fields_()
+			if field.table == self.ple
+		)
+
+	def get_maintained_outstanding_query(self):
+		"""
+		Outstanding against the vouchers from Payment Ledger Outstanding, with the common filters
+		applied to its fields of the same name
+		"""
+		plo = qb.DocType("Payment Ledger Outstanding")
+
+		# same filters as on the ledger, the fields are named alike
+		filters = [criterion.replace_table(self.ple, plo) for criterion in self.common_filter]
+		if self.vouchers:
+			filters.append(plo.voucher_type.isin(set([x.voucher_type for x in self.vouchers])))
+			filters.append(plo.voucher_no.isin(set([x.voucher_no for x in self.vouchers])))
+
+		if self.voucher_no:
+			filters.append(plo.voucher_no.like(f"%{self.voucher_no}%"))
+
+		return (
+			qb.from_(plo)
+			.select(
+				plo.account,
+				plo.voucher_type,
+				plo.voucher_no,
+				plo.party_type,
+				plo.party,
+				plo.posting_date,
+				plo.due_date,
+				plo.account_currency.as_("currency"),
+				plo.outstanding.as_("amount"),
+				plo.outstanding_in_account_currency.as_("amount_in_account_currency"),
+			)
+			.where(Criterion.all(filters))
+		)
+
 	def get_voucher_outstandings(
 		self,
 		vouchers=None,
@@ -2119,6 +2386,7 @@ class QueryPaymentLedger:
 		accounting_dimensions=None,
 		limit=None,
 		voucher_no=None,
+		use_maintained_outstanding=False,
 	):
 		"""
 		Fetch voucher amount and outstanding amount from Payment Ledger using Database CTE
@@ -2129,6 +2397,7 @@ class QueryPaymentLedger:
 		max_outstanding - filter on maximum total  outstanding amount
 		get_invoices - only fetch vouchers(ledger entries with +ve outstanding)
 		get_payments - only fetch payments(ledger entries with -ve outstanding)
+		use_maintained_outstanding - read outstanding from Payment Ledger Outstanding, if it is maintained
 		"""
 
 		self.reset()
@@ -2142,6 +2411,7 @@ class QueryPaymentLedger:
 		self.get_invoices = get_invoices
 		self.limit = limit
 		self.voucher_no = voucher_no
+		self.use_maintained_outstanding = use_maintained_outstanding
 		self.query_for_outstanding()
 
 		return self.voucher_outstandings
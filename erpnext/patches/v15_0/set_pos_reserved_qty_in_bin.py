@@ -0,0 +1,46 @@
+import frappe
+from frappe.query_builder.functions import IfNull, Sum
+
+from erpnext.stock.utils import get_or_make_bin
+
+
+def execute():
+	p_inv = frappe.qb.DocType("POS Invoice")
+	p_item = frappe.qb.DocType("POS Invoice Item")
+	item = frappe.qb.DocType("Item")
+
+	unconsolidated_rows = (
+		frappe.qb.from_(p_item)
+		.join(p_inv)
+		.on(p_inv.name == p_item.parent)
+		.join(item)
+		.on(item.name == p_item.item_code)
+		.select(p_item.name)
+		.where(
+			(IfNull(p_inv.consolidated_invoice, "") == "")
+			& (p_item.docstatus == 1)
+			& (IfNull(p_item.warehouse, "") != "")
+			& (item.is_stock_item == 1)
+		)
+	).run(pluck=True)
+
+	if not unconsolidated_rows:
+		return
+
+	(
+		frappe.qb.update(p_item)
+		.set(p_item.pos_reserved_in_bin, 1)
+		.where(p_item.name.isin(unconsolidated_rows))
+	).run()
+
+	reserved_qtys = (
+		frappe.qb.from_(p_item)
+		.select(p_item.item_code, p_item.warehouse, Sum(p_item.stock_qty).as_("stock_qty"))
+		.where(p_item.name.isin(unconsolidated_rows))
+		.groupby(p_item.item_code, p_item.warehouse)
+	).run(as_dict=True)
+
+	for row in reserved_qtys:
+		if row.stock_qty:
+			bin_name = get_or_make_bin(row.item_code, row.warehouse)
+			frappe.db.set_value("Bin", bin_name, "pos_reserved_qty", row.stock_qty, update_modified=False)
@@ -5,4 +5,5 @@ import "../../selling/page/point_of_sale/pos_number_pad.js";
 import "../../selling/page/point_of_sale/pos_payment.js";
 import "../../selling/page/point_of_sale/pos_past_order_list.js";
 import "../../selling/page/point_of_sale/pos_past_order_summary.js";
+import "../../selling/page/point_of_sale/pos_offline_queue.js";
 import "../../selling/page/point_of_sale/pos_controller.js";
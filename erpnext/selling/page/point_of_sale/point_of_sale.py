@@ -5,11 +5,17 @@
 import json
 
 import frappe
-from frappe.utils import cint
+from frappe import _
+from frappe.exceptions import QueryDeadlockError, QueryTimeoutError
+from frappe.utils import cint, cstr
 from frappe.utils.nestedset import get_root_of
 
-from erpnext.accounts.doctype.pos_invoice.pos_invoice import get_stock_availability
+from erpnext.accounts.doctype.pos_invoice.pos_invoice import (
+	get_stock_availabilities,
+	get_stock_availability,
+)
 from erpnext.accounts.doctype.pos_profile.pos_profile import get_child_nodes, get_item_groups
+from erpnext.stock.get_item_details import BulkItemDetailsCache
 from erpnext.stock.utils import scan_barcode
 
 
@@ -106,7 +112,12 @@ def filter_result_items(result, pos_profile):
 
 
 @frappe.whitelist()
-def get_items(start, page_length, price_list, item_group, pos_profile, search_term=""):
+def get_items(start, page_length, price_list, item_group, pos_profile, search_term="", after=None):
+	"""
+	A page of the POS item catalog with stock availability and prices.
+
+	Pass the `next_cursor` of the previous page as `after` to page by item code instead of by offset.
+	"""
 	warehouse, hide_unavailable_items = frappe.db.get_value(
 		"POS Profile", pos_profile, ["warehouse", "hide_unavailable_items"]
 	)
@@ -134,6 +145,10 @@ def get_items(start, page_length, price_list, item_group, pos_profile, search_te
 			"AND bin.warehouse = %(warehouse)s AND bin.item_code = item.name AND bin.actual_qty > 0"
 		)
 
+	page_condition, offset = "", cint(start)
+	if after:
+		page_condition, offset = "AND item.name > %(after)s", 0
+
 	items_data = frappe.db.sql(
 		"""
 		SELECT
@@ -153,19 +168,21 @@ def get_items(start, page_length, price_list, item_group, pos_profile, search_te
 			AND item.item_group in (SELECT name FROM `tabItem Group` WHERE lft >= {lft} AND rgt <= {rgt})
 			AND {condition}
 			{bin_join_condition}
+			{page_condition}
 		ORDER BY
 			item.name asc
 		LIMIT
 			{page_length} offset {start}""".format(
-			start=cint(start),
+			start=offset,
 			page_length=cint(page_length),
 			lft=cint(lft),
 			rgt=cint(rgt),
 			condition=condition,
 			bin_join_selection=bin_join_selection,
 			bin_join_condition=bin_join_condition,
+			page_condition=page_condition,
 		),
-		{"warehouse": warehouse},
+		{"warehouse": warehouse, "after": after},
 		as_dict=1,
 	)
 
@@ -173,47 +190,68 @@ def get_items(start, page_length, price_list, item_group, pos_profile, search_te
 	if not items_data:
 		return result
 
-	current_date = frappe.utils.today()
+	item_codes = [item.item_code for item in items_data]
+	availability = get_stock_availabilities(item_codes, warehouse)
+	item_prices = get_item_prices(item_codes, price_list)
+	conversion_factors = get_uom_conversion_factors(item_codes)
 
 	for item in items_data:
-		uoms = frappe.get_doc("Item", item.item_code).get("uoms", [])
-
-		item.actual_qty, _ = get_stock_availability(item.item_code, warehouse)
+		item.actual_qty, _ = availability[item.item_code]
 		item.uom = item.stock_uom
 
-		item_price = frappe.get_all(
-			"Item Price",
-			fields=["price_list_rate", "currency", "uom", "batch_no", "valid_from", "valid_upto"],
-			filters={
-				"price_list": price_list,
-				"item_code": item.item_code,
-				"selling": True,
-				"valid_from": ["<=", current_date],
-				"valid_upto": ["in", [None, "", current_date]],
-			},
-			order_by="valid_from desc",
-			limit=1,
+		price = item_prices.get(item.item_code)
+		if not price:
+			result.append(item)
+			continue
+
+		conversion_factor = conversion_factors.get((item.item_code, price.uom))
+		if price.uom != item.stock_uom and conversion_factor:
+			item.actual_qty = item.actual_qty // conversion_factor
+
+		result.append(
+			{
+				**item,
+				"price_list_rate": price.get("price_list_rate"),
+				"currency": price.get("currency"),
+				"uom": price.uom or item.uom,
+				"batch_no": price.batch_no,
+			}
 		)
 
-		if not item_price:
-			result.append(item)
+	next_cursor = items_data[-1].item_code if len(items_data) == cint(page_length) else None
+	return {"items": result, "next_cursor": next_cursor}
 
-		for price in item_price:
-			uom = next(filter(lambda x: x.uom == price.uom, uoms), {})
 
-			if price.uom != item.stock_uom and uom and uom.conversion_factor:
-				item.actual_qty = item.actual_qty // uom.conversion_factor
+def get_item_prices(item_codes, price_list):
+	"""Latest selling price of each item valid today."""
+	current_date = frappe.utils.today()
+	item_prices = {}
+
+	for price in frappe.get_all(
+		"Item Price",
+		fields=["item_code", "price_list_rate", "currency", "uom", "batch_no", "valid_from", "valid_upto"],
+		filters={
+			"price_list": price_list,
+			"item_code": ["in", item_codes],
+			"selling": True,
+			"valid_from": ["<=", current_date],
+			"valid_upto": ["in", [None, "", current_date]],
+		},
+		order_by="valid_from desc",
+	):
+		item_prices.setdefault(price.item_code, price)
+
+	return item_prices
+
+
+def get_uom_conversion_factors(item_codes):
+	conversion_factors = frappe.get_all(
+		"UOM Conversion Detail",
+		fields=["parent", "uom", "conversion_factor"],
+		filters={"parent": ["in", item_codes], "parenttype": "Item"},
+	)
 
-			result.append(
-				{
-					**item,
-					"price_list_rate": price.get("price_list_rate"),
-					"currency": price.get("currency"),
-					"uom": price.uom or item.uom,
-					"batch_no": price.batch_no,
-				}
-			)
-	return {"items": result}
+	return {(row.parent, row.uom): row.conversion_factor for row in conversion_factors}
 
 
 @frappe.whitelist()
@@ -384,3 +422,95 @@ def get_pos_profile_data(pos_profile):
 
 	pos_profile.customer_groups = _customer_groups_with_children
 	return pos_profile
+
+
+@frappe.whitelist()
+def sync_invoices(invoices):
+	"""
+	Create and submit POS Invoices queued by a POS terminal, e.g. while it was offline.
+
+	Every invoice carries a `pos_client_id` generated by the terminal. An invoice that was synced before is
+	not created again, so a batch can be sent again safely when its response is lost. Each invoice is committed
+	once it is submitted, so that the Bins it updates are not locked until the whole batch is done.
+
+	Returns the result of each invoice in the order they were passed. Invoices that failed on a lock are
+	returned as "Pending", to be sent again.
+	"""
+	invoices = frappe.parse_json(invoices)
+	if not all(invoice.get("pos_client_id") for invoice in invoices):
+		frappe.throw(_("POS Client ID is required to sync POS Invoices"))
+
+	synced = get_synced_invoices([invoice.get("pos_client_id") for invoice in invoices])
+	item_rows = [frappe._dict(row) for invoice in invoices for row in invoice.get("items") or []]
+
+	results = []
+	with BulkItemDetailsCache(item_rows):
+		for invoice in invoices:
+			client_id = invoice.get("pos_client_id")
+			if client_id in synced:
+				result = {"pos_client_id": client_id, "status": "Synced", "name": synced[client_id]}
+			else:
+				result = sync_invoice(invoice)
+				if result["status"] == "Synced":
+					synced[client_id] = result["name"]
+
+			results.append(result)
+
+	return results
+
+
+def sync_invoice(invoice):
+	"""Submit one POS Invoice of a sync batch, rolling back only this invoice if it fails."""
+	client_id = invoice.get("pos_client_id")
+	invoice = {
+		key: value
+		for key, value in invoice.items()
+		if key not in ("name", "docstatus", "amended_from") and not key.startswith("__")
+	}
+	for value in invoice.values():
+		if isinstance(value, list):
+			for row in value:
+				if isinstance(row, dict):
+					row.pop("name", None)
+
+	message_count = len(frappe.local.message_log)
+	frappe.db.savepoint("sync_pos_invoice")
+	try:
+		doc = frappe.get_doc({**invoice, "doctype": "POS Invoice"})
+		doc.submit()
+	except Exception as e:
+		failed_on_lock = isinstance(e, (QueryDeadlockError, QueryTimeoutError))
+		if failed_on_lock:
+			# the database may have rolled back the transaction, which only holds this invoice
+			frappe.db.rollback()
+		else:
+			frappe.db.rollback(save_point="sync_pos_invoice")
+
+		# keep the messages of the invoices synced before this one
+		del frappe.local.message_log[message_count:]
+
+		# the same invoice was synced by a concurrent request
+		if isinstance(e, frappe.UniqueValidationError) and (synced := get_synced_invoices([client_id])):
+			return {"pos_client_id": client_id, "status": "Synced", "name": synced[client_id]}
+
+		if failed_on_lock:
+			# sent again with the next sync
+			return {"pos_client_id": client_id, "status": "Pending", "error": cstr(e)}
+
+		return {"pos_client_id": client_id, "status": "Failed", "error": cstr(e)}
+
+	if not frappe.flags.in_test:
+		frappe.db.commit()
+
+	return {"pos_client_id": client_id, "status": "Synced", "name": doc.name}
+
+
+def get_synced_invoices(client_ids):
+	return dict(
+		frappe.get_all(
+			"POS Invoice",
+			filters={"pos_client_id": ("in", client_ids)},
+			fields=["pos_client_id", "name"],
+			as_list=True,
+		)
+	)
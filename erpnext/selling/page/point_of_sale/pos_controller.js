@@ -162,6 +162,7 @@ erpnext.PointOfSale.Controller = class {
 	}
 
 	make_app() {
+		this.offline_queue = new erpnext.PointOfSale.OfflineQueue({ pos_profile: this.pos_profile });
 		this.prepare_dom();
 		this.prepare_components();
 		this.prepare_menu();
@@ -197,6 +198,8 @@ erpnext.PointOfSale.Controller = class {
 
 		this.page.add_menu_item(__("Save as Draft"), this.save_draft_invoice.bind(this), false, "Ctrl+S");
 
+		this.page.add_menu_item(__("Failed Offline Invoices"), () => this.offline_queue.show_failed_invoices());
+
 		this.page.add_menu_item(__("Close the POS"), this.close_pos.bind(this), false, "Shift+Ctrl+C");
 	}
 
@@ -384,6 +387,11 @@ erpnext.PointOfSale.Controller = class {
 				},
 
 				submit_invoice: () => {
+					if (!navigator.onLine) {
+						this.queue_offline_invoice();
+						return;
+					}
+
 					this.frm.savesubmit().then((r) => {
 						this.toggle_components(false);
 						this.order_summary.toggle_component(true);
@@ -454,6 +462,20 @@ erpnext.PointOfSale.Controller = class {
 		});
 	}
 
+	queue_offline_invoice() {
+		this.offline_queue.add(JSON.parse(JSON.stringify(this.frm.doc)));
+		frappe.show_alert({
+			indicator: "orange",
+			message: __("You are offline. The POS invoice will be submitted once you are back online."),
+		});
+
+		frappe.run_serially([
+			() => this.toggle_components(false),
+			() => this.make_new_invoice(),
+			() => this.toggle_components(true),
+		]);
+	}
+
 	toggle_recent_order_list(show) {
 		this.toggle_components(!show);
 		this.recent_order_list.toggle_component(show);
@@ -47,11 +47,12 @@ erpnext.PointOfSale.ItemSelector = class {
 		}
 
 		this.get_items({}).then(({ message }) => {
+			this.set_next_page({ message });
 			this.render_item_list(message.items);
 		});
 	}
 
-	get_items({ start = 0, page_length = 40, search_term = "" }) {
+	get_items({ start = 0, page_length = 40, search_term = "", after = null }) {
 		const doc = this.events.get_frm().doc;
 		const price_list = (doc && doc.selling_price_list) || this.price_list;
 		let { item_group, pos_profile } = this;
@@ -60,13 +61,33 @@ erpnext.PointOfSale.ItemSelector = class {
 
 		return frappe.call({
 			method: "erpnext.selling.page.point_of_sale.point_of_sale.get_items",
-			freeze: true,
-			args: { start, page_length, price_list, item_group, search_term, pos_profile },
+			freeze: !after,
+			args: { start, page_length, price_list, item_group, search_term, pos_profile, after },
 		});
 	}
 
-	render_item_list(items) {
-		this.$items_container.html("");
+	set_next_page({ message, search_term = "" }) {
+		this.next_cursor = message.next_cursor;
+		this.next_page_search_term = search_term;
+	}
+
+	load_next_page() {
+		if (!this.next_cursor || this.loading_next_page) return;
+
+		this.loading_next_page = true;
+		this.get_items({ search_term: this.next_page_search_term, after: this.next_cursor })
+			.then(({ message }) => {
+				this.set_next_page({ message, search_term: this.next_page_search_term });
+				this.items = (this.items || []).concat(message.items);
+				this.render_item_list(message.items, true);
+			})
+			.always(() => {
+				this.loading_next_page = false;
+			});
+	}
+
+	render_item_list(items, append = false) {
+		!append && this.$items_container.html("");
 
 		items.forEach((item) => {
 			const item_html = this.get_item_html(item);
@@ -269,6 +290,12 @@ erpnext.PointOfSale.ItemSelector = class {
 			me.search_field.set_focus();
 		});
 
+		this.$items_container.on("scroll", function () {
+			if (this.scrollTop + this.clientHeight >= this.scrollHeight - 100) {
+				me.load_next_page();
+			}
+		});
+
 		this.search_field.$input.on("input", (e) => {
 			clearTimeout(this.last_search);
 			this.last_search = setTimeout(() => {
@@ -338,6 +365,7 @@ erpnext.PointOfSale.ItemSelector = class {
 			this.search_index[selling_price_list] = this.search_index[selling_price_list] || {};
 			if (this.search_index[selling_price_list][search_term]) {
 				const items = this.search_index[selling_price_list][search_term];
+				this.set_next_page({ message: {} });
 				this.items = items;
 				this.render_item_list(items);
 				this.auto_add_item && this.items.length == 1 && this.add_filtered_item_to_cart();
@@ -346,6 +374,7 @@ erpnext.PointOfSale.ItemSelector = class {
 		}
 
 		this.get_items({ search_term }).then(({ message }) => {
+			this.set_next_page({ message, search_term });
 			// eslint-disable-next-line no-unused-vars
 			const { items, serial_no, batch_no, barcode } = message;
 			if (search_term && !barcode) {
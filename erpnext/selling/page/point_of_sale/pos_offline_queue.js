@@ -0,0 +1,144 @@
+erpnext.PointOfSale.OfflineQueue = class {
+	constructor({ pos_profile }) {
+		this.storage_key = `pos_offline_invoices:${pos_profile}`;
+		this.failed_storage_key = `pos_offline_failed_invoices:${pos_profile}`;
+
+		window.addEventListener("online", () => this.sync());
+		this.sync();
+	}
+
+	get_invoices() {
+		return JSON.parse(localStorage.getItem(this.storage_key) || "[]");
+	}
+
+	set_invoices(invoices) {
+		localStorage.setItem(this.storage_key, JSON.stringify(invoices));
+	}
+
+	get_failed_invoices() {
+		return JSON.parse(localStorage.getItem(this.failed_storage_key) || "[]");
+	}
+
+	set_failed_invoices(invoices) {
+		localStorage.setItem(this.failed_storage_key, JSON.stringify(invoices));
+	}
+
+	add(doc) {
+		// the id lets the server skip invoices synced before, if a sync response is lost
+		doc.pos_client_id = doc.pos_client_id || frappe.utils.get_random(20);
+		doc.set_posting_time = 1;
+		doc.posting_date = frappe.datetime.get_today();
+		doc.posting_time = frappe.datetime.now_time();
+
+		const invoices = this.get_invoices();
+		invoices.push(doc);
+		this.set_invoices(invoices);
+	}
+
+	sync() {
+		const invoices = this.get_invoices();
+		if (!invoices.length || !navigator.onLine || this.syncing) return;
+
+		this.syncing = true;
+		return frappe
+			.call({
+				method: "erpnext.selling.page.point_of_sale.point_of_sale.sync_invoices",
+				args: { invoices },
+			})
+			.then(({ message }) => {
+				const synced = message.filter((r) => r.status === "Synced").map((r) => r.pos_client_id);
+				const failed = message.filter((r) => r.status === "Failed");
+				const errors = Object.fromEntries(failed.map((r) => [r.pos_client_id, r.error]));
+
+				// invoices that can't be submitted are not sent again, the cashier can retry or discard them
+				const queued = this.get_invoices();
+				this.set_failed_invoices([
+					...this.get_failed_invoices(),
+					...queued
+						.filter((doc) => doc.pos_client_id in errors)
+						.map((doc) => ({ ...doc, sync_error: errors[doc.pos_client_id] })),
+				]);
+
+				// invoices queued while syncing, and the ones pending on a lock, are kept for the next sync
+				this.set_invoices(
+					queued.filter(
+						(doc) => !synced.includes(doc.pos_client_id) && !(doc.pos_client_id in errors)
+					)
+				);
+
+				synced.length &&
+					frappe.show_alert({
+						indicator: "green",
+						message: __("{0} offline POS invoices synced", [synced.length]),
+					});
+				failed.length &&
+					frappe.show_alert({
+						indicator: "red",
+						message: __(
+							"{0} offline POS invoices could not be synced, see Failed Offline Invoices",
+							[failed.length]
+						),
+					});
+			})
+			.always(() => {
+				this.syncing = false;
+			});
+	}
+
+	show_failed_invoices() {
+		const invoices = this.get_failed_invoices();
+		if (!invoices.length) {
+			frappe.msgprint(__("There are no failed offline POS invoices."));
+			return;
+		}
+
+		const rows = invoices
+			.map(
+				(doc) => `<tr>
+					<td>${frappe.utils.escape_html(doc.customer || "")}</td>
+					<td>${frappe.datetime.str_to_user(doc.posting_date)} ${doc.posting_time || ""}</td>
+					<td class="text-right">${format_currency(doc.grand_total, doc.currency)}</td>
+					<td>${frappe.utils.escape_html(doc.sync_error || "")}</td>
+				</tr>`
+			)
+			.join("");
+
+		const dialog = new frappe.ui.Dialog({
+			title: __("Failed Offline Invoices"),
+			size: "large",
+			fields: [
+				{
+					fieldtype: "HTML",
+					fieldname: "invoices",
+					options: `<table class="table table-bordered">
+						<thead><tr>
+							<th>${__("Customer")}</th>
+							<th>${__("Posting Date")}</th>
+							<th class="text-right">${__("Grand Total")}</th>
+							<th>${__("Error")}</th>
+						</tr></thead>
+						<tbody>${rows}</tbody>
+					</table>`,
+				},
+			],
+			primary_action_label: __("Retry"),
+			primary_action: () => {
+				dialog.hide();
+				this.set_failed_invoices([]);
+				this.set_invoices([
+					...this.get_invoices(),
+					...invoices.map(({ sync_error, ...doc }) => doc),
+				]);
+				this.sync();
+			},
+			secondary_action_label: __("Discard"),
+			secondary_action: () => {
+				frappe.confirm(__("Discard {0} failed offline POS invoices?", [invoices.length]), () => {
+					dialog.hide();
+					this.set_failed_invoices([]);
+				});
+			},
+		});
+		dialog.show();
+	}
+};
@@ -8,6 +8,8 @@ from frappe.query_builder import Case, Order
 from frappe.query_builder.functions import Coalesce, CombineDatetime, Sum
 from frappe.utils import flt
 
+from erpnext.stock.doctype.bin_update.bin_update import apply_pending_bin_updates, make_bin_update
+
 
 class Bin(Document):
 	# begin: auto-generated types
@@ -23,6 +25,7 @@ class Bin(Document):
 		item_code: DF.Link
 		ordered_qty: DF.Float
 		planned_qty: DF.Float
+		pos_reserved_qty: DF.Float
 		projected_qty: DF.Float
 		reserved_qty: DF.Float
 		reserved_qty_for_production: DF.Float
@@ -232,6 +235,11 @@ def get_bin_details(bin_name):
 def update_qty(bin_name, args):
 	from erpnext.controllers.stock_controller import future_sle_exists
 
+	if args.get("defer_bin_update"):
+		make_bin_update(bin_name, args)
+		return
+
+	apply_pending_bin_updates(bin_name)
 	bin_details = get_bin_details(bin_name)
 	# actual qty is already updated by processing current voucher
 	actual_qty = bin_details.actual_qty or 0.0
@@ -0,0 +1,162 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.query_builder import Order
+from frappe.query_builder.functions import Sum
+from frappe.utils import flt, now
+
+BIN_UPDATE_FLUSH_BATCH_SIZE = 100
+
+
+class BinUpdate(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		actual_qty: DF.Float
+		bin: DF.Link | None
+		projected_qty: DF.Float
+		stock_value: DF.Float
+	# end: auto-generated types
+
+	pass
+
+
+def is_bin_update_deferred():
+	return frappe.db.get_single_value("Stock Settings", "defer_bin_updates")
+
+
+def can_defer_bin_update(args, via_landed_cost_voucher=False):
+	"""Whether the Bin change of a new Stock Ledger Entry can be saved as a pending Bin Update.
+
+	Only a stock transaction at the end of the ledger changes the Bin by exactly its own qty and
+	value, backdated, cancelled and reconciliation entries set the Bin from the ledger instead.
+	"""
+	from erpnext.controllers.stock_controller import future_sle_exists
+
+	return bool(
+		is_bin_update_deferred()
+		and not via_landed_cost_voucher
+		and not args.get("is_cancelled")
+		and args.get("voucher_type") != "Stock Reconciliation"
+		and not any(
+			args.get(field) for field in ("ordered_qty", "reserved_qty", "indented_qty", "planned_qty")
+		)
+		and not future_sle_exists(args, allow_force_reposting=False)
+	)
+
+
+def make_bin_update(bin_name, args):
+	"""Save the change of a processed Stock Ledger Entry to its Bin as a pending Bin Update."""
+	stock_value_difference = frappe.db.get_value("Stock Ledger Entry", args.name, "stock_value_difference")
+
+	doc = frappe.get_doc(
+		{
+			"doctype": "Bin Update",
+			"bin": bin_name,
+			"actual_qty": flt(args.actual_qty),
+			"projected_qty": flt(args.actual_qty),
+			"stock_value": flt(stock_value_difference),
+		}
+	)
+	doc.flags.ignore_permissions = True
+	doc.insert()
+
+
+def get_pending_bin_updates(item_codes, warehouses):
+	"""Get the sum of pending Bin Updates by (item_code, warehouse).
+
+	Updates made in the current transaction are included.
+	"""
+	bin = frappe.qb.DocType("Bin")
+	bin_update = frappe.qb.DocType("Bin Update")
+
+	updates = (
+		frappe.qb.from_(bin_update)
+		.inner_join(bin)
+		.on(bin_update.bin == bin.name)
+		.select(
+			bin.item_code,
+			bin.warehouse,
+			Sum(bin_update.actual_qty).as_("actual_qty"),
+			Sum(bin_update.projected_qty).as_("projected_qty"),
+			Sum(bin_update.stock_value).as_("stock_value"),
+		)
+		.where(bin.item_code.isin(item_codes) & bin.warehouse.isin(warehouses))
+		.groupby(bin.item_code, bin.warehouse)
+	).run(as_dict=True)
+
+	return {(row.item_code, row.warehouse): row for row in updates}
+
+
+def apply_pending_bin_updates(bin_name):
+	"""Add the pending Bin Updates of a Bin to it and remove them.
+
+	Must be called before the Bin is written from the stock ledger. The updates are locked, so the
+	ones that are not committed yet are added once they are, and new ones wait for this transaction.
+	"""
+	bin_update = frappe.qb.DocType("Bin Update")
+	updates = (
+		frappe.qb.from_(bin_update)
+		.select(bin_update.name, bin_update.actual_qty, bin_update.projected_qty, bin_update.stock_value)
+		.where(bin_update.bin == bin_name)
+		.for_update()
+	).run(as_dict=True)
+
+	if not updates:
+		return
+
+	bin = frappe.qb.DocType("Bin")
+	query = (
+		frappe.qb.update(bin)
+		.set(bin.actual_qty, bin.actual_qty + sum(flt(d.actual_qty) for d in updates))
+		.set(bin.projected_qty, bin.projected_qty + sum(flt(d.projected_qty) for d in updates))
+		.set(bin.stock_value, bin.stock_value + sum(flt(d.stock_value) for d in updates))
+		.set(bin.modified, now())
+		.where(bin.name == bin_name)
+	)
+
+	valuation_rate = get_last_valuation_rate(bin_name)
+	if valuation_rate is not None:
+		query = query.set(bin.valuation_rate, valuation_rate)
+
+	query.run()
+
+	frappe.qb.from_(bin_update).delete().where(bin_update.name.isin([d.name for d in updates])).run()
+
+
+def get_last_valuation_rate(bin_name):
+	item_code, warehouse = frappe.db.get_value("Bin", bin_name, ["item_code", "warehouse"])
+	sle = frappe.qb.DocType("Stock Ledger Entry")
+
+	valuation_rate = (
+		frappe.qb.from_(sle)
+		.select(sle.valuation_rate)
+		.where((sle.item_code == item_code) & (sle.warehouse == warehouse) & (sle.is_cancelled == 0))
+		.orderby(sle.posting_datetime, order=Order.desc)
+		.orderby(sle.creation, order=Order.desc)
+		.limit(1)
+	).run()
+
+	return valuation_rate[0][0] if valuation_rate else None
+
+
+def flush_bin_updates():
+	"""Apply all pending Bin Updates, committing after every batch of Bins."""
+	bin_update = frappe.qb.DocType("Bin Update")
+	bins = frappe.qb.from_(bin_update).select(bin_update.bin).distinct().run(pluck=True)
+
+	for i, bin_name in enumerate(bins, 1):
+		apply_pending_bin_updates(bin_name)
+
+		if i % BIN_UPDATE_FLUSH_BATCH_SIZE == 0 and not frappe.flags.in_test:
+			frappe.db.commit()
+
+	if bins and not frappe.flags.in_test:
+		frappe.db.commit()
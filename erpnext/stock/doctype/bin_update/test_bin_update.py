@@ -0,0 +1,84 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests import IntegrationTestCase, UnitTestCase
+
+from erpnext.stock.doctype.bin_update.bin_update import flush_bin_updates
+from erpnext.stock.doctype.item.test_item import make_item
+from erpnext.stock.doctype.stock_entry.stock_entry_utils import make_stock_entry
+from erpnext.stock.get_item_details import get_bin_details, get_projected_qty
+from erpnext.stock.stock_balance import update_bin_qty
+from erpnext.stock.utils import get_or_make_bin
+
+# On IntegrationTestCase, the doctype test records and all
+# link-field test record depdendencies are recursively loaded
+# Use these module variables to add/remove to/from that list
+EXTRA_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
+IGNORE_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
+
+
+class UnitTestBinUpdate(UnitTestCase):
+	"""
+	Unit tests for BinUpdate.
+	Use this class for testing individual functions and methods.
+	"""
+
+	pass
+
+
+class IntegrationTestBinUpdate(IntegrationTestCase):
+	"""
+	Integration tests for BinUpdate.
+	Use this class for testing interactions between multiple components.
+	"""
+
+	def get_bin(self, bin_name):
+		return frappe.db.get_value(
+			"Bin", bin_name, ["actual_qty", "projected_qty", "stock_value", "reserved_qty"], as_dict=1
+		)
+
+	@IntegrationTestCase.change_settings("Stock Settings", {"defer_bin_updates": 1})
+	def test_deferred_bin_updates(self):
+		item_code = make_item().name
+		warehouse = "_Test Warehouse - _TC"
+
+		make_stock_entry(item_code=item_code, target=warehouse, qty=10, rate=100)
+		make_stock_entry(item_code=item_code, source=warehouse, qty=3)
+
+		bin_name = get_or_make_bin(item_code, warehouse)
+		self.assertEqual(frappe.db.count("Bin Update", {"bin": bin_name}), 2)
+		self.assertEqual(self.get_bin(bin_name).actual_qty, 0)
+
+		# lookups include the pending updates of the current transaction
+		bin_details = get_bin_details(item_code, warehouse)
+		self.assertEqual(bin_details["actual_qty"], 7)
+		self.assertEqual(bin_details["projected_qty"], 7)
+		self.assertEqual(get_projected_qty(item_code, warehouse)["projected_qty"], 7)
+
+		flush_bin_updates()
+		self.assertFalse(frappe.db.exists("Bin Update", {"bin": bin_name}))
+
+		bin = self.get_bin(bin_name)
+		self.assertEqual(bin.actual_qty, 7)
+		self.assertEqual(bin.projected_qty, 7)
+		self.assertEqual(bin.stock_value, 700)
+		self.assertEqual(get_bin_details(item_code, warehouse)["actual_qty"], 7)
+
+	@IntegrationTestCase.change_settings("Stock Settings", {"defer_bin_updates": 1})
+	def test_direct_bin_write_applies_pending_updates(self):
+		item_code = make_item().name
+		warehouse = "_Test Warehouse - _TC"
+
+		make_stock_entry(item_code=item_code, target=warehouse, qty=10, rate=100)
+		bin_name = get_or_make_bin(item_code, warehouse)
+
+		# the Bin is written back as a whole, the pending qty must not be lost or counted twice
+		update_bin_qty(item_code, warehouse, {"reserved_qty": 4})
+		self.assertFalse(frappe.db.exists("Bin Update", {"bin": bin_name}))
+
+		bin = self.get_bin(bin_name)
+		self.assertEqual(bin.actual_qty, 10)
+		self.assertEqual(bin.reserved_qty, 4)
+		self.assertEqual(bin.projected_qty, 6)
+		self.assertEqual(get_projected_qty(item_code, warehouse)["projected_qty"], 6)
@@ -1,6 +1,8 @@
 # Copyright (c) 2020, Frappe Technologies Pvt. Ltd. and contributors
 # For license information, please see license.txt
 
+import time
+
 import frappe
 from frappe import _
 from frappe.desk.form.load import get_attachments
@@ -9,6 +11,7 @@ from frappe.model.document import Document
 from frappe.query_builder import DocType, Interval
 from frappe.query_builder.functions import Max, Now
 from frappe.utils import cint, get_link_to_form, get_weekday, getdate, now, nowtime
+from frappe.utils.background_jobs import enqueue, is_job_enqueued
 from frappe.utils.user import get_users_with_role
 from rq.timeouts import JobTimeoutException
 
@@ -20,8 +23,37 @@ from erpnext.stock.stock_ledger import (
 	get_items_to_be_repost,
 	repost_future_sle,
 )
+from erpnext.stock.utils import get_combine_datetime
+
+
+class RepostLockLostError(frappe.ValidationError):
+	pass
+
+
+RecoverableErrors = (JobTimeoutException, QueryDeadlockError, QueryTimeoutError, RepostLockLostError)
 
-RecoverableErrors = (JobTimeoutException, QueryDeadlockError, QueryTimeoutError)
+REPOST_JOB_TIMEOUT = 4 * 60 * 60
+REPOST_PARTITION_MAX_DEPTH = 5
+# bounds of the search for linked items when splitting reposts into partitions
+REPOST_PARTITION_MAX_VOUCHERS = 5000
+REPOST_PARTITION_MAX_ITEMS = 1000
+
+# locks on items expire unless the job holding them is still reposting
+REPOST_LOCK_TTL = 10 * 60
+
+# delete or extend the lock only if it is still held with the same token
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+	return redis.call("del", KEYS[1])
+end
+return 0
+"""
+EXTEND_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+	return redis.call("expire", KEYS[1], ARGV[2])
+end
+return 0
+"""
 
 
 class RepostItemValuation(Document):
@@ -48,6 +80,7 @@ class RepostItemValuation(Document):
 		posting_date: DF.Date
 		posting_time: DF.Time | None
 		reposting_data_file: DF.Attach | None
+		skipped_entries: DF.Int
 		status: DF.Literal["Queued", "In Progress", "Completed", "Skipped", "Failed"]
 		total_reposting_count: DF.Int
 		via_landed_cost_voucher: DF.Check
@@ -251,10 +284,16 @@ def on_doctype_update():
 
 
 def repost(doc):
+	if not frappe.db.exists("Repost Item Valuation", doc.name):
+		return
+
+	# another job is reposting some of the items, try again in the next run
+	locked_items = acquire_repost_lock(get_repost_items(doc))
+	if locked_items is None:
+		return
+
 	try:
 		frappe.flags.through_repost_item_valuation = True
-		if not frappe.db.exists("Repost Item Valuation", doc.name):
-			return
 
 		# This is to avoid TooManyWritesError in case of large reposts
 		frappe.db.MAX_WRITES_PER_TRANSACTION *= 4
@@ -264,6 +303,7 @@ def repost(doc):
 			frappe.db.commit()
 
 		repost_sl_entries(doc)
+		extend_repost_locks()
 		repost_gl_entries(doc)
 
 		doc.set_status("Completed")
@@ -289,6 +329,10 @@ def repost(doc):
 		if traceback and "timeout" in traceback.lower():
 			status = "In Progress"
 
+		# another job may be reposting the items now, repost them again once it is done
+		if isinstance(e, RepostLockLostError):
+			status = "Queued"
+
 		if traceback:
 			message += "<br><br>" + "<b>Traceback:</b> <br>" + traceback
 
@@ -312,6 +356,15 @@ def repost(doc):
 		if not frappe.flags.in_test:
 			frappe.db.commit()
 
+		release_repost_lock(locked_items)
+
+
+def get_repost_items(doc):
+	if doc.based_on == "Transaction":
+		return sorted(get_voucher_items([doc.voucher_no]).get(doc.voucher_no, ()))
+
+	return [doc.item_code]
+
 
 def remove_attached_file(docname):
 	if file_name := frappe.db.get_value(
@@ -433,6 +486,15 @@ def repost_entries():
 
 	riv_entries = get_repost_item_valuation_entries()
 
+	no_of_jobs = cint(frappe.db.get_single_value("Stock Reposting Settings", "no_of_parallel_reposting_jobs"))
+	if no_of_jobs > 1 and len(riv_entries) > 1:
+		partitions = get_repost_partitions(riv_entries)
+		if len(partitions) > 1:
+			enqueue_repost_partitions(partitions, no_of_jobs)
+		else:
+			repost_partition(partitions[0])
+		return
+
 	for row in riv_entries:
 		doc = frappe.get_doc("Repost Item Valuation", row.name)
 		if doc.status in ("Queued", "In Progress"):
@@ -444,6 +506,241 @@ def repost_entries():
 		return
 
 
+def get_repost_partitions(riv_entries):
+	"""Split pending reposts into groups which can be reposted independently.
+
+	Two reposts end up in the same group if they touch the same item, or if their
+	items are linked through a later stock voucher (transfer, manufacture, repack,
+	multi-item receipt etc.) whose valuation or GL entries both of them would rewrite."""
+
+	names = [row.name for row in riv_entries]
+	reposts = frappe.get_all(
+		"Repost Item Valuation",
+		filters={"name": ("in", names)},
+		fields=["name", "based_on", "voucher_no", "item_code", "posting_date", "posting_time"],
+	)
+
+	voucher_items = get_voucher_items([d.voucher_no for d in reposts if d.based_on == "Transaction"])
+
+	parent = {}
+
+	def find(item):
+		parent.setdefault(item, item)
+		while parent[item] != item:
+			parent[item] = parent[parent[item]]
+			item = parent[item]
+		return item
+
+	def union(items):
+		items = list(items)
+		root = find(items[0])
+		for item in items[1:]:
+			parent[find(item)] = root
+
+	repost_items = {}
+	for d in reposts:
+		items = voucher_items.get(d.voucher_no, set()) if d.based_on == "Transaction" else {d.item_code}
+		repost_items[d.name] = items
+		if items:
+			union(items)
+
+	from_datetime = min(get_combine_datetime(d.posting_date, d.posting_time) for d in reposts)
+	new_items = set(parent)
+	for _i in range(REPOST_PARTITION_MAX_DEPTH):
+		linked_vouchers = get_linked_vouchers(new_items, from_datetime)
+		if linked_vouchers is None or len(parent) > REPOST_PARTITION_MAX_ITEMS:
+			break
+
+		new_items = set()
+		for items in get_voucher_items(linked_vouchers).values():
+			new_items.update(item for item in items if item not in parent)
+			union(items)
+
+		if not new_items:
+			break
+
+	if new_items:
+		# dependency chain is too long or too wide to follow, repost everything in one job
+		return [{"entries": names, "items": sorted(parent)}]
+
+	# lock every linked item, not just the reposted ones, as reposting cascades into them
+	component_items = {}
+	for item in parent:
+		component_items.setdefault(find(item), []).append(item)
+
+	partitions = {}
+	for row in riv_entries:
+		# reposts without any stock ledger entries don't touch any item
+		items = repost_items.get(row.name)
+		root = find(next(iter(items))) if items else None
+		partition = partitions.setdefault(
+			root, {"entries": [], "items": sorted(component_items.get(root, []))}
+		)
+		partition["entries"].append(row.name)
+
+	return list(partitions.values())
+
+
+def get_voucher_items(vouchers):
+	"""Returns items of the given vouchers, grouped by voucher."""
+	if not vouchers:
+		return {}
+
+	sle = frappe.qb.DocType("Stock Ledger Entry")
+	# includes cancelled entries, reposts are also created on cancellation
+	query = (
+		frappe.qb.from_(sle)
+		.select(sle.voucher_no, sle.item_code)
+		.distinct()
+		.where(sle.voucher_no.isin(vouchers))
+	)
+
+	voucher_items = {}
+	for row in query.run(as_dict=True):
+		voucher_items.setdefault(row.voucher_no, set()).add(row.item_code)
+
+	return voucher_items
+
+
+def get_linked_vouchers(items, from_datetime):
+	"""Returns vouchers posted after `from_datetime` which include any of the given items,
+	or None if there are more than `REPOST_PARTITION_MAX_VOUCHERS` of them."""
+	if not items:
+		return []
+
+	sle = frappe.qb.DocType("Stock Ledger Entry")
+	vouchers = (
+		frappe.qb.from_(sle)
+		.select(sle.voucher_no)
+		.distinct()
+		.where(
+			(sle.item_code.isin(list(items)))
+			& (sle.posting_datetime >= from_datetime)
+			& (sle.is_cancelled == 0)
+		)
+		.limit(REPOST_PARTITION_MAX_VOUCHERS + 1)
+	).run(pluck=True)
+
+	if len(vouchers) > REPOST_PARTITION_MAX_VOUCHERS:
+		return None
+
+	return vouchers
+
+
+def enqueue_repost_partitions(partitions, no_of_jobs):
+	"""Distribute partitions across `no_of_jobs` background jobs, largest first."""
+
+	buckets = [[] for _i in range(no_of_jobs)]
+	for partition in sorted(partitions, key=lambda d: len(d["entries"]), reverse=True):
+		bucket = min(buckets, key=lambda d: sum(len(p["entries"]) for p in d))
+		bucket.append(partition)
+
+	for index, bucket in enumerate(buckets):
+		if not bucket:
+			continue
+
+		job_id = f"repost_item_valuation::{index}"
+		if is_job_enqueued(job_id):
+			# still busy with the last run, the lock on items keeps the rest consistent
+			continue
+
+		enqueue(
+			repost_partitions,
+			partitions=bucket,
+			queue="long",
+			timeout=REPOST_JOB_TIMEOUT,
+			job_id=job_id,
+			now=frappe.flags.in_test,
+		)
+
+
+def repost_partitions(partitions):
+	for partition in partitions:
+		repost_partition(partition)
+
+
+def repost_partition(partition):
+	"""Repost entries of a partition in order, unless another job is reposting any of its items."""
+
+	locked_items = acquire_repost_lock(partition["items"])
+	if locked_items is None:
+		return
+
+	try:
+		for name in partition["entries"]:
+			doc = frappe.get_doc("Repost Item Valuation", name)
+			if doc.status in ("Queued", "In Progress"):
+				repost(doc)
+				doc.deduplicate_similar_repost()
+	finally:
+		release_repost_lock(locked_items)
+
+
+def get_repost_lock_key(item_code):
+	return frappe.cache.make_key(f"repost_item_valuation_lock::{item_code}")
+
+
+def get_held_repost_locks():
+	"""Tokens of the item locks held by this job, by item."""
+	if not hasattr(frappe.local, "repost_locks"):
+		frappe.local.repost_locks = {}
+
+	return frappe.local.repost_locks
+
+
+def acquire_repost_lock(items):
+	"""Lock items for reposting.
+
+	Returns the items locked by this call, items already locked by this job are skipped.
+	Returns None without locking anything if another job holds any of the items."""
+	held = get_held_repost_locks()
+	token = frappe.generate_hash(length=12)
+	locked = []
+	for item_code in items:
+		if item_code in held:
+			continue
+
+		if not frappe.cache.set(get_repost_lock_key(item_code), token, nx=True, ex=REPOST_LOCK_TTL):
+			release_repost_lock(locked)
+			return
+
+		held[item_code] = token
+		locked.append(item_code)
+
+	frappe.local.repost_locks_extended_at = time.monotonic()
+	return locked
+
+
+def release_repost_lock(items):
+	held = get_held_repost_locks()
+	for item_code in items:
+		if token := held.pop(item_code, None):
+			frappe.cache.eval(RELEASE_LOCK_SCRIPT, 1, get_repost_lock_key(item_code), token)
+
+
+def extend_repost_locks():
+	"""Keep the item locks of this job from expiring while it is still reposting.
+
+	Cheap enough to be called for every entry reposted, the locks are only extended every few minutes.
+	Raises `RepostLockLostError` if a lock expired, as another job could have taken it meanwhile."""
+	held = get_held_repost_locks()
+	if not held or time.monotonic() - frappe.local.repost_locks_extended_at < REPOST_LOCK_TTL / 3:
+		return
+
+	for item_code, token in held.items():
+		if not frappe.cache.eval(
+			EXTEND_LOCK_SCRIPT, 1, get_repost_lock_key(item_code), token, REPOST_LOCK_TTL
+		):
+			frappe.throw(
+				_("Lost the lock on item {0} while reposting, it will be reposted again").format(
+					frappe.bold(item_code)
+				),
+				RepostLockLostError,
+			)
+
+	frappe.local.repost_locks_extended_at = time.monotonic()
+
+
 def get_repost_item_valuation_entries():
 	return frappe.db.sql(
 		""" SELECT name from `tabRepost Item Valuation`
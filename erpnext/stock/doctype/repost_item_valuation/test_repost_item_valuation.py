@@ -2,6 +2,7 @@
 # See license.txt
 
 
+import os
 from unittest.mock import MagicMock, call
 
 import frappe
@@ -455,3 +456,164 @@ class TestRepostItemValuation(IntegrationTestCase, StockTestMixin):
 						"name",
 					)
 				)
+
+	def test_repost_partitions(self):
+		from erpnext.stock.doctype.repost_item_valuation.repost_item_valuation import (
+			REPOST_LOCK_TTL,
+			RepostLockLostError,
+			acquire_repost_lock,
+			extend_repost_locks,
+			get_repost_lock_key,
+			get_repost_partitions,
+			release_repost_lock,
+		)
+
+		item_a, item_b, item_c = (make_item().name for _ in range(3))
+		warehouse = "_Test Warehouse - _TC"
+
+		# a later receipt with both a and c links them, b stays on its own
+		se = make_stock_entry(
+			item_code=item_a,
+			to_warehouse=warehouse,
+			qty=5,
+			rate=100,
+			posting_date=add_days(today(), -5),
+			do_not_submit=True,
+		)
+		se.append(
+			"items",
+			{
+				"item_code": item_c,
+				"t_warehouse": warehouse,
+				"qty": 5,
+				"basic_rate": 100,
+				"conversion_factor": 1.0,
+				"transfer_qty": 5,
+			},
+		)
+		se.submit()
+		make_stock_entry(
+			item_code=item_b, to_warehouse=warehouse, qty=5, rate=100, posting_date=add_days(today(), -5)
+		)
+
+		rivs = []
+		for item_code in (item_a, item_b, item_c):
+			riv = frappe.get_doc(
+				doctype="Repost Item Valuation",
+				item_code=item_code,
+				warehouse=warehouse,
+				based_on="Item and Warehouse",
+				posting_date=add_days(today(), -10),
+				posting_time="00:01:00",
+			)
+			riv.flags.dont_run_in_test = True
+			riv.submit()
+			rivs.append(riv)
+
+		partitions = get_repost_partitions([frappe._dict(name=riv.name) for riv in rivs])
+		self.assertEqual(len(partitions), 2)
+		self.assertIn(
+			{"entries": [rivs[0].name, rivs[2].name], "items": sorted([item_a, item_c])}, partitions
+		)
+		self.assertIn({"entries": [rivs[1].name], "items": [item_b]}, partitions)
+
+		# items being reposted by another job can't be locked
+		lock_key = get_repost_lock_key(item_c)
+		frappe.cache.set(lock_key, "another-job", ex=60)
+		self.assertIsNone(acquire_repost_lock([item_b, item_c]))
+		self.assertFalse(frappe.cache.exists(get_repost_lock_key(item_b)))
+
+		# nor released by this job
+		release_repost_lock([item_c])
+		self.assertEqual(frappe.safe_decode(frappe.cache.get(lock_key)), "another-job")
+		frappe.cache.delete(lock_key)
+
+		locked_items = acquire_repost_lock([item_b, item_c])
+		self.assertEqual(locked_items, [item_b, item_c])
+		# locks already held by this job are not taken again
+		self.assertEqual(acquire_repost_lock([item_c]), [])
+
+		# a lock taken over by another job after expiring stops the repost
+		frappe.cache.set(lock_key, "another-job", ex=60)
+		frappe.local.repost_locks_extended_at -= REPOST_LOCK_TTL
+		self.assertRaises(RepostLockLostError, extend_repost_locks)
+		frappe.cache.delete(lock_key)
+
+		release_repost_lock(locked_items)
+		self.assertFalse(frappe.cache.exists(lock_key))
+
+		for riv in rivs:
+			riv.set_status("Skipped")
+
+	def test_reposting_data_log(self):
+		from erpnext.stock.stock_ledger import (
+			RepostingDataLog,
+			get_affected_transactions,
+			get_distinct_item_warehouse,
+			get_items_to_be_repost,
+			get_reposting_data,
+			remove_reposting_file,
+		)
+
+		riv = frappe.get_doc(
+			doctype="Repost Item Valuation",
+			item_code="_Test Item",
+			warehouse="_Test Warehouse - _TC",
+			based_on="Item and Warehouse",
+			posting_date=today(),
+			posting_time="00:01:00",
+		)
+		riv.flags.dont_run_in_test = True
+		riv.submit()
+		self.addCleanup(riv.set_status, "Skipped")
+		self.addCleanup(remove_reposting_file, riv)
+
+		args = [
+			frappe._dict(item_code="_Test Item", warehouse="_Test Warehouse - _TC", posting_date=today()),
+		]
+		distinct_item_warehouses = {
+			("_Test Item", "_Test Warehouse - _TC"): frappe._dict(
+				reposting_status=False, sle=args[0], args_idx=0
+			)
+		}
+		affected_transactions = {("Stock Entry", "STE-1")}
+
+		log = RepostingDataLog(riv)
+		log.append(args, distinct_item_warehouses, affected_transactions)
+		file_url = riv.reposting_data_file
+		self.assertTrue(file_url.endswith(".ndjson.gz"))
+
+		# only changes are appended on later checkpoints
+		args.append(frappe._dict(item_code="_Test Item 2", warehouse="_Test Warehouse - _TC"))
+		distinct_item_warehouses[("_Test Item", "_Test Warehouse - _TC")].reposting_status = True
+		affected_transactions.add(("Stock Entry", "STE-2"))
+		log.append(args, distinct_item_warehouses, affected_transactions)
+		self.assertEqual(log.get_records(args, distinct_item_warehouses, affected_transactions), [])
+
+		args[1] = frappe._dict(item_code="_Test Item 2", warehouse="Stores - _TC")
+		log.append(args, distinct_item_warehouses, affected_transactions)
+		self.assertEqual(riv.reposting_data_file, file_url)
+
+		# rows changed in place are logged too
+		args[0].posting_date = add_days(today(), -1)
+		log.append(args, distinct_item_warehouses, affected_transactions)
+
+		reposting_data = get_reposting_data(riv.reposting_data_file)
+		items_to_be_repost = get_items_to_be_repost(doc=riv, reposting_data=reposting_data)
+		self.assertEqual(
+			[row.warehouse for row in items_to_be_repost], ["_Test Warehouse - _TC", "Stores - _TC"]
+		)
+		self.assertEqual(str(items_to_be_repost[0].posting_date), add_days(today(), -1))
+		self.assertEqual(
+			frappe.db.get_value("File", {"file_url": file_url}, "file_size"),
+			os.path.getsize(frappe.get_doc("File", {"file_url": file_url}).get_full_path()),
+		)
+		self.assertTrue(
+			get_distinct_item_warehouse(doc=riv, reposting_data=reposting_data)[
+				("_Test Item", "_Test Warehouse - _TC")
+			].reposting_status
+		)
+		self.assertEqual(
+			get_affected_transactions(riv, reposting_data=reposting_data),
+			{("Stock Entry", "STE-1"), ("Stock Entry", "STE-2")},
+		)
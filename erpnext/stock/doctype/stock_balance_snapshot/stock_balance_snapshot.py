@@ -0,0 +1,339 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.query_builder import Order
+from frappe.utils import cint, flt, now
+from frappe.utils.background_jobs import enqueue, is_job_enqueued
+
+SNAPSHOT_FIELDS = (
+	"opening_qty",
+	"opening_val",
+	"in_qty",
+	"in_val",
+	"out_qty",
+	"out_val",
+	"actual_qty",
+	"stock_value_difference",
+)
+
+
+class StockBalanceSnapshot(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		actual_qty: DF.Float
+		company: DF.Link | None
+		in_qty: DF.Float
+		in_val: DF.Currency
+		item_code: DF.Link | None
+		opening_qty: DF.Float
+		opening_val: DF.Currency
+		out_qty: DF.Float
+		out_val: DF.Currency
+		posting_date: DF.Date | None
+		stock_value_difference: DF.Currency
+		valuation_rate: DF.Currency
+		warehouse: DF.Link | None
+	# end: auto-generated types
+
+	pass
+
+
+def is_stock_balance_snapshot_enabled() -> bool:
+	return cint(frappe.db.get_single_value("Stock Settings", "maintain_stock_balance_snapshots"))
+
+
+def is_stock_balance_snapshot_ready() -> bool:
+	return is_stock_balance_snapshot_enabled() and cint(
+		frappe.db.get_single_value("Stock Settings", "stock_balance_snapshots_ready")
+	)
+
+
+def update_stock_balance_snapshots(item_code, warehouse, from_date=None):
+	"""Rebuild the daily snapshots of the item and warehouse from the posting date onwards."""
+	lock_item_warehouse(item_code, warehouse)
+
+	snapshot = frappe.qb.DocType("Stock Balance Snapshot")
+	query = (
+		frappe.qb.from_(snapshot)
+		.delete()
+		.where((snapshot.item_code == item_code) & (snapshot.warehouse == warehouse))
+	)
+	if from_date:
+		query = query.where(snapshot.posting_date >= from_date)
+	query.run()
+
+	entries = get_stock_ledger_entries(item_code, warehouse, from_date=from_date)
+	if not entries:
+		return
+
+	bal_qty = get_balance_qty_before(item_code, warehouse, from_date) if from_date else 0.0
+	make_stock_balance_snapshots(item_code, warehouse, get_snapshots(entries, bal_qty))
+
+
+def add_to_stock_balance_snapshots(item_code, warehouse, sle_names):
+	"""Add the movements of new stock ledger entries to the snapshots of their posting dates."""
+	lock_item_warehouse(item_code, warehouse)
+
+	entries = get_stock_ledger_entries(item_code, warehouse, sle_names=sle_names)
+	if not entries:
+		return
+
+	snapshot = frappe.qb.DocType("Stock Balance Snapshot")
+	new_snapshots = {}
+	for posting_date, row in get_snapshots(entries).items():
+		existing = (
+			frappe.qb.from_(snapshot)
+			.select(snapshot.name)
+			.where(
+				(snapshot.item_code == item_code)
+				& (snapshot.warehouse == warehouse)
+				& (snapshot.posting_date == posting_date)
+			)
+			.limit(1)
+			.for_update()
+		).run()
+
+		if not existing:
+			new_snapshots[posting_date] = row
+			continue
+
+		query = frappe.qb.update(snapshot).where(snapshot.name == existing[0][0])
+		for field in SNAPSHOT_FIELDS:
+			query = query.set(snapshot[field], snapshot[field] + row[field])
+		query.set(snapshot.valuation_rate, row.valuation_rate).run()
+
+	if new_snapshots:
+		make_stock_balance_snapshots(item_code, warehouse, new_snapshots)
+
+
+def lock_item_warehouse(item_code, warehouse):
+	"""Snapshots of an item and warehouse are changed under the row lock of its Bin, which stock
+	transactions already hold, and are read with locking reads so that no committed entry is missed."""
+	bin = frappe.qb.DocType("Bin")
+	(
+		frappe.qb.from_(bin)
+		.select(bin.name)
+		.where((bin.item_code == item_code) & (bin.warehouse == warehouse))
+		.for_update()
+	).run()
+
+
+def get_snapshots(entries, bal_qty=0.0) -> dict:
+	opening_vouchers = get_opening_vouchers(entries)
+	float_precision = cint(frappe.db.get_default("float_precision")) or 3
+
+	snapshots = {}
+	for entry in entries:
+		row = snapshots.get(entry.posting_date)
+		if not row:
+			row = snapshots[entry.posting_date] = frappe._dict(
+				{"company": entry.company, **dict.fromkeys(SNAPSHOT_FIELDS, 0.0)}
+			)
+
+		# same rules as the Stock Balance report
+		if entry.voucher_type == "Stock Reconciliation" and (not entry.batch_no or entry.serial_no):
+			qty_diff = flt(entry.qty_after_transaction) - flt(bal_qty)
+		else:
+			qty_diff = flt(entry.actual_qty)
+
+		value_diff = flt(entry.stock_value_difference)
+
+		if (entry.voucher_type, entry.voucher_no) in opening_vouchers:
+			row.opening_qty += qty_diff
+			row.opening_val += value_diff
+		elif flt(qty_diff, float_precision) >= 0:
+			row.in_qty += qty_diff
+			row.in_val += value_diff
+		else:
+			row.out_qty += abs(qty_diff)
+			row.out_val += abs(value_diff)
+
+		row.actual_qty += qty_diff
+		row.stock_value_difference += value_diff
+		row.valuation_rate = entry.valuation_rate
+		bal_qty += qty_diff
+
+	return snapshots
+
+
+def get_stock_ledger_entries(item_code, warehouse, from_date=None, sle_names=None):
+	sle = frappe.qb.DocType("Stock Ledger Entry")
+
+	query = (
+		frappe.qb.from_(sle)
+		.select(
+			sle.posting_date,
+			sle.company,
+			sle.voucher_type,
+			sle.voucher_no,
+			sle.actual_qty,
+			sle.qty_after_transaction,
+			sle.stock_value_difference,
+			sle.valuation_rate,
+			sle.batch_no,
+			sle.serial_no,
+		)
+		.where((sle.item_code == item_code) & (sle.warehouse == warehouse) & (sle.is_cancelled == 0))
+		.orderby(sle.posting_datetime)
+		.orderby(sle.creation)
+		.orderby(sle.actual_qty)
+		.for_update()
+	)
+
+	if from_date:
+		query = query.where(sle.posting_date >= from_date)
+
+	if sle_names:
+		query = query.where(sle.name.isin(sle_names))
+
+	return query.run(as_dict=True)
+
+
+def get_balance_qty_before(item_code, warehouse, posting_date) -> float:
+	sle = frappe.qb.DocType("Stock Ledger Entry")
+
+	balance = (
+		frappe.qb.from_(sle)
+		.select(sle.qty_after_transaction)
+		.where(
+			(sle.item_code == item_code)
+			& (sle.warehouse == warehouse)
+			& (sle.is_cancelled == 0)
+			& (sle.posting_date < posting_date)
+		)
+		.orderby(sle.posting_datetime, order=Order.desc)
+		.orderby(sle.creation, order=Order.desc)
+		.limit(1)
+		.for_update()
+	).run()
+
+	return flt(balance[0][0]) if balance else 0.0
+
+
+def get_opening_vouchers(entries) -> set[tuple[str, str]]:
+	vouchers = {"Stock Entry": set(), "Stock Reconciliation": set()}
+	for entry in entries:
+		if entry.voucher_type in vouchers:
+			vouchers[entry.voucher_type].add(entry.voucher_no)
+
+	opening_vouchers = set()
+	if vouchers["Stock Entry"]:
+		for name in frappe.get_all(
+			"Stock Entry",
+			filters={"name": ("in", list(vouchers["Stock Entry"])), "is_opening": "Yes"},
+			pluck="name",
+		):
+			opening_vouchers.add(("Stock Entry", name))
+
+	if vouchers["Stock Reconciliation"]:
+		for name in frappe.get_all(
+			"Stock Reconciliation",
+			filters={"name": ("in", list(vouchers["Stock Reconciliation"])), "purpose": "Opening Stock"},
+			pluck="name",
+		):
+			opening_vouchers.add(("Stock Reconciliation", name))
+
+	return opening_vouchers
+
+
+def make_stock_balance_snapshots(item_code, warehouse, snapshots):
+	user = frappe.session.user
+	timestamp = now()
+
+	values = []
+	for posting_date, row in snapshots.items():
+		values.append(
+			(
+				frappe.generate_hash(),
+				timestamp,
+				timestamp,
+				user,
+				user,
+				item_code,
+				warehouse,
+				posting_date,
+				row.company,
+				*(row[field] for field in SNAPSHOT_FIELDS),
+				row.valuation_rate,
+			)
+		)
+
+	fields = [
+		"name",
+		"creation",
+		"modified",
+		"owner",
+		"modified_by",
+		"item_code",
+		"warehouse",
+		"posting_date",
+		"company",
+		*SNAPSHOT_FIELDS,
+		"valuation_rate",
+	]
+
+	frappe.db.bulk_insert("Stock Balance Snapshot", fields=fields, values=values)
+
+
+def update_snapshots_for_item_warehouses(item_warehouses, cancel=False):
+	"""Update snapshots for a dict of (item_code, warehouse) to the stock ledger entries of a voucher.
+
+	New entries are added to the snapshots of their posting date. Cancellations and stock
+	reconciliations change the balance they are measured against, so the snapshots of those are
+	rebuilt from the earliest posting date instead. Entries after a backdated posting are rebuilt
+	by its repost."""
+	if not item_warehouses or not is_stock_balance_snapshot_enabled():
+		return
+
+	for (item_code, warehouse), data in item_warehouses.items():
+		if cancel or data.voucher_type == "Stock Reconciliation":
+			update_stock_balance_snapshots(item_code, warehouse, data.posting_date)
+		else:
+			add_to_stock_balance_snapshots(item_code, warehouse, data.sle_names)
+
+
+def enqueue_rebuild_stock_balance_snapshots():
+	job_id = "rebuild_stock_balance_snapshots"
+	if not is_job_enqueued(job_id):
+		enqueue(
+			rebuild_stock_balance_snapshots,
+			queue="long",
+			timeout=4 * 60 * 60,
+			job_id=job_id,
+			now=frappe.flags.in_test,
+		)
+
+
+def rebuild_stock_balance_snapshots():
+	"""Build snapshots of all items and warehouses from the start of the stock ledger."""
+	frappe.db.set_single_value("Stock Settings", "stock_balance_snapshots_ready", 0)
+
+	frappe.db.delete("Stock Balance Snapshot")
+	item_warehouses = frappe.get_all(
+		"Stock Ledger Entry",
+		filters={"is_cancelled": 0},
+		fields=["item_code", "warehouse"],
+		distinct=True,
+	)
+
+	for row in item_warehouses:
+		if not is_stock_balance_snapshot_enabled():
+			return
+
+		update_stock_balance_snapshots(row.item_code, row.warehouse)
+		if not frappe.flags.in_test:
+			frappe.db.commit()
+
+	frappe.db.set_single_value("Stock Settings", "stock_balance_snapshots_ready", 1)
+
+
+def on_doctype_update():
+	frappe.db.add_index("Stock Balance Snapshot", ["item_code", "warehouse", "posting_date"])
@@ -971,6 +971,89 @@ class TestStockLedgerEntry(IntegrationTestCase, StockTestMixin):
 		# same exact queue should be transferred
 		self.assertSLEs(repack, [{"incoming_rate": sum(rates) * 10}], sle_filters={"item_code": packed.name})
 
+	def test_batched_multi_item_reposting(self):
+		from erpnext.stock.stock_ledger import BatchedRepostContext, repost_future_sle
+
+		items = [make_item(properties={"valuation_method": "FIFO"}).name for _ in range(3)]
+		warehouse = "_Test Warehouse - _TC"
+
+		for item in items:
+			make_stock_entry(item_code=item, target=warehouse, qty=10, rate=10, posting_date="2021-01-01")
+			make_stock_entry(item_code=item, target=warehouse, qty=10, rate=20, posting_date="2021-01-03")
+
+		consumptions = [
+			create_delivery_note(
+				item_code=item, warehouse=warehouse, qty=15, rate=100, posting_date="2021-01-05"
+			)
+			for item in items
+		]
+
+		# back-dated rate change, reposted for all items in one run
+		frappe.db.set_value(
+			"Stock Ledger Entry",
+			{"item_code": ("in", items), "posting_date": "2021-01-01", "is_cancelled": 0},
+			"incoming_rate",
+			30,
+		)
+		args = [
+			frappe._dict(
+				item_code=item, warehouse=warehouse, posting_date="2021-01-01", posting_time="00:00:00"
+			)
+			for item in items
+		]
+
+		context = BatchedRepostContext(args, prefetch_size=2)
+		context.prefetch(0)
+		self.assertEqual(len(context.future_entries), 2)
+
+		repost_future_sle(args=args, allow_negative_stock=True)
+
+		for item, dn in zip(items, consumptions, strict=True):
+			self.assertSLEs(
+				dn,
+				[{"stock_value_difference": -(10 * 30 + 5 * 20), "stock_queue": [[5, 20]]}],
+				sle_filters={"item_code": item},
+			)
+			self.assertEqual(
+				frappe.db.get_value("Bin", {"item_code": item, "warehouse": warehouse}, "stock_value"), 100
+			)
+
+	def test_reposting_stops_on_convergence(self):
+		from erpnext.stock.stock_ledger import REPOST_CONVERGENCE_ENTRIES, update_entries_after
+
+		item = make_item(properties={"valuation_method": "FIFO"}).name
+		warehouse = "_Test Warehouse - _TC"
+
+		receipt = make_stock_entry(
+			item_code=item, target=warehouse, qty=10, rate=10, posting_date="2021-01-01"
+		)
+		issue = make_stock_entry(item_code=item, source=warehouse, qty=10, posting_date="2021-01-02")
+		for day in range(3, 13):
+			make_stock_entry(
+				item_code=item, target=warehouse, qty=10, rate=day, posting_date=f"2021-01-{day:02}"
+			)
+
+		# fix rate of the old receipt, its stock is fully consumed by the issue
+		frappe.db.set_value("Stock Ledger Entry", {"voucher_no": receipt.name}, "incoming_rate", 20)
+
+		obj = update_entries_after(
+			{
+				"item_code": item,
+				"warehouse": warehouse,
+				"posting_date": "2021-01-01",
+				"posting_time": "00:00:00",
+				"stop_on_convergence": True,
+			}
+		)
+
+		# receipt and issue change, then the valuation is the same as posted
+		self.assertEqual(obj.skipped_entries, 12 - 2 - REPOST_CONVERGENCE_ENTRIES)
+		self.assertSLEs(issue, [{"stock_value_difference": -200}])
+		self.assertEqual(
+			frappe.db.get_value("Bin", {"item_code": item, "warehouse": warehouse}, "stock_value"),
+			sum(10 * day for day in range(3, 13)),
+		)
+
 	def test_negative_fifo_valuation(self):
 		"""
 		When stock goes negative discard FIFO queue.
@@ -23,6 +23,7 @@ class StockRepostingSettings(Document):
 		limits_dont_apply_on: DF.Literal[
 			"", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"
 		]
+		no_of_parallel_reposting_jobs: DF.Int
 		notify_reposting_error_to_role: DF.Link | None
 		start_time: DF.Time | None
 	# end: auto-generated types
@@ -40,12 +40,14 @@ class StockSettings(Document):
 		auto_reserve_stock_for_sales_order_on_purchase: DF.Check
 		clean_description_html: DF.Check
 		default_warehouse: DF.Link | None
+		defer_bin_updates: DF.Check
 		disable_serial_no_and_batch_selector: DF.Check
 		do_not_update_serial_batch_on_creation_of_auto_bundle: DF.Check
 		do_not_use_batchwise_valuation: DF.Check
 		enable_stock_reservation: DF.Check
 		item_group: DF.Link | None
 		item_naming_by: DF.Literal["Item Code", "Naming Series"]
+		maintain_stock_balance_snapshots: DF.Check
 		mr_qty_allowance: DF.Float
 		naming_series_prefix: DF.Data | None
 		over_delivery_receipt_allowance: DF.Float
@@ -57,6 +59,7 @@ class StockSettings(Document):
 		sample_retention_warehouse: DF.Link | None
 		show_barcode_field: DF.Check
 		stock_auth_role: DF.Link | None
+		stock_balance_snapshots_ready: DF.Check
 		stock_frozen_upto: DF.Date | None
 		stock_frozen_upto_days: DF.Int
 		stock_uom: DF.Link | None
@@ -228,6 +231,20 @@ class StockSettings(Document):
 
 	def on_update(self):
 		self.toggle_warehouse_field_for_inter_warehouse_transfer()
+		self.toggle_stock_balance_snapshots()
+
+	def toggle_stock_balance_snapshots(self):
+		if not self.has_value_changed("maintain_stock_balance_snapshots"):
+			return
+
+		if self.maintain_stock_balance_snapshots:
+			from erpnext.stock.doctype.stock_balance_snapshot.stock_balance_snapshot import (
+				enqueue_rebuild_stock_balance_snapshots,
+			)
+
+			enqueue_rebuild_stock_balance_snapshots()
+		else:
+			self.db_set("stock_balance_snapshots_ready", 0)
 
 	def change_precision_for_for_sales(self):
 		doc_before_save = self.get_doc_before_save()
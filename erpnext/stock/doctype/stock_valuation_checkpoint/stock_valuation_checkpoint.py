@@ -0,0 +1,90 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class StockValuationCheckpoint(Document):
+	# begin: auto-generated types
+	# This code is auto-generated. Do not modify anything in this block.
+
+	from typing import TYPE_CHECKING
+
+	if TYPE_CHECKING:
+		from frappe.types import DF
+
+		company: DF.Link | None
+		item_code: DF.Link | None
+		posting_datetime: DF.Datetime | None
+		qty_after_transaction: DF.Float
+		stock_ledger_entry: DF.Link | None
+		stock_queue: DF.LongText | None
+		stock_value: DF.Currency
+		valuation_rate: DF.Currency
+		warehouse: DF.Link | None
+	# end: auto-generated types
+
+	pass
+
+
+def get_valuation_checkpoints(item_code, warehouse, from_datetime):
+	"""Get checkpoints of the item and warehouse from a posting datetime onwards, by Stock Ledger Entry."""
+	checkpoints = frappe.get_all(
+		"Stock Valuation Checkpoint",
+		filters={
+			"item_code": item_code,
+			"warehouse": warehouse,
+			"posting_datetime": (">=", from_datetime),
+		},
+		fields=[
+			"name",
+			"stock_ledger_entry",
+			"qty_after_transaction",
+			"valuation_rate",
+			"stock_value",
+			"stock_queue",
+		],
+	)
+
+	return {checkpoint.stock_ledger_entry: checkpoint for checkpoint in checkpoints}
+
+
+def make_valuation_checkpoint(sle):
+	"""Save the valuation state after the Stock Ledger Entry as a checkpoint."""
+	doc = frappe.get_doc(
+		{
+			"doctype": "Stock Valuation Checkpoint",
+			"item_code": sle.item_code,
+			"warehouse": sle.warehouse,
+			"company": sle.company,
+			"posting_datetime": sle.posting_datetime,
+			"stock_ledger_entry": sle.name,
+			"qty_after_transaction": sle.qty_after_transaction,
+			"valuation_rate": sle.valuation_rate,
+			"stock_value": sle.stock_value,
+			"stock_queue": sle.stock_queue,
+		}
+	)
+	doc.flags.ignore_permissions = True
+	doc.insert()
+
+	return doc
+
+
+def delete_valuation_checkpoints(voucher_type, voucher_no):
+	"""Remove checkpoints of the ledger entries of a cancelled voucher."""
+	sle = frappe.qb.DocType("Stock Ledger Entry")
+	checkpoint = frappe.qb.DocType("Stock Valuation Checkpoint")
+
+	frappe.qb.from_(checkpoint).delete().where(
+		checkpoint.stock_ledger_entry.isin(
+			frappe.qb.from_(sle)
+			.select(sle.name)
+			.where((sle.voucher_type == voucher_type) & (sle.voucher_no == voucher_no))
+		)
+	).run()
+
+
+def on_doctype_update():
+	frappe.db.add_index("Stock Valuation Checkpoint", ["item_code", "warehouse", "posting_datetime"])
@@ -0,0 +1,95 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests import IntegrationTestCase, UnitTestCase
+
+from erpnext.stock.doctype.item.test_item import make_item
+from erpnext.stock.doctype.stock_entry.stock_entry_utils import make_stock_entry
+from erpnext.stock.stock_ledger import update_entries_after
+
+# On IntegrationTestCase, the doctype test records and all
+# link-field test record depdendencies are recursively loaded
+# Use these module variables to add/remove to/from that list
+EXTRA_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
+IGNORE_TEST_RECORD_DEPENDENCIES = []  # eg. ["User"]
+
+
+class UnitTestStockValuationCheckpoint(UnitTestCase):
+	"""
+	Unit tests for StockValuationCheckpoint.
+	Use this class for testing individual functions and methods.
+	"""
+
+	pass
+
+
+class IntegrationTestStockValuationCheckpoint(IntegrationTestCase):
+	"""
+	Integration tests for StockValuationCheckpoint.
+	Use this class for testing interactions between multiple components.
+	"""
+
+	def repost(self, item_code, warehouse):
+		return update_entries_after(
+			{
+				"item_code": item_code,
+				"warehouse": warehouse,
+				"posting_date": "2021-01-01",
+				"posting_time": "00:00:00",
+				"stop_on_convergence": True,
+			}
+		)
+
+	def test_repost_stops_at_matching_checkpoint(self):
+		item_code = make_item(properties={"valuation_method": "FIFO"}).name
+		warehouse = "_Test Warehouse - _TC"
+
+		for day in range(1, 11):
+			make_stock_entry(
+				item_code=item_code, target=warehouse, qty=10, rate=day, posting_date=f"2021-01-{day:02}"
+			)
+
+		with (
+			patch("erpnext.stock.stock_ledger.VALUATION_CHECKPOINT_INTERVAL", 3),
+			patch("erpnext.stock.stock_ledger.REPOST_CONVERGENCE_ENTRIES", 100),
+		):
+			first_repost = self.repost(item_code, warehouse)
+			self.assertEqual(first_repost.skipped_entries, 0)
+			self.assertEqual(
+				frappe.db.count(
+					"Stock Valuation Checkpoint", {"item_code": item_code, "warehouse": warehouse}
+				),
+				3,
+			)
+
+			# nothing changed, so reposting stops at the first checkpoint
+			second_repost = self.repost(item_code, warehouse)
+			self.assertEqual(second_repost.skipped_entries, 7)
+
+		self.assertEqual(
+			frappe.db.get_value("Bin", {"item_code": item_code, "warehouse": warehouse}, "stock_value"),
+			sum(10 * day for day in range(1, 11)),
+		)
+
+	def test_checkpoint_removed_on_cancel(self):
+		item_code = make_item(properties={"valuation_method": "FIFO"}).name
+		warehouse = "_Test Warehouse - _TC"
+
+		entries = [
+			make_stock_entry(
+				item_code=item_code, target=warehouse, qty=10, rate=10, posting_date="2021-01-01"
+			)
+			for _ in range(3)
+		]
+
+		with patch("erpnext.stock.stock_ledger.VALUATION_CHECKPOINT_INTERVAL", 1):
+			self.repost(item_code, warehouse)
+
+		entries[-1].cancel()
+		self.assertEqual(
+			frappe.db.count("Stock Valuation Checkpoint", {"item_code": item_code, "warehouse": warehouse}),
+			2,
+		)
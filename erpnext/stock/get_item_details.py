@@ -23,6 +23,7 @@ from erpnext.accounts.doctype.pricing_rule.pricing_rule import (
 from erpnext.setup.doctype.brand.brand import get_brand_defaults
 from erpnext.setup.doctype.item_group.item_group import get_item_group_defaults
 from erpnext.setup.utils import get_exchange_rate
+from erpnext.stock.doctype.bin_update.bin_update import get_pending_bin_updates
 from erpnext.stock.doctype.item.item import get_item_defaults, get_uom_conv_factor
 from erpnext.stock.doctype.item_manufacturer.item_manufacturer import get_item_manufacturer_part_no
 from erpnext.stock.doctype.price_list.price_list import get_price_list_details
@@ -149,6 +150,119 @@ def get_item_details(
 	return out
 
 
+@frappe.whitelist()
+def get_bulk_item_details(items, doc=None, for_validate=False, overwrite_warehouse=True) -> list[ItemDetails]:
+	"""
+	Get item details for many rows of one document. Rows share price list, bin and pricing rule
+	lookups, so the details are fetched with one query per price list or warehouse instead of one per row.
+
+	items = [{"item_code": "", "warehouse": None, "qty": 1, ...}, ...]
+	"""
+	items = parse_json(items)
+	if isinstance(doc, str):
+		doc = json.loads(doc)
+
+	ctxs = [ItemDetailsCtx(row) for row in items]
+	for ctx in ctxs:
+		_preprocess_ctx(ctx)
+
+	from erpnext.accounts.doctype.pricing_rule.utils import DocumentPricingRuleCache
+
+	with BulkItemDetailsCache(ctxs), DocumentPricingRuleCache():
+		return [get_item_details(ctx, doc, for_validate, overwrite_warehouse) for ctx in ctxs]
+
+
+class BulkItemDetailsCache:
+	"""Lookups shared by the rows of a `get_bulk_item_details` call, loaded for all rows on first use."""
+
+	def __init__(self, ctxs):
+		self.item_codes = {ctx.item_code for ctx in ctxs if ctx.item_code}
+		for item_code in list(self.item_codes):
+			if variant_of := frappe.get_cached_value("Item", item_code, "variant_of"):
+				self.item_codes.add(variant_of)
+
+		self.item_prices = {}
+		self.packing_units = {}
+		self.bins = {}
+		self.child_warehouses = {}
+		self.pricing_rule_exists = {}
+
+	def __enter__(self):
+		self.previous = frappe.flags.get("bulk_item_details_cache")
+		frappe.flags.bulk_item_details_cache = self
+		return self
+
+	def __exit__(self, *args):
+		frappe.flags.bulk_item_details_cache = self.previous
+
+	def get_item_prices(self, item_code, price_list) -> list[dict] | None:
+		if item_code not in self.item_codes:
+			return None
+
+		if price_list not in self.item_prices:
+			ip = frappe.qb.DocType("Item Price")
+			rows = (
+				frappe.qb.from_(ip)
+				.select(
+					ip.name,
+					ip.item_code,
+					ip.price_list_rate,
+					ip.uom,
+					ip.batch_no,
+					ip.customer,
+					ip.supplier,
+					ip.valid_from,
+					ip.valid_upto,
+					ip.packing_unit,
+				)
+				.where((ip.price_list == price_list) & (ip.item_code.isin(list(self.item_codes))))
+			).run(as_dict=True)
+
+			prices = self.item_prices[price_list] = {}
+			for row in rows:
+				prices.setdefault(row.item_code, []).append(row)
+				self.packing_units[row.name] = row.packing_unit
+
+		return self.item_prices[price_list].get(item_code, [])
+
+	def get_child_warehouses(self, warehouse) -> list[str]:
+		if warehouse not in self.child_warehouses:
+			from erpnext.stock.doctype.warehouse.warehouse import get_child_warehouses
+
+			self.child_warehouses[warehouse] = get_child_warehouses(warehouse)
+
+		return self.child_warehouses[warehouse]
+
+	def get_bins(self, item_code, warehouses) -> list[dict] | None:
+		if item_code not in self.item_codes:
+			return None
+
+		missing_warehouses = [warehouse for warehouse in warehouses if warehouse not in self.bins]
+		if missing_warehouses:
+			bin = frappe.qb.DocType("Bin")
+			rows = (
+				frappe.qb.from_(bin)
+				.select(bin.item_code, bin.warehouse, bin.projected_qty, bin.actual_qty, bin.reserved_qty)
+				.where((bin.item_code.isin(list(self.item_codes))) & (bin.warehouse.isin(missing_warehouses)))
+			).run(as_dict=True)
+
+			for warehouse in missing_warehouses:
+				self.bins[warehouse] = {}
+
+			pending_updates = get_pending_bin_updates(list(self.item_codes), missing_warehouses)
+			for row in rows:
+				add_pending_bin_update(row, pending_updates.get((row.item_code, row.warehouse)))
+				self.bins[row.warehouse][row.item_code] = row
+
+		return [
+			self.bins[warehouse][item_code] for warehouse in warehouses if item_code in self.bins[warehouse]
+		]
+
+
+def get_bulk_item_details_cache() -> BulkItemDetailsCache | None:
+	return frappe.flags.get("bulk_item_details_cache")
+
+
 def remove_standard_fields(out: ItemDetails):
 	for key in child_table_fields + default_fields:
 		out.pop(key, None)
@@ -933,6 +1047,9 @@ def insert_item_price(ctx: ItemDetailsCtx):
 					alert=True,
 				)
 
+			if cache := get_bulk_item_details_cache():
+				cache.item_prices.pop(ctx.price_list, None)
+
 
 def get_item_price(
 	pctx: ItemPriceCtx | dict, item_code, ignore_party=False, force_batch_no=False
@@ -946,6 +1063,10 @@ def get_item_price(
 	"""
 	pctx: ItemPriceCtx = frappe._dict(pctx)
 
+	cache = get_bulk_item_details_cache()
+	if cache and (item_prices := cache.get_item_prices(item_code, pctx.price_list)) is not None:
+		return filter_item_prices(item_prices, pctx, ignore_party, force_batch_no)
+
 	ip = frappe.qb.DocType("Item Price")
 	query = (
 		frappe.qb.from_(ip)
@@ -983,6 +1104,53 @@ def get_item_price(
 	return query.run(as_dict=True)
 
 
+def filter_item_prices(
+	item_prices, pctx: ItemPriceCtx, ignore_party=False, force_batch_no=False
+) -> list[dict]:
+	"""Apply the conditions and order of `get_item_price` to Item Prices loaded in bulk."""
+	transaction_date = getdate(pctx.transaction_date) if pctx.transaction_date else None
+
+	def is_applicable(row):
+		if (row.uom or "") not in ("", pctx.uom):
+			return False
+
+		if force_batch_no:
+			if not pctx.batch_no or row.batch_no != pctx.batch_no:
+				return False
+		elif (row.batch_no or "") not in ("", pctx.batch_no):
+			return False
+
+		if not ignore_party:
+			if pctx.customer:
+				if row.customer != pctx.customer:
+					return False
+			elif pctx.supplier:
+				if row.supplier != pctx.supplier:
+					return False
+			elif row.customer or row.supplier:
+				return False
+
+		if transaction_date:
+			if row.valid_from and getdate(row.valid_from) > transaction_date:
+				return False
+
+			if row.valid_upto and getdate(row.valid_upto) < transaction_date:
+				return False
+
+		return True
+
+	item_prices = sorted(
+		filter(is_applicable, item_prices),
+		key=lambda row: (getdate(row.valid_from or "1900-01-01"), row.batch_no or "", row.uom or ""),
+		reverse=True,
+	)
+
+	return [
+		frappe._dict(name=row.name, price_list_rate=row.price_list_rate, uom=row.uom)
+		for row in item_prices[:1]
+	]
+
+
 @frappe.whitelist()
 def get_batch_based_item_price(pctx: ItemPriceCtx | dict | str, item_code) -> float:
 	pctx = parse_json(pctx)
@@ -1057,9 +1225,14 @@ def check_packing_list(price_list_rate_name, desired_qty, item_code):
 	"""
 
 	flag = True
-	item_price = frappe.get_doc("Item Price", price_list_rate_name)
-	if item_price.packing_unit:
-		packing_increment = desired_qty % item_price.packing_unit
+	cache = get_bulk_item_details_cache()
+	if cache and price_list_rate_name in cache.packing_units:
+		packing_unit = cache.packing_units[price_list_rate_name]
+	else:
+		packing_unit = frappe.db.get_value("Item Price", price_list_rate_name, "packing_unit")
+
+	if packing_unit:
+		packing_increment = desired_qty % packing_unit
 
 		if packing_increment != 0:
 			flag = False
@@ -1211,11 +1384,15 @@ def get_conversion_factor(item_code, uom):
 
 @frappe.whitelist()
 def get_projected_qty(item_code, warehouse):
-	return {
-		"projected_qty": frappe.db.get_value(
-			"Bin", {"item_code": item_code, "warehouse": warehouse}, "projected_qty"
-		)
-	}
+	projected_qty = frappe.db.get_value(
+		"Bin", {"item_code": item_code, "warehouse": warehouse}, "projected_qty"
+	)
+
+	if projected_qty is not None:
+		pending_update = get_pending_bin_updates([item_code], [warehouse]).get((item_code, warehouse))
+		projected_qty += flt(pending_update and pending_update.projected_qty)
+
+	return {"projected_qty": projected_qty}
 
 
 @frappe.whitelist()
@@ -1227,18 +1404,31 @@ def get_bin_details(item_code, warehouse, company=None, include_child_warehouses
 
 		from erpnext.stock.doctype.warehouse.warehouse import get_child_warehouses
 
-		warehouses = get_child_warehouses(warehouse) if include_child_warehouses else [warehouse]
+		cache = get_bulk_item_details_cache()
+		if cache and include_child_warehouses:
+			warehouses = cache.get_child_warehouses(warehouse)
+		else:
+			warehouses = get_child_warehouses(warehouse) if include_child_warehouses else [warehouse]
 
 		bin = frappe.qb.DocType("Bin")
-		bin_details = (
-			frappe.qb.from_(bin)
-			.select(
-				Coalesce(Sum(bin.projected_qty), 0).as_("projected_qty"),
-				Coalesce(Sum(bin.actual_qty), 0).as_("actual_qty"),
-				Coalesce(Sum(bin.reserved_qty), 0).as_("reserved_qty"),
-			)
-			.where((bin.item_code == item_code) & (bin.warehouse.isin(warehouses)))
-		).run(as_dict=True)[0]
+		if cache and (bins := cache.get_bins(item_code, warehouses)) is not None:
+			bin_details = {
+				field: sum(flt(row[field]) for row in bins)
+				for field in ("projected_qty", "actual_qty", "reserved_qty")
+			}
+		else:
+			bin_details = (
+				frappe.qb.from_(bin)
+				.select(
+					Coalesce(Sum(bin.projected_qty), 0).as_("projected_qty"),
+					Coalesce(Sum(bin.actual_qty), 0).as_("actual_qty"),
+					Coalesce(Sum(bin.reserved_qty), 0).as_("reserved_qty"),
+				)
+				.where((bin.item_code == item_code) & (bin.warehouse.isin(warehouses)))
+			).run(as_dict=True)[0]
+
+			for pending_update in get_pending_bin_updates([item_code], warehouses).values():
+				add_pending_bin_update(bin_details, pending_update)
 
 	if company:
 		bin_details["company_total_stock"] = get_company_total_stock(item_code, company)
@@ -1246,6 +1436,15 @@ def get_bin_details(item_code, warehouse, company=None, include_child_warehouses
 	return bin_details
 
 
+def add_pending_bin_update(bin_details, pending_update):
+	"""Add the qty of pending Bin Updates to Bin values read from the database."""
+	if not pending_update:
+		return
+
+	for field in ("actual_qty", "projected_qty"):
+		bin_details[field] = flt(bin_details[field]) + flt(pending_update[field])
+
+
 def get_company_total_stock(item_code, company):
 	bin = frappe.qb.DocType("Bin")
 	wh = frappe.qb.DocType("Warehouse")
@@ -2,6 +2,7 @@
 # License: GNU General Public License v3. See license.txt
 
 
+from collections import deque
 from collections.abc import Iterator
 from operator import itemgetter
 
@@ -49,7 +50,7 @@ def format_report_data(filters: Filters, item_details: dict, to_date: str) -> li
 		average_age = get_average_age(fifo_queue, to_date)
 		earliest_age = date_diff(to_date, fifo_queue[0][1])
 		latest_age = date_diff(to_date, fifo_queue[-1][1])
-		range_values = get_range_age(filters, fifo_queue, to_date, item_dict)
+		range_values = get_range_age(filters, fifo_queue, to_date, item_dict, precision)
 
 		row = [details.name, details.item_name, details.description, details.item_group, details.brand]
 
@@ -87,8 +88,11 @@ def get_average_age(fifo_queue: list, to_date: str) -> float:
 	return flt(age_qty / total_qty, 2) if total_qty else 0.0
 
 
-def get_range_age(filters: Filters, fifo_queue: list, to_date: str, item_dict: dict) -> list:
-	precision = cint(frappe.db.get_single_value("System Settings", "float_precision", cache=True))
+def get_range_age(
+	filters: Filters, fifo_queue: list, to_date: str, item_dict: dict, precision: int | None = None
+) -> list:
+	if precision is None:
+		precision = cint(frappe.db.get_single_value("System Settings", "float_precision", cache=True))
 	range_values = [0.0] * (len(filters.ranges) + 1)
 
 	for item in fifo_queue:
@@ -265,6 +269,10 @@ class FIFOSlots:
 			# Note that stock_ledger_entries is an iterator, you can not reuse it  like a list
 			del stock_ledger_entries
 
+		# queues are consumed from the front while generating, return them as lists
+		for row in self.item_details.values():
+			row["fifo_queue"] = list(row["fifo_queue"])
+
 		if not self.filters.get("show_warehouse_wise_stock"):
 			# (Item 1, WH 1), (Item 1, WH 2) => (Item 1)
 			self.item_details = self.__aggregate_details_by_item(self.item_details)
@@ -275,15 +283,17 @@ class FIFOSlots:
 		"Initialise keys and FIFO Queue."
 
 		key = (row.name, row.warehouse)
-		self.item_details.setdefault(key, {"details": row, "fifo_queue": []})
+		if key not in self.item_details:
+			self.item_details[key] = {"details": row, "fifo_queue": deque()}
+
 		fifo_queue = self.item_details[key]["fifo_queue"]
 
+		# transfer data is only kept for vouchers with outward stock
 		transferred_item_key = (row.voucher_no, row.name, row.warehouse)
-		self.transferred_item_details.setdefault(transferred_item_key, [])
 
 		return key, fifo_queue, transferred_item_key
 
-	def __compute_incoming_stock(self, row: dict, fifo_queue: list, transfer_key: tuple, serial_nos: list):
+	def __compute_incoming_stock(self, row: dict, fifo_queue: deque, transfer_key: tuple, serial_nos: list):
 		"Update FIFO Queue on inward stock."
 
 		transfer_data = self.transferred_item_details.get(transfer_key)
@@ -309,12 +319,17 @@ class FIFOSlots:
 					self.serial_no_batch_purchase_details.setdefault(serial_no, row.posting_date)
 					fifo_queue.append([serial_no, row.posting_date])
 
-	def __compute_outgoing_stock(self, row: dict, fifo_queue: list, transfer_key: tuple, serial_nos: list):
+	def __compute_outgoing_stock(self, row: dict, fifo_queue: deque, transfer_key: tuple, serial_nos: list):
 		"Update FIFO Queue on outward stock."
 		if serial_nos:
-			fifo_queue[:] = [serial_no for serial_no in fifo_queue if serial_no[0] not in serial_nos]
+			serial_nos = set(serial_nos)
+			remaining_slots = [slot for slot in fifo_queue if slot[0] not in serial_nos]
+			fifo_queue.clear()
+			fifo_queue.extend(remaining_slots)
 			return
 
+		transfer_data = self.transferred_item_details.setdefault(transfer_key, deque())
+
 		qty_to_pop = abs(row.actual_qty)
 		while qty_to_pop:
 			slot = fifo_queue[0] if fifo_queue else [0, None]
@@ -322,20 +337,20 @@ class FIFOSlots:
 				# qty to pop >= slot qty
 				# if +ve and not enough or exactly same balance in current slot, consume whole slot
 				qty_to_pop -= flt(slot[0])
-				self.transferred_item_details[transfer_key].append(fifo_queue.pop(0))
+				transfer_data.append(fifo_queue.popleft())
 			elif not fifo_queue:
 				# negative stock, no balance but qty yet to consume
 				fifo_queue.append([-(qty_to_pop), row.posting_date])
-				self.transferred_item_details[transfer_key].append([qty_to_pop, row.posting_date])
+				transfer_data.append([qty_to_pop, row.posting_date])
 				qty_to_pop = 0
 			else:
 				# qty to pop < slot qty, ample balance
 				# consume actual_qty from first slot
 				slot[0] = flt(slot[0]) - qty_to_pop
-				self.transferred_item_details[transfer_key].append([qty_to_pop, slot[1]])
+				transfer_data.append([qty_to_pop, slot[1]])
 				qty_to_pop = 0
 
-	def __adjust_incoming_transfer_qty(self, transfer_data: dict, fifo_queue: list, row: dict):
+	def __adjust_incoming_transfer_qty(self, transfer_data: deque, fifo_queue: deque, row: dict):
 		"Add previously removed stock back to FIFO Queue."
 		transfer_qty_to_pop = flt(row.actual_qty)
 
@@ -351,7 +366,7 @@ class FIFOSlots:
 			if transfer_data and 0 < transfer_data[0][0] <= transfer_qty_to_pop:
 				# bucket qty is not enough, consume whole
 				transfer_qty_to_pop -= transfer_data[0][0]
-				add_to_fifo_queue(transfer_data.pop(0))
+				add_to_fifo_queue(transfer_data.popleft())
 			elif not transfer_data:
 				# transfer bucket is empty, extra incoming qty
 				add_to_fifo_queue([transfer_qty_to_pop, row.posting_date])
@@ -363,14 +378,15 @@ class FIFOSlots:
 				transfer_qty_to_pop = 0
 
 	def __update_balances(self, row: dict, key: tuple | str):
-		self.item_details[key]["qty_after_transaction"] = row.qty_after_transaction
+		item_details = self.item_details[key]
+		item_details["qty_after_transaction"] = row.qty_after_transaction
 
-		if "total_qty" not in self.item_details[key]:
-			self.item_details[key]["total_qty"] = row.actual_qty
+		if "total_qty" not in item_details:
+			item_details["total_qty"] = row.actual_qty
 		else:
-			self.item_details[key]["total_qty"] += row.actual_qty
+			item_details["total_qty"] += row.actual_qty
 
-		self.item_details[key]["has_serial_no"] = row.has_serial_no
+		item_details["has_serial_no"] = row.has_serial_no
 
 	def __aggregate_details_by_item(self, wh_wise_data: dict) -> dict:
 		"Aggregate Item-Wh wise data into single Item entry."
@@ -722,6 +722,43 @@ class TestStockAgeing(IntegrationTestCase):
 		self.assertEqual(bal_qty, 0.9)
 		self.assertEqual(bal_qty, range_qty_sum)
 
+	def test_consume_many_slots(self):
+		"Outward stock consuming many small slots leaves only the latest ones."
+		sle = [
+			frappe._dict(
+				name="Flask Item",
+				actual_qty=1,
+				qty_after_transaction=i + 1,
+				warehouse="WH 1",
+				posting_date=f"2021-11-{(i % 30) + 1:02d}",
+				voucher_type="Stock Entry",
+				voucher_no=f"IN-{i}",
+				has_serial_no=False,
+				serial_no=None,
+			)
+			for i in range(600)
+		]
+		sle.append(
+			frappe._dict(
+				name="Flask Item",
+				actual_qty=(-598),
+				qty_after_transaction=2,
+				warehouse="WH 1",
+				posting_date="2021-12-01",
+				voucher_type="Stock Entry",
+				voucher_no="OUT-1",
+				has_serial_no=False,
+				serial_no=None,
+			)
+		)
+
+		slots = FIFOSlots(self.filters, sle).generate()
+		queue = slots["Flask Item"]["fifo_queue"]
+
+		self.assertIsInstance(queue, list)
+		self.assertEqual(queue, [[1.0, "2021-11-29"], [1.0, "2021-11-30"]])
+		self.assertEqual(slots["Flask Item"]["total_qty"], 2)
+
 
 def generate_item_and_item_wh_wise_slots(filters, sle):
 	"Return results with and without 'show_warehouse_wise_stock'"
@@ -8,13 +8,16 @@ from typing import Any, TypedDict
 
 import frappe
 from frappe import _
-from frappe.query_builder import Order
-from frappe.query_builder.functions import Coalesce
+from frappe.query_builder import Case, Order
+from frappe.query_builder.functions import Coalesce, Max, Sum
 from frappe.utils import add_days, cint, date_diff, flt, getdate
 from frappe.utils.nestedset import get_descendants_of
 
 import erpnext
 from erpnext.stock.doctype.inventory_dimension.inventory_dimension import get_inventory_dimensions
+from erpnext.stock.doctype.stock_balance_snapshot.stock_balance_snapshot import (
+	is_stock_balance_snapshot_ready,
+)
 from erpnext.stock.doctype.stock_closing_entry.stock_closing_entry import StockClosing
 from erpnext.stock.doctype.warehouse.warehouse import apply_warehouse_filter
 from erpnext.stock.report.stock_ageing.stock_ageing import FIFOSlots, get_average_age
@@ -64,9 +67,13 @@ class StockBalanceReport:
 
 		self.item_warehouse_map = frappe._dict({})
 		self.inventory_dimensions = self.get_inventory_dimension_fields()
-		self.prepare_opening_stock()
-		self.prepare_sle_query()
-		self.prepare_item_warehouse_map_for_current_period()
+		if self.use_stock_balance_snapshots():
+			self.prepare_item_warehouse_map_from_snapshots()
+		else:
+			self.prepare_opening_stock()
+			self.prepare_sle_query()
+			self.prepare_item_warehouse_map_for_current_period()
+
 		self.prepare_new_data()
 
 		if not self.columns:
@@ -209,6 +216,107 @@ class StockBalanceReport:
 			self.item_warehouse_map, self.float_precision, self.inventory_dimensions
 		)
 
+	def use_stock_balance_snapshots(self) -> bool:
+		if self.filters.get("show_dimension_wise_stock"):
+			return False
+
+		if any(self.filters.get(field) for field in self.inventory_dimensions):
+			return False
+
+		return is_stock_balance_snapshot_ready()
+
+	def prepare_item_warehouse_map_from_snapshots(self):
+		"""Aggregate the daily Stock Balance Snapshots instead of the Stock Ledger Entries."""
+		snapshot = frappe.qb.DocType("Stock Balance Snapshot")
+		item_table = frappe.qb.DocType("Item")
+
+		in_period = snapshot.posting_date >= self.from_date
+
+		def period_sum(field):
+			return Sum(Case().when(in_period, snapshot[field]).else_(0))
+
+		query = (
+			frappe.qb.from_(snapshot)
+			.inner_join(item_table)
+			.on(snapshot.item_code == item_table.name)
+			.select(
+				snapshot.item_code,
+				snapshot.warehouse,
+				snapshot.company,
+				item_table.item_group,
+				item_table.stock_uom,
+				item_table.item_name,
+				(Sum(Case().when(in_period, snapshot.opening_qty).else_(snapshot.actual_qty))).as_(
+					"opening_qty"
+				),
+				(
+					Sum(Case().when(in_period, snapshot.opening_val).else_(snapshot.stock_value_difference))
+				).as_("opening_val"),
+				period_sum("in_qty").as_("in_qty"),
+				period_sum("in_val").as_("in_val"),
+				period_sum("out_qty").as_("out_qty"),
+				period_sum("out_val").as_("out_val"),
+				Sum(snapshot.actual_qty).as_("bal_qty"),
+				Sum(snapshot.stock_value_difference).as_("bal_val"),
+			)
+			.where(snapshot.posting_date <= self.to_date)
+			.groupby(snapshot.item_code, snapshot.warehouse)
+		)
+
+		query = self.apply_warehouse_filters(query, snapshot)
+		query = self.apply_items_filters(query, item_table)
+
+		if self.filters.get("company"):
+			query = query.where(snapshot.company == self.filters.get("company"))
+
+		valuation_rates = self.get_valuation_rates_from_snapshots()
+		for row in query.run(as_dict=True):
+			key = (row.item_code, row.warehouse)
+			row.update(
+				{
+					"currency": self.company_currency,
+					"opening_fifo_queue": [],
+					"val_rate": valuation_rates.get(key, 0.0),
+				}
+			)
+			self.item_warehouse_map[key] = row
+
+		self.item_warehouse_map = filter_items_with_no_transactions(
+			self.item_warehouse_map, self.float_precision, self.inventory_dimensions
+		)
+
+	def get_valuation_rates_from_snapshots(self) -> dict:
+		snapshot = frappe.qb.DocType("Stock Balance Snapshot")
+		item_table = frappe.qb.DocType("Item")
+
+		latest = (
+			frappe.qb.from_(snapshot)
+			.inner_join(item_table)
+			.on(snapshot.item_code == item_table.name)
+			.select(snapshot.item_code, snapshot.warehouse, Max(snapshot.posting_date).as_("posting_date"))
+			.where(snapshot.posting_date <= self.to_date)
+			.groupby(snapshot.item_code, snapshot.warehouse)
+		)
+
+		latest = self.apply_warehouse_filters(latest, snapshot)
+		latest = self.apply_items_filters(latest, item_table)
+		if self.filters.get("company"):
+			latest = latest.where(snapshot.company == self.filters.get("company"))
+
+		latest = latest.as_("latest")
+		rates = (
+			frappe.qb.from_(snapshot)
+			.inner_join(latest)
+			.on(
+				(snapshot.item_code == latest.item_code)
+				& (snapshot.warehouse == latest.warehouse)
+				& (snapshot.posting_date == latest.posting_date)
+			)
+			.select(snapshot.item_code, snapshot.warehouse, snapshot.valuation_rate)
+		).run()
+
+		return {(item_code, warehouse): flt(rate) for item_code, warehouse, rate in rates}
+
 	def prepare_new_data(self):
 		if self.filters.get("show_stock_ageing_data"):
 			self.filters["show_warehouse_wise_stock"] = True
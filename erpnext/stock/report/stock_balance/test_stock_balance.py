@@ -1,4 +1,5 @@
 from typing import Any
+from unittest.mock import patch
 
 import frappe
 from frappe import _dict
@@ -6,8 +7,9 @@ from frappe.tests import IntegrationTestCase
 from frappe.utils import today
 
 from erpnext.stock.doctype.item.test_item import make_item
+from erpnext.stock.doctype.stock_balance_snapshot.stock_balance_snapshot import update_stock_balance_snapshots
 from erpnext.stock.doctype.stock_entry.stock_entry_utils import make_stock_entry
-from erpnext.stock.report.stock_balance.stock_balance import execute
+from erpnext.stock.report.stock_balance.stock_balance import StockBalanceReport, execute
 
 
 def stock_balance(filters):
@@ -168,3 +170,66 @@ class TestStockBalance(IntegrationTestCase):
 		rows = stock_balance(self.filters.update({"show_variant_attributes": 1, "item_code": variant.name}))
 		self.assertPartialDictEq(attributes, rows[0])
 		self.assertInvariants(rows)
+
+	def test_stock_balance_from_snapshots(self):
+		with self.change_settings("Stock Settings", {"maintain_stock_balance_snapshots": 1}):
+			self.generate_stock_ledger(
+				self.item.name,
+				[
+					_dict(qty=10, rate=10, posting_date="2021-01-01"),
+					_dict(qty=5, rate=20, posting_date="2021-01-03"),
+					_dict(
+						qty=4,
+						from_warehouse="_Test Warehouse - _TC",
+						to_warehouse=None,
+						posting_date="2021-01-03",
+					),
+				],
+			)
+			# backdated entry reposts the future ledger and its snapshots
+			self.generate_stock_ledger(self.item.name, [_dict(qty=2, rate=5, posting_date="2021-01-02")])
+			cancelled = make_stock_entry(
+				item_code=self.item.name,
+				target="_Test Warehouse - _TC",
+				qty=3,
+				rate=7,
+				posting_date="2021-01-02",
+			)
+			cancelled.cancel()
+
+			self.assertEqual(
+				frappe.db.count("Stock Balance Snapshot", {"item_code": self.item.name}),
+				3,
+			)
+
+			for from_date in ("2020-01-01", "2021-01-02", "2021-01-03", "2022-01-01"):
+				filters = self.filters.copy().update({"from_date": from_date})
+				rows = stock_balance(filters)
+				self.assertInvariants(rows)
+
+				with patch.object(StockBalanceReport, "use_stock_balance_snapshots", return_value=False):
+					expected_rows = stock_balance(filters)
+
+				self.assertEqual(len(rows), len(expected_rows))
+				for expected, actual in zip(expected_rows, rows, strict=True):
+					for field in ("opening_qty", "in_qty", "out_qty", "bal_qty", "bal_val", "val_rate"):
+						self.assertAlmostEqual(expected[field], actual[field], 3)
+
+			# snapshots added to entry by entry match the ones rebuilt from the ledger
+			fields = ["posting_date", "in_qty", "out_qty", "actual_qty", "stock_value_difference"]
+			snapshots = frappe.get_all(
+				"Stock Balance Snapshot",
+				filters={"item_code": self.item.name},
+				fields=fields,
+				order_by="posting_date",
+			)
+			update_stock_balance_snapshots(self.item.name, "_Test Warehouse - _TC")
+			self.assertEqual(
+				snapshots,
+				frappe.get_all(
+					"Stock Balance Snapshot",
+					filters={"item_code": self.item.name},
+					fields=fields,
+					order_by="posting_date",
+				),
+			)
@@ -51,11 +51,14 @@ def repost_stock(
 		repost_actual_qty(item_code, warehouse, allow_zero_rate, allow_negative_stock)
 
 	if item_code and warehouse and not only_actual:
+		from erpnext.accounts.doctype.pos_invoice.pos_invoice import get_pos_reserved_qty_from_invoices
+
 		qty_dict = {
 			"reserved_qty": get_reserved_qty(item_code, warehouse),
 			"indented_qty": get_indented_qty(item_code, warehouse),
 			"ordered_qty": get_ordered_qty(item_code, warehouse),
 			"planned_qty": get_planned_qty(item_code, warehouse),
+			"pos_reserved_qty": get_pos_reserved_qty_from_invoices(item_code, warehouse),
 		}
 		if only_bin:
 			qty_dict.update({"actual_qty": get_balance_qty_from_sle(item_code, warehouse)})
@@ -209,8 +212,11 @@ def get_planned_qty(item_code, warehouse):
 
 
 def update_bin_qty(item_code, warehouse, qty_dict=None):
-	from erpnext.stock.utils import get_bin
+	from erpnext.stock.doctype.bin_update.bin_update import apply_pending_bin_updates
+	from erpnext.stock.utils import get_bin, get_or_make_bin
 
+	# the whole Bin is written back, so it has to include the pending updates
+	apply_pending_bin_updates(get_or_make_bin(item_code, warehouse))
 	bin = get_bin(item_code, warehouse)
 	mismatch = False
 	for field, value in qty_dict.items():
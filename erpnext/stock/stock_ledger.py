@@ -4,10 +4,12 @@
 import copy
 import gzip
 import json
+import os
 
 import frappe
 from frappe import _, bold, scrub
 from frappe.model.meta import get_field_precision
+from frappe.query_builder import Criterion
 from frappe.query_builder.functions import Sum
 from frappe.utils import (
 	add_to_date,
@@ -25,14 +27,25 @@ from frappe.utils import (
 
 import erpnext
 from erpnext.stock.doctype.bin.bin import update_qty as update_bin_qty
+from erpnext.stock.doctype.bin_update.bin_update import apply_pending_bin_updates, can_defer_bin_update
 from erpnext.stock.doctype.inventory_dimension.inventory_dimension import get_inventory_dimensions
 from erpnext.stock.doctype.serial_and_batch_bundle.serial_and_batch_bundle import (
 	get_available_batches,
 )
+from erpnext.stock.doctype.stock_balance_snapshot.stock_balance_snapshot import (
+	is_stock_balance_snapshot_enabled,
+	update_snapshots_for_item_warehouses,
+	update_stock_balance_snapshots,
+)
 from erpnext.stock.doctype.stock_reservation_entry.stock_reservation_entry import (
 	get_sre_reserved_batch_nos_details,
 	get_sre_reserved_serial_nos_details,
 )
+from erpnext.stock.doctype.stock_valuation_checkpoint.stock_valuation_checkpoint import (
+	delete_valuation_checkpoints,
+	get_valuation_checkpoints,
+	make_valuation_checkpoint,
+)
 from erpnext.stock.utils import (
 	get_combine_datetime,
 	get_incoming_outgoing_rate_for_cancel,
@@ -42,7 +55,30 @@ from erpnext.stock.utils import (
 	get_stock_balance,
 	get_valuation_method,
 )
-from erpnext.stock.valuation import FIFOValuation, LIFOValuation, round_off_if_near_zero
+from erpnext.stock.valuation import (
+	ArrayBinWiseValuation,
+	ArrayFIFOValuation,
+	ArrayLIFOValuation,
+	round_off_if_near_zero,
+)
+
+# Number of item/warehouse pairs whose future entries are loaded together while reposting
+REPOST_PREFETCH_SIZE = 50
+REPOST_BULK_UPDATE_SIZE = 500
+
+# A valuation checkpoint is saved after every these many reposted entries of an item/warehouse
+VALUATION_CHECKPOINT_INTERVAL = 1000
+# Reposting stops once these many consecutive entries recompute to their persisted valuation
+REPOST_CONVERGENCE_ENTRIES = 5
+
+
+RETURN_VOUCHER_TYPES = (
+	"Delivery Note",
+	"Sales Invoice",
+	"Purchase Receipt",
+	"Purchase Invoice",
+	"Subcontracting Receipt",
+)
 
 
 class NegativeStockError(frappe.ValidationError):
@@ -75,6 +111,7 @@ def make_sl_entries(sl_entries, allow_negative_stock=False, via_landed_cost_vouc
 		args = get_args_for_future_sle(sl_entries[0])
 		future_sle_exists(args, sl_entries)
 
+		snapshot_item_warehouses = {}
 		for sle in sl_entries:
 			if sle.serial_no and not via_landed_cost_voucher:
 				validate_serial_no(sle)
@@ -108,13 +145,24 @@ def make_sl_entries(sl_entries, allow_negative_stock=False, via_landed_cost_vouc
 			if is_stock_item:
 				bin_name = get_or_make_bin(args.get("item_code"), args.get("warehouse"))
 				args.reserved_stock = flt(frappe.db.get_value("Bin", bin_name, "reserved_stock"))
+				args.defer_bin_update = can_defer_bin_update(args, via_landed_cost_voucher)
 				repost_current_voucher(args, allow_negative_stock, via_landed_cost_voucher)
 				update_bin_qty(bin_name, args)
+
+				posting_date = getdate(args.posting_date)
+				data = snapshot_item_warehouses.setdefault(
+					(args.item_code, args.warehouse),
+					frappe._dict(posting_date=posting_date, voucher_type=args.voucher_type, sle_names=[]),
+				)
+				data.posting_date = min(data.posting_date, posting_date)
+				data.sle_names.append(args.name)
 			else:
 				frappe.msgprint(
 					_("Item {0} ignored since it is not a stock item").format(args.get("item_code"))
 				)
 
+		update_snapshots_for_item_warehouses(snapshot_item_warehouses, cancel=cancel)
+
 
 def repost_current_voucher(args, allow_negative_stock=False, via_landed_cost_voucher=False):
 	if args.get("actual_qty") or args.get("voucher_type") == "Stock Reconciliation":
@@ -135,6 +183,7 @@ def repost_current_voucher(args, allow_negative_stock=False, via_landed_cost_vou
 					"sle_id": args.get("name"),
 					"creation": args.get("creation"),
 					"reserved_stock": args.get("reserved_stock"),
+					"defer_bin_update": args.get("defer_bin_update"),
 				},
 				allow_negative_stock=allow_negative_stock,
 				via_landed_cost_voucher=via_landed_cost_voucher,
@@ -216,6 +265,8 @@ def set_as_cancel(voucher_type, voucher_no):
 		(now(), frappe.session.user, voucher_type, voucher_no),
 	)
 
+	delete_valuation_checkpoints(voucher_type, voucher_no)
+
 
 def make_entry(args, allow_negative_stock=False, via_landed_cost_voucher=False):
 	args["doctype"] = "Stock Ledger Entry"
@@ -240,6 +291,8 @@ def repost_future_sle(
 	via_landed_cost_voucher=False,
 	doc=None,
 ):
+	from erpnext.stock.doctype.repost_item_valuation.repost_item_valuation import extend_repost_locks
+
 	if not args:
 		args = []  # set args to empty list if None to avoid enumerate error
 
@@ -256,9 +309,20 @@ def repost_future_sle(
 	distinct_item_warehouses = get_distinct_item_warehouse(args, doc, reposting_data=reposting_data)
 	affected_transactions = get_affected_transactions(doc, reposting_data=reposting_data)
 
+	reposting_log = None
+	if doc and not doc.items_to_be_repost:
+		reposting_log = RepostingDataLog(doc, args, distinct_item_warehouses, affected_transactions)
+
+	repost_context = BatchedRepostContext(args)
+	# Item and warehouse wise reposting is used to repair the ledger, so replay it completely
+	stop_on_convergence = not (doc and doc.based_on == "Item and Warehouse")
+	maintain_snapshots = is_stock_balance_snapshot_enabled()
+
 	i = get_current_index(doc) or 0
 	while i < len(args):
 		validate_item_warehouse(args[i])
+		if doc:
+			extend_repost_locks()
 
 		obj = update_entries_after(
 			{
@@ -270,12 +334,23 @@ def repost_future_sle(
 				"distinct_item_warehouses": distinct_item_warehouses,
 				"items_to_be_repost": args,
 				"current_index": i,
+				"affected_transactions": affected_transactions,
+				"stop_on_convergence": stop_on_convergence,
 			},
 			allow_negative_stock=allow_negative_stock,
 			via_landed_cost_voucher=via_landed_cost_voucher,
+			repost_context=repost_context,
 		)
 		affected_transactions.update(obj.affected_transactions)
 
+		if doc and obj.skipped_entries:
+			doc.db_set("skipped_entries", cint(doc.skipped_entries) + obj.skipped_entries)
+
+		if maintain_snapshots:
+			update_stock_balance_snapshots(
+				args[i].get("item_code"), args[i].get("warehouse"), args[i].get("posting_date")
+			)
+
 		key = (args[i].get("item_code"), args[i].get("warehouse"))
 		if distinct_item_warehouses.get(key):
 			distinct_item_warehouses[key].reposting_status = True
@@ -295,7 +370,7 @@ def repost_future_sle(
 
 		if doc:
 			update_args_in_repost_item_valuation(
-				doc, i, args, distinct_item_warehouses, affected_transactions
+				doc, i, args, distinct_item_warehouses, affected_transactions, reposting_log
 			)
 
 
@@ -323,10 +398,44 @@ def get_reposting_data(file_path) -> dict:
 	except Exception:
 		return frappe._dict()
 
-	if data := json.loads(data.decode("utf-8")):
-		data = data
+	data = data.decode("utf-8")
+	if not data.startswith("["):
+		# written as a single JSON document by older versions
+		return parse_json(json.loads(data))
+
+	return parse_reposting_log(data)
+
 
-	return parse_json(data)
+def parse_reposting_log(content) -> dict:
+	"""Replay records of a `RepostingDataLog` in order."""
+
+	items_to_be_repost = []
+	distinct_item_and_warehouse = {}
+	affected_transactions = []
+
+	for line in content.splitlines():
+		if not line:
+			continue
+
+		record = json.loads(line)
+		if record[0] == "a":
+			idx, row = record[1], frappe._dict(record[2])
+			if idx < len(items_to_be_repost):
+				items_to_be_repost[idx] = row
+			else:
+				items_to_be_repost.append(row)
+		elif record[0] == "d":
+			distinct_item_and_warehouse[record[1]] = record[2]
+		elif record[0] == "t":
+			affected_transactions.append(record[1:])
+
+	return frappe._dict(
+		{
+			"items_to_be_repost": items_to_be_repost,
+			"distinct_item_and_warehouse": distinct_item_and_warehouse,
+			"affected_transactions": affected_transactions,
+		}
+	)
 
 
 def validate_item_warehouse(args):
@@ -336,22 +445,14 @@ def validate_item_warehouse(args):
 			frappe.throw(_(validation_msg))
 
 
-def update_args_in_repost_item_valuation(doc, index, args, distinct_item_warehouses, affected_transactions):
+def update_args_in_repost_item_valuation(
+	doc, index, args, distinct_item_warehouses, affected_transactions, reposting_log=None
+):
 	if not doc.items_to_be_repost:
-		file_name = ""
-		if doc.reposting_data_file:
-			file_name = get_reposting_file_name(doc.doctype, doc.name)
-			# frappe.delete_doc("File", file_name, ignore_permissions=True, delete_permanently=True)
+		if not reposting_log:
+			reposting_log = RepostingDataLog(doc)
 
-		doc.reposting_data_file = create_json_gz_file(
-			{
-				"items_to_be_repost": args,
-				"distinct_item_and_warehouse": {str(k): v for k, v in distinct_item_warehouses.items()},
-				"affected_transactions": affected_transactions,
-			},
-			doc,
-			file_name,
-		)
+		reposting_log.append(args, distinct_item_warehouses, affected_transactions)
 
 		doc.db_set(
 			{
@@ -401,34 +502,123 @@ def get_reposting_file_name(dt, dn):
 	)
 
 
-def create_json_gz_file(data, doc, file_name=None) -> str:
-	encoded_content = frappe.safe_encode(frappe.as_json(data))
-	compressed_content = gzip.compress(encoded_content)
+class RepostingDataLog:
+	"""
+	Append-only log of the reposting progress, attached to the Repost Item Valuation.
+
+	Every checkpoint appends a gzip member holding one JSON record per line, only for the
+	rows that changed since the previous checkpoint, instead of rewriting the whole state:
+
+	        ["a", index, row]                    row of items_to_be_repost set at index
+	        ["d", "(item, warehouse)", data]     distinct item and warehouse upserted
+	        ["t", voucher_type, voucher_no]      affected transaction added
+
+	Concatenated gzip members form a valid gzip file, so the log is read back with a
+	single decompress and replayed in order by `parse_reposting_log`.
+	"""
+
+	file_extension = ".ndjson.gz"
+
+	def __init__(self, doc, args=None, distinct_item_warehouses=None, affected_transactions=None):
+		self.doc = doc
+		self.reset()
+
+		# resuming from an existing log, everything loaded from it is already logged
+		if self.get_file_name():
+			self.get_records(args or [], distinct_item_warehouses or {}, affected_transactions or set())
+
+	def reset(self):
+		# serialized rows, as rows are also changed in place
+		self.logged_args = []
+		self.logged_item_warehouses = {}
+		self.logged_transactions = set()
+
+	def get_file_name(self):
+		if not (self.doc.reposting_data_file or "").endswith(self.file_extension):
+			return
+
+		return get_reposting_file_name(self.doc.doctype, self.doc.name)
+
+	def append(self, args, distinct_item_warehouses, affected_transactions):
+		file_name = self.get_file_name()
+		if not file_name and self.doc.reposting_data_file:
+			# replace the file written by older versions with a log of the complete state
+			remove_reposting_file(self.doc)
+			self.reset()
+
+		records = self.get_records(args, distinct_item_warehouses, affected_transactions)
+		if not records:
+			return
+
+		content = gzip.compress(frappe.safe_encode("\n".join(records) + "\n"))
+
+		if file_name:
+			path = frappe.get_doc("File", file_name).get_full_path()
+			with open(path, "ab") as f:
+				f.write(content)
+
+			self.update_file_details(file_name, os.path.getsize(path))
+			return
 
-	if not file_name:
-		json_filename = f"{scrub(doc.doctype)}-{scrub(doc.name)}.json.gz"
 		_file = frappe.get_doc(
 			{
 				"doctype": "File",
-				"file_name": json_filename,
-				"attached_to_doctype": doc.doctype,
-				"attached_to_name": doc.name,
+				"file_name": f"{scrub(self.doc.doctype)}-{scrub(self.doc.name)}{self.file_extension}",
+				"attached_to_doctype": self.doc.doctype,
+				"attached_to_name": self.doc.name,
 				"attached_to_field": "reposting_data_file",
-				"content": compressed_content,
+				"content": content,
 				"is_private": 1,
 			}
 		)
 		_file.save(ignore_permissions=True)
+		self.update_file_details(_file.name, _file.file_size)
+		self.doc.reposting_data_file = _file.file_url
 
-		return _file.file_url
-	else:
-		file_doc = frappe.get_doc("File", file_name)
-		path = file_doc.get_full_path()
+	def update_file_details(self, file_name, file_size):
+		"""
+		Keep the size of the File right as the log is appended to outside the File API, and
+		leave out its content hash so that no other File is ever de-duplicated into the log.
+		"""
+		frappe.db.set_value(
+			"File", file_name, {"file_size": file_size, "content_hash": None}, update_modified=False
+		)
+
+	def get_records(self, args, distinct_item_warehouses, affected_transactions):
+		"""Returns serialized records for rows changed since the last call."""
 
-		with open(path, "wb") as f:
-			f.write(compressed_content)
+		records = []
+		for idx, row in enumerate(args):
+			value = json.dumps(row, default=str, sort_keys=True)
+			if idx < len(self.logged_args) and self.logged_args[idx] == value:
+				continue
 
-		return doc.reposting_data_file
+			records.append(f'["a", {idx}, {value}]')
+			if idx < len(self.logged_args):
+				self.logged_args[idx] = value
+			else:
+				self.logged_args.append(value)
+
+		for key, data in distinct_item_warehouses.items():
+			key = str(key)
+			value = json.dumps(data, default=str, sort_keys=True)
+			if self.logged_item_warehouses.get(key) == value:
+				continue
+
+			records.append(f'["d", {json.dumps(key)}, {value}]')
+			self.logged_item_warehouses[key] = value
+
+		for transaction in affected_transactions - self.logged_transactions:
+			records.append(json.dumps(["t", *transaction]))
+
+		self.logged_transactions.update(affected_transactions)
+
+		return records
+
+
+def remove_reposting_file(doc):
+	if file_name := get_reposting_file_name(doc.doctype, doc.name):
+		frappe.delete_doc("File", file_name, ignore_permissions=True, delete_permanently=True, force=True)
 
 
 def get_items_to_be_repost(voucher_type=None, voucher_no=None, doc=None, reposting_data=None):
@@ -507,6 +697,139 @@ def get_current_index(doc=None):
 		return doc.current_index
 
 
+class BatchedRepostContext:
+	"""
+	Shared state for reposting many item/warehouse pairs in one run.
+
+	Future Stock Ledger Entries of the next few pending pairs are loaded with a single
+	ordered range scan instead of one query per pair, and the recomputed values are
+	written back with bulk UPDATEs instead of one UPDATE per entry.
+	"""
+
+	sle_fields_to_update = (
+		"actual_qty",
+		"is_cancelled",
+		"incoming_rate",
+		"outgoing_rate",
+		"qty_after_transaction",
+		"valuation_rate",
+		"stock_value",
+		"stock_value_difference",
+		"stock_queue",
+	)
+
+	def __init__(self, items_to_be_repost, prefetch_size=REPOST_PREFETCH_SIZE):
+		self.items_to_be_repost = items_to_be_repost
+		self.prefetch_size = prefetch_size
+
+		# (item_code, warehouse) -> (fetched from posting_datetime, entries)
+		self.future_entries = {}
+		self.pending_sle_updates = {}
+		self.pending_bin_updates = {}
+
+	def get_future_entries(self, args, previous_sle):
+		"""Return future SLEs of the pair in `args` from the prefetched batch, or None if not available."""
+		key = (args.item_code, args.warehouse)
+		if key not in self.future_entries:
+			self.prefetch(args.get("current_index") or 0)
+
+		# Entries of a pair are used only once, a pair queued again is always read afresh
+		fetched_from, entries = self.future_entries.pop(key, (None, None))
+		if entries is None or get_combine_datetime(args.posting_date, args.posting_time) < fetched_from:
+			return None
+
+		if not previous_sle:
+			return entries
+
+		return [
+			sle
+			for sle in entries
+			if sle.posting_datetime > previous_sle.posting_datetime and sle.name != previous_sle.name
+		]
+
+	def prefetch(self, index):
+		pairs = {}
+		for row in self.items_to_be_repost[index:]:
+			row = frappe._dict(row)
+			key = (row.item_code, row.warehouse)
+			if not row.posting_date or key in pairs or key in self.future_entries:
+				continue
+
+			pairs[key] = get_combine_datetime(row.posting_date, row.posting_time or "00:00:00")
+			if len(pairs) >= self.prefetch_size:
+				break
+
+		if not pairs:
+			return
+
+		# Ledger rows are locked along with the read, as the row-by-row reposting does
+		self.flush()
+		for key, fetched_from in pairs.items():
+			self.future_entries[key] = (fetched_from, [])
+
+		for sle in get_future_sle_for_item_warehouses(pairs):
+			self.future_entries[(sle.item_code, sle.warehouse)][1].append(sle)
+
+	def queue_sle_update(self, sle):
+		self.pending_sle_updates[sle.name] = {field: sle.get(field) for field in self.sle_fields_to_update}
+
+	def queue_bin_update(self, sle):
+		values_to_update = {
+			"actual_qty": sle.qty_after_transaction,
+			"stock_value": sle.stock_value,
+		}
+
+		if sle.valuation_rate is not None:
+			values_to_update["valuation_rate"] = sle.valuation_rate
+
+		self.pending_bin_updates[(sle.item_code, sle.warehouse)] = values_to_update
+
+	def flush(self):
+		"""Write the queued SLE and Bin values to the database."""
+		if self.pending_sle_updates:
+			frappe.db.bulk_update(
+				"Stock Ledger Entry",
+				self.pending_sle_updates,
+				chunk_size=REPOST_BULK_UPDATE_SIZE,
+				update_modified=False,
+			)
+			self.pending_sle_updates = {}
+
+		# Only the last value of each bin matters, so the bins are updated once per flush
+		for (item_code, warehouse), values_to_update in self.pending_bin_updates.items():
+			bin_name = get_or_make_bin(item_code, warehouse)
+			apply_pending_bin_updates(bin_name)
+			frappe.db.set_value("Bin", bin_name, values_to_update)
+
+		self.pending_bin_updates = {}
+
+
+def get_future_sle_for_item_warehouses(pairs):
+	"""Get future SLEs of several item/warehouse pairs in one scan, ordered for reposting.
+
+	:param pairs: dict of (item_code, warehouse) -> posting datetime to fetch the entries from
+	"""
+	sle = frappe.qb.DocType("Stock Ledger Entry")
+
+	pair_conditions = [
+		(sle.item_code == item_code)
+		& (sle.warehouse == warehouse)
+		& (sle.posting_datetime >= posting_datetime)
+		for (item_code, warehouse), posting_datetime in pairs.items()
+	]
+
+	return (
+		frappe.qb.from_(sle)
+		.select(sle.star, sle.posting_datetime.as_("timestamp"))
+		.where((sle.is_cancelled == 0) & Criterion.any(pair_conditions))
+		.orderby(sle.item_code)
+		.orderby(sle.warehouse)
+		.orderby(sle.posting_datetime)
+		.orderby(sle.creation)
+		.for_update()
+	).run(as_dict=True)
+
+
 class update_entries_after:
 	"""
 	update valution rate and qty after transaction
@@ -529,9 +852,11 @@ class update_entries_after:
 		allow_negative_stock=None,
 		via_landed_cost_voucher=False,
 		verbose=1,
+		repost_context=None,
 	):
 		self.exceptions = {}
 		self.verbose = verbose
+		self.repost_context = repost_context
 		self.allow_zero_rate = allow_zero_rate
 		self.via_landed_cost_voucher = via_landed_cost_voucher
 		self.item_code = args.get("item_code")
@@ -554,6 +879,9 @@ class update_entries_after:
 		self.new_items_found = False
 		self.distinct_item_warehouses = args.get("distinct_item_warehouses", frappe._dict())
 		self.affected_transactions: set[tuple[str, str]] = set()
+		# transactions reposted by earlier passes of the same reposting
+		self.reposted_transactions: set[tuple[str, str]] = args.get("affected_transactions") or set()
+		self.skipped_entries = 0
 		self.reserved_stock = flt(self.args.reserved_stock)
 
 		self.data = frappe._dict()
@@ -604,19 +932,26 @@ class update_entries_after:
 
 	def build(self):
 		from erpnext.controllers.stock_controller import future_sle_exists
+		from erpnext.stock.doctype.repost_item_valuation.repost_item_valuation import extend_repost_locks
 
 		if self.args.get("sle_id"):
 			self.process_sle_against_current_timestamp()
-			if not future_sle_exists(self.args):
+			# a deferred change is saved as a Bin Update by update_qty
+			if not future_sle_exists(self.args) and not self.args.defer_bin_update:
 				self.update_bin()
 		else:
 			entries_to_fix = self.get_future_entries_to_fix()
+			self.set_valuation_checkpoints(entries_to_fix)
 
 			i = 0
 			while i < len(entries_to_fix):
 				sle = entries_to_fix[i]
 				i += 1
 
+				# a single item can have enough entries to outlast the lock of the repost
+				extend_repost_locks()
+
+				persisted_state = get_valuation_state(sle)
 				self.process_sle(sle)
 				self.update_bin_data(sle)
 
@@ -626,9 +961,168 @@ class update_entries_after:
 				if self.has_stock_reco_with_serial_batch(sle):
 					break
 
+				if (
+					self.has_converged(sle, persisted_state)
+					and self.args.stop_on_convergence
+					and i > self.convergence_blocked_until
+				):
+					self.convergence_blocked_until = self.get_last_pending_dependent_entry(i)
+					if self.convergence_blocked_until < i:
+						# Entries after this were posted with the same valuation state, no change in them
+						self.skip_remaining_entries(entries_to_fix, i)
+						break
+
+			if self.repost_context:
+				self.repost_context.flush()
+
 		if self.exceptions:
 			self.raise_exceptions()
 
+	def set_valuation_checkpoints(self, entries_to_fix):
+		self.valuation_checkpoints = frappe._dict()
+		self.entries_since_checkpoint = 0
+		self.converged_entries = 0
+		self.convergence_blocked_until = -1
+		self.set_dependent_entries(entries_to_fix)
+
+		if entries_to_fix:
+			self.valuation_checkpoints = get_valuation_checkpoints(
+				self.item_code, self.args.warehouse, entries_to_fix[0].posting_datetime
+			)
+
+	def has_converged(self, sle, persisted_state) -> bool:
+		"""
+		Check if the recomputed valuation is the same as the persisted one, either for the last
+		`REPOST_CONVERGENCE_ENTRIES` entries or at a valid checkpoint.
+		"""
+		state = get_valuation_state(sle)
+
+		if self.is_same_valuation_state(state, persisted_state):
+			self.converged_entries += 1
+		else:
+			self.converged_entries = 0
+
+		at_checkpoint = self.update_valuation_checkpoint(sle, persisted_state, state)
+
+		return at_checkpoint or self.converged_entries >= REPOST_CONVERGENCE_ENTRIES
+
+	def update_valuation_checkpoint(self, sle, persisted_state, state) -> bool:
+		"""
+		Keep the checkpoint of the entry in sync with the recomputed state, and add a
+		checkpoint every `VALUATION_CHECKPOINT_INTERVAL` entries.
+
+		Returns True if the entry had a checkpoint that was still valid for the persisted
+		state of the entry, and the recomputed state is the same.
+		"""
+		self.entries_since_checkpoint += 1
+
+		if checkpoint := self.valuation_checkpoints.get(sle.name):
+			self.entries_since_checkpoint = 0
+			checkpoint_state = get_valuation_state(checkpoint)
+
+			if self.is_same_valuation_state(
+				checkpoint_state, persisted_state
+			) and self.is_same_valuation_state(checkpoint_state, state):
+				return True
+
+			frappe.db.set_value(
+				"Stock Valuation Checkpoint",
+				checkpoint.name,
+				{
+					"qty_after_transaction": sle.qty_after_transaction,
+					"valuation_rate": sle.valuation_rate,
+					"stock_value": sle.stock_value,
+					"stock_queue": sle.stock_queue,
+				},
+			)
+
+		elif self.entries_since_checkpoint >= VALUATION_CHECKPOINT_INTERVAL:
+			self.entries_since_checkpoint = 0
+			make_valuation_checkpoint(sle)
+
+		return False
+
+	def is_same_valuation_state(self, state, other_state) -> bool:
+		if flt(state.qty_after_transaction, self.flt_precision) != flt(
+			other_state.qty_after_transaction, self.flt_precision
+		):
+			return False
+
+		for field in ("stock_value", "valuation_rate"):
+			if flt(state.get(field), self.currency_precision) != flt(
+				other_state.get(field), self.currency_precision
+			):
+				return False
+
+		if len(state.stock_queue) != len(other_state.stock_queue):
+			return False
+
+		for (qty, rate), (other_qty, other_rate) in zip(
+			state.stock_queue, other_state.stock_queue, strict=True
+		):
+			if flt(qty, self.flt_precision) != flt(other_qty, self.flt_precision) or flt(
+				rate, self.currency_precision
+			) != flt(other_rate, self.currency_precision):
+				return False
+
+		return True
+
+	def set_dependent_entries(self, entries_to_fix):
+		"""
+		Index the entries whose rate is derived from a voucher instead of the running valuation,
+		so that reposting does not stop before them when the voucher was reposted.
+		"""
+		# (voucher_type, voucher_no) -> position of the last entry taking its rate from the voucher
+		self.last_dependent_entry = {}
+		# position of the last entry valued by its serial / batch history
+		self.last_serial_batch_entry = -1
+
+		returns = {}
+		for idx, sle in enumerate(entries_to_fix):
+			if sle.serial_no or sle.batch_no or sle.serial_and_batch_bundle:
+				self.last_serial_batch_entry = idx
+			elif sle.recalculate_rate:
+				self.last_dependent_entry[(sle.voucher_type, sle.voucher_no)] = idx
+				if sle.voucher_type in RETURN_VOUCHER_TYPES:
+					returns.setdefault(sle.voucher_type, set()).add(sle.voucher_no)
+
+		for voucher_type, voucher_nos in returns.items():
+			fields = ["name", "is_return", "return_against"]
+			if voucher_type in ("Purchase Receipt", "Purchase Invoice"):
+				fields.append("is_internal_supplier")
+
+			for voucher in frappe.get_all(
+				voucher_type, filters={"name": ("in", list(voucher_nos))}, fields=fields
+			):
+				idx = self.last_dependent_entry[(voucher_type, voucher.name)]
+				if voucher.get("is_internal_supplier"):
+					# rate is taken from the inter company delivery
+					self.last_serial_batch_entry = max(self.last_serial_batch_entry, idx)
+				elif voucher.is_return and voucher.return_against:
+					key = (voucher_type, voucher.return_against)
+					self.last_dependent_entry[key] = max(self.last_dependent_entry.get(key, -1), idx)
+
+	def get_last_pending_dependent_entry(self, index) -> int:
+		"""
+		Get position of the last entry from `index` onwards that can change even though the
+		valuation state is the same, -1 if there is none.
+		"""
+		last_pending_entry = self.last_serial_batch_entry
+
+		for voucher, last_index in self.last_dependent_entry.items():
+			if last_index > last_pending_entry and (
+				voucher in self.affected_transactions or voucher in self.reposted_transactions
+			):
+				last_pending_entry = last_index
+
+		return last_pending_entry if last_pending_entry >= index else -1
+
+	def skip_remaining_entries(self, entries_to_fix, index):
+		self.skipped_entries = len(entries_to_fix) - index
+		if self.skipped_entries:
+			# bin has the values of the last processed entry, reset it to the (unchanged) last entry
+			self.update_bin_data(entries_to_fix[-1])
+
 	def has_stock_reco_with_serial_batch(self, sle):
 		if (
 			sle.vocher_type == "Stock Reconciliation"
@@ -670,9 +1164,14 @@ class update_entries_after:
 
 	def get_future_entries_to_fix(self):
 		# includes current entry!
-		args = self.data[self.args.warehouse].previous_sle or frappe._dict(
-			{"item_code": self.item_code, "warehouse": self.args.warehouse}
-		)
+		previous_sle = self.data[self.args.warehouse].previous_sle
+
+		if self.repost_context:
+			entries = self.repost_context.get_future_entries(self.args, previous_sle)
+			if entries is not None:
+				return entries
+
+		args = previous_sle or frappe._dict({"item_code": self.item_code, "warehouse": self.args.warehouse})
 
 		return list(self.get_sle_after_datetime(args))
 
@@ -779,6 +1278,10 @@ class update_entries_after:
 		# previous sle data for this warehouse
 		self.wh_data = self.data[sle.warehouse]
 
+		defer_update = self.repost_context and not self.reads_stock_ledger(sle)
+		if self.repost_context and not defer_update:
+			self.repost_context.flush()
+
 		self.validate_previous_sle_qty(sle)
 		self.affected_transactions.add((sle.voucher_type, sle.voucher_no))
 
@@ -875,13 +1378,16 @@ class update_entries_after:
 		sle.qty_after_transaction = self.wh_data.qty_after_transaction
 		sle.valuation_rate = self.wh_data.valuation_rate
 		sle.stock_value = self.wh_data.stock_value
-		sle.stock_queue = json.dumps(self.wh_data.stock_queue)
+		sle.stock_queue = json.dumps(self.get_stock_queue_state())
 
 		if not sle.is_adjustment_entry:
 			sle.stock_value_difference = stock_value_difference
 
-		sle.doctype = "Stock Ledger Entry"
-		frappe.get_doc(sle).db_update()
+		if defer_update:
+			self.repost_context.queue_sle_update(sle)
+		else:
+			sle.doctype = "Stock Ledger Entry"
+			frappe.get_doc(sle).db_update()
 
 		if (
 			sle.serial_and_batch_bundle
@@ -897,6 +1403,29 @@ class update_entries_after:
 		):
 			self.update_outgoing_rate_on_transaction(sle)
 
+	def reads_stock_ledger(self, sle) -> bool:
+		"""
+		Whether processing the entry can query the stock ledger (directly or via the voucher),
+		in which case the queued updates must be written before and the entry must not be deferred.
+		"""
+		if (
+			sle.serial_no
+			or sle.batch_no
+			or sle.serial_and_batch_bundle
+			or sle.dependant_sle_voucher_detail_no
+		):
+			return True
+
+		if sle.voucher_type in ("Delivery Note", "Sales Invoice"):
+			return bool(sle.recalculate_rate)
+
+		if sle.voucher_type in ("Purchase Receipt", "Purchase Invoice"):
+			return flt(sle.actual_qty) < 0 or bool(
+				frappe.get_cached_value(sle.voucher_type, sle.voucher_no, "is_return")
+			)
+
+		return True
+
 	def get_serialized_values(self, sle):
 		from erpnext.stock.serial_batch_bundle import SerialNoValuation
 
@@ -1359,10 +1888,7 @@ class update_entries_after:
 			self.wh_data.qty_after_transaction + actual_qty
 		)
 
-		if self.valuation_method == "LIFO":
-			stock_queue = LIFOValuation(self.wh_data.stock_queue)
-		else:
-			stock_queue = FIFOValuation(self.wh_data.stock_queue)
+		stock_queue = self.get_valuation_queue()
 
 		_prev_qty, prev_stock_value = stock_queue.get_total_stock_and_value()
 
@@ -1387,17 +1913,41 @@ class update_entries_after:
 
 		stock_value_difference = stock_value - prev_stock_value
 
-		self.wh_data.stock_queue = stock_queue.state
 		self.wh_data.stock_value = round_off_if_near_zero(self.wh_data.stock_value + stock_value_difference)
 
-		if not self.wh_data.stock_queue:
-			self.wh_data.stock_queue.append(
+		if len(stock_queue):
+			# the queue is kept as is, its bins are only copied when the entry is written
+			self.wh_data.stock_queue = stock_queue
+		else:
+			self.wh_data.stock_queue = [
 				[0, sle.incoming_rate or sle.outgoing_rate or self.wh_data.valuation_rate]
-			)
+			]
 
 		if self.wh_data.qty_after_transaction:
 			self.wh_data.valuation_rate = self.wh_data.stock_value / self.wh_data.qty_after_transaction
 
+	def get_valuation_queue(self):
+		"""
+		Get FIFO/LIFO queue of the current warehouse.
+
+		The queue object is kept across entries and rebuilt only when the stock queue
+		was replaced in between (eg. by a stock reconciliation).
+		"""
+		if isinstance(self.wh_data.stock_queue, ArrayBinWiseValuation):
+			return self.wh_data.stock_queue
+
+		if self.valuation_method == "LIFO":
+			return ArrayLIFOValuation(self.wh_data.stock_queue)
+
+		return ArrayFIFOValuation(self.wh_data.stock_queue)
+
+	def get_stock_queue_state(self) -> list:
+		"""Bins of the stock queue of the current warehouse, as stored in the Stock Ledger Entry."""
+		if isinstance(self.wh_data.stock_queue, ArrayBinWiseValuation):
+			return self.wh_data.stock_queue.state
+
+		return self.wh_data.stock_queue
+
 	def update_batched_values(self, sle):
 		from erpnext.stock.serial_batch_bundle import BatchNoValuation
 
@@ -1452,6 +2002,9 @@ class update_entries_after:
 	def get_fallback_rate(self, sle) -> float:
 		"""When exact incoming rate isn't available use any of other "average" rates as fallback.
 		This should only get used for negative stock."""
+		if self.repost_context:
+			self.repost_context.flush()
+
 		return get_valuation_rate(
 			sle.item_code,
 			sle.warehouse,
@@ -1519,7 +2072,12 @@ class update_entries_after:
 				raise NegativeStockError(message)
 
 	def update_bin_data(self, sle):
+		if self.repost_context:
+			self.repost_context.queue_bin_update(sle)
+			return
+
 		bin_name = get_or_make_bin(sle.item_code, sle.warehouse)
+		apply_pending_bin_updates(bin_name)
 		values_to_update = {
 			"actual_qty": sle.qty_after_transaction,
 			"stock_value": sle.stock_value,
@@ -1534,6 +2092,7 @@ class update_entries_after:
 		# update bin for each warehouse
 		for warehouse, data in self.data.items():
 			bin_name = get_or_make_bin(self.item_code, warehouse)
+			apply_pending_bin_updates(bin_name)
 
 			updated_values = {"actual_qty": data.qty_after_transaction, "stock_value": data.stock_value}
 			if data.valuation_rate is not None:
@@ -1541,6 +2100,22 @@ class update_entries_after:
 			frappe.db.set_value("Bin", bin_name, updated_values, update_modified=True)
 
 
+def get_valuation_state(row) -> frappe._dict:
+	"""Valuation state of an item/warehouse as stored in a Stock Ledger Entry or checkpoint."""
+	stock_queue = row.stock_queue
+	if isinstance(stock_queue, str):
+		stock_queue = json.loads(stock_queue or "[]")
+
+	return frappe._dict(
+		{
+			"qty_after_transaction": flt(row.qty_after_transaction),
+			"valuation_rate": flt(row.valuation_rate),
+			"stock_value": flt(row.stock_value),
+			"stock_queue": stock_queue or [],
+		}
+	)
+
+
 def get_previous_sle_of_current_voucher(args, operator="<", exclude_current_voucher=False):
 	"""get stock ledger entries filtered by specific posting datetime conditions"""
 
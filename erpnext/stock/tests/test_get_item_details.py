@@ -1,7 +1,7 @@
 import frappe
 from frappe.tests import IntegrationTestCase
 
-from erpnext.stock.get_item_details import get_item_details
+from erpnext.stock.get_item_details import get_bulk_item_details, get_item_details
 
 EXTRA_TEST_RECORD_DEPENDENCIES = ["Customer", "Supplier", "Item", "Price List", "Item Price"]
 
@@ -28,3 +28,38 @@ class TestGetItemDetail(IntegrationTestCase):
 		)
 		details = get_item_details(args)
 		self.assertEqual(details.get("price_list_rate"), 100)
+
+	def test_bulk_item_details(self):
+		ctx = {
+			"company": "_Test Company",
+			"conversion_rate": 1.0,
+			"price_list_currency": "INR",
+			"plc_conversion_rate": 1.0,
+			"doctype": "Sales Order",
+			"name": None,
+			"customer": "_Test Customer",
+			"transaction_date": None,
+			"price_list": "_Test Price List",
+			"warehouse": "_Test Warehouse - _TC",
+			"ignore_pricing_rule": 0,
+		}
+		items = [
+			{**ctx, "item_code": "_Test Item", "qty": 1},
+			{**ctx, "item_code": "_Test Item 2", "qty": 2},
+			{**ctx, "item_code": "_Test Item", "qty": 5, "uom": "_Test UOM"},
+		]
+
+		expected = [get_item_details(frappe._dict(row)) for row in items]
+		details = get_bulk_item_details(items)
+
+		self.assertEqual(len(details), len(items))
+		for expected_row, row in zip(expected, details, strict=True):
+			for field in (
+				"item_code",
+				"price_list_rate",
+				"rate",
+				"actual_qty",
+				"projected_qty",
+				"income_account",
+			):
+				self.assertEqual(expected_row.get(field), row.get(field))
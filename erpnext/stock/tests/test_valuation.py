@@ -1,5 +1,5 @@
 import json
-import unittest
+import random
 
 import frappe
 from frappe.tests import IntegrationTestCase
@@ -8,7 +8,13 @@ from hypothesis import strategies as st
 
 from erpnext.stock.doctype.item.test_item import make_item
 from erpnext.stock.doctype.stock_entry.stock_entry_utils import make_stock_entry
-from erpnext.stock.valuation import FIFOValuation, LIFOValuation, round_off_if_near_zero
+from erpnext.stock.valuation import (
+	ArrayFIFOValuation,
+	ArrayLIFOValuation,
+	FIFOValuation,
+	LIFOValuation,
+	round_off_if_near_zero,
+)
 
 qty_gen = st.floats(min_value=-1e6, max_value=1e6)
 value_gen = st.floats(min_value=1, max_value=1e6)
@@ -317,6 +323,53 @@ class TestLIFOValuation(IntegrationTestCase):
 			self.assertTotalValue(total_value)
 
 
+class TestArrayValuation(IntegrationTestCase):
+	def assertSameAsListQueue(self, list_queue, array_queue, transactions, outgoing_rate=0.0):
+		for qty, rate in transactions:
+			if round_off_if_near_zero(qty) == 0:
+				continue
+			if qty > 0:
+				list_queue.add_stock(qty, rate)
+				array_queue.add_stock(qty, rate)
+			else:
+				self.assertEqual(
+					list_queue.remove_stock(abs(qty), outgoing_rate),
+					array_queue.remove_stock(abs(qty), outgoing_rate),
+				)
+
+			self.assertEqual(list_queue.state, array_queue.state)
+			self.assertEqual(list_queue.get_total_stock_and_value(), array_queue.get_total_stock_and_value())
+
+	@given(stock_queue_generator, st.sampled_from([0.0, 1.0, 10.0]))
+	def test_array_fifo_matches_fifo(self, stock_queue, outgoing_rate):
+		self.assertSameAsListQueue(FIFOValuation([]), ArrayFIFOValuation([]), stock_queue, outgoing_rate)
+
+	@given(stock_queue_generator)
+	def test_array_lifo_matches_lifo(self, stock_queue):
+		self.assertSameAsListQueue(LIFOValuation([]), ArrayLIFOValuation([]), stock_queue)
+
+	def test_long_random_sequences(self):
+		# rounding of the totals must match the list queues over many entries, as stock value is derived from them
+		rng = random.Random(42)
+		transactions = [
+			(rng.choice([1, -1]) * rng.uniform(0.001, 50), rng.choice([rng.uniform(0.01, 1000), 9.99]))
+			for _ in range(5000)
+		]
+
+		self.assertSameAsListQueue(FIFOValuation([]), ArrayFIFOValuation([]), transactions, 9.99)
+		self.assertSameAsListQueue(LIFOValuation([]), ArrayLIFOValuation([]), transactions)
+
+	def test_consumption_of_many_small_bins(self):
+		queue = ArrayFIFOValuation([])
+		for rate in range(1, 1001):
+			queue.add_stock(1, rate)
+
+		consumed = queue.remove_stock(990)
+		self.assertEqual(len(consumed), 990)
+		self.assertEqual(queue.state, [[1, rate] for rate in range(991, 1001)])
+		self.assertEqual(queue.get_total_stock_and_value(), (10, sum(range(991, 1001))))
+
+
 class TestLIFOValuationSLE(IntegrationTestCase):
 	ITEM_CODE = "_Test LIFO item"
 	WAREHOUSE = "_Test Warehouse - _TC"
@@ -15,7 +15,7 @@ from erpnext.stock.doctype.serial_and_batch_bundle.serial_and_batch_bundle impor
 )
 from erpnext.stock.doctype.warehouse.warehouse import get_child_warehouses
 from erpnext.stock.serial_batch_bundle import BatchNoValuation, SerialNoValuation
-from erpnext.stock.valuation import FIFOValuation, LIFOValuation
+from erpnext.stock.valuation import ArrayFIFOValuation, ArrayLIFOValuation
 
 BarcodeScanResult = dict[str, str | None]
 
@@ -383,7 +383,7 @@ def get_lifo_rate(previous_stock_queue, qty):
 
 
 def _get_fifo_lifo_rate(previous_stock_queue, qty, method):
-	ValuationKlass = LIFOValuation if method == "LIFO" else FIFOValuation
+	ValuationKlass = ArrayLIFOValuation if method == "LIFO" else ArrayFIFOValuation
 
 	stock_queue = ValuationKlass(previous_stock_queue)
 	if flt(qty) >= 0:
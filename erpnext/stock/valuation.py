@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod, abstractproperty
+from array import array
 from collections.abc import Callable
 from typing import NewType
 
@@ -245,6 +246,183 @@ class LIFOValuation(BinWiseValuation):
 		return consumed_bins
 
 
+class ArrayBinWiseValuation(BinWiseValuation):
+	"""Bin-wise valuation where bins are kept in parallel qty and rate arrays.
+
+	Bins before `head` are already consumed. They are dropped lazily, so consuming
+	from the front of the queue doesn't shift the remaining bins on every removal.
+	Total qty and value are summed from the bins as the list queues do, once per change to the bins.
+	"""
+
+	__slots__ = ["head", "qtys", "rates", "totals"]
+
+	def __init__(self, state: list[StockBin] | None = None):
+		state = state or []
+		self.qtys = array("d", [flt(stock_bin[QTY]) for stock_bin in state])
+		self.rates = array("d", [flt(stock_bin[RATE]) for stock_bin in state])
+		self.head = 0
+		self.totals = None
+
+	@property
+	def state(self) -> list[StockBin]:
+		"""Get current bins as a list of [qty, rate]."""
+		return [
+			[qty, rate] for qty, rate in zip(self.qtys[self.head :], self.rates[self.head :], strict=True)
+		]
+
+	def __len__(self):
+		return len(self.qtys) - self.head
+
+	def get_total_stock_and_value(self) -> tuple[float, float]:
+		if self.totals is None:
+			total_qty = 0.0
+			total_value = 0.0
+
+			for index in range(self.head, len(self.qtys)):
+				total_qty += self.qtys[index]
+				total_value += self.qtys[index] * self.rates[index]
+
+			self.totals = (round_off_if_near_zero(total_qty), round_off_if_near_zero(total_value))
+
+		return self.totals
+
+	def add_stock(self, qty: float, rate: float) -> None:
+		"""Update queue with new stock.
+
+		args:
+		        qty: new quantity to add
+		        rate: incoming rate of new quantity"""
+
+		if not len(self):
+			self._append(0, 0)
+
+		# last row has the same rate, merge new bin.
+		if self.rates[-1] == rate:
+			self._set(-1, self.qtys[-1] + qty, rate)
+		else:
+			# Item has a positive balance qty, add new entry
+			if self.qtys[-1] > 0:
+				self._append(qty, rate)
+			else:  # negative balance qty
+				qty = self.qtys[-1] + qty
+				if qty > 0:  # new balance qty is positive
+					self._set(-1, qty, rate)
+				else:  # new balance qty is still negative, maintain same rate
+					self._set(-1, qty, self.rates[-1])
+
+	@abstractmethod
+	def get_bin_to_consume(self, outgoing_rate: float) -> int:
+		"""Index of the bin that is consumed next."""
+		pass
+
+	def remove_stock(
+		self, qty: float, outgoing_rate: float = 0.0, rate_generator: Callable[[], float] | None = None
+	) -> list[StockBin]:
+		"""Remove stock from the queue and return popped bins.
+
+		args:
+		        qty: quantity to remove
+		        rate: outgoing rate
+		        rate_generator: function to be called if queue is not found and rate is required.
+		"""
+		if not rate_generator:
+			rate_generator = lambda: 0.0  # noqa
+
+		consumed_bins = []
+		while qty:
+			if not len(self):
+				# rely on rate generator.
+				self._append(0, rate_generator())
+
+			index = self.get_bin_to_consume(outgoing_rate)
+			bin_qty, bin_rate = self.qtys[index], self.rates[index]
+
+			if qty >= bin_qty:
+				# consume current bin
+				qty = round_off_if_near_zero(qty - bin_qty)
+				self._remove(index)
+				consumed_bins.append([bin_qty, bin_rate])
+
+				if not len(self) and qty:
+					# stock finished, qty still remains to be withdrawn
+					# negative stock, keep in as a negative bin
+					self._append(-qty, outgoing_rate or bin_rate)
+					consumed_bins.append([qty, outgoing_rate or bin_rate])
+					break
+			else:
+				# qty found in current bin consume it and exit
+				self._set(index, round_off_if_near_zero(bin_qty - qty), bin_rate)
+				consumed_bins.append([qty, bin_rate])
+				qty = 0
+
+		return consumed_bins
+
+	def _append(self, qty: float, rate: float) -> None:
+		self.qtys.append(qty)
+		self.rates.append(rate)
+		self.totals = None
+
+	def _set(self, index: int, qty: float, rate: float) -> None:
+		self.qtys[index] = qty
+		self.rates[index] = rate
+		self.totals = None
+
+	def _remove(self, index: int) -> None:
+		self.totals = None
+
+		if index == self.head:
+			self.head += 1
+		elif index in (-1, len(self.qtys) - 1):
+			self.qtys.pop()
+			self.rates.pop()
+		else:
+			del self.qtys[index]
+			del self.rates[index]
+
+		if not len(self):
+			self.qtys = array("d")
+			self.rates = array("d")
+			self.head = 0
+		elif self.head > 32 and self.head * 2 > len(self.qtys):
+			# drop consumed bins once they make up most of the arrays
+			del self.qtys[: self.head]
+			del self.rates[: self.head]
+			self.head = 0
+
+
+class ArrayFIFOValuation(ArrayBinWiseValuation):
+	"""Array backed FIFOValuation, consumption from the front is O(1) amortized.
+
+	Behaves exactly like FIFOValuation, except that `state` is a copy of the bins.
+	"""
+
+	__slots__ = []
+
+	def get_bin_to_consume(self, outgoing_rate: float) -> int:
+		if outgoing_rate > 0:
+			# Find the entry where rate matched with outgoing rate
+			try:
+				return self.rates.index(outgoing_rate, self.head)
+			except ValueError:
+				pass
+
+		# If no entry found with outgoing rate, consume as per FIFO
+		return self.head
+
+
+class ArrayLIFOValuation(ArrayBinWiseValuation):
+	"""Array backed LIFOValuation.
+
+	Behaves exactly like LIFOValuation, except that `state` is a copy of the bins.
+	"""
+
+	__slots__ = []
+
+	def get_bin_to_consume(self, outgoing_rate: float) -> int:
+		# start at the end.
+		return len(self.qtys) - 1
+
+
 def round_off_if_near_zero(number: float, precision: int = 7) -> float:
 	"""Rounds off the number to zero only if number is close to zero for decimal
 	specified in precision. Precision defaults to 7.
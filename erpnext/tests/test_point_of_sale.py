@@ -5,8 +5,9 @@ import unittest
 import frappe
 from frappe.tests import IntegrationTestCase
 
+from erpnext.accounts.doctype.pos_invoice.test_pos_invoice import create_pos_invoice
 from erpnext.accounts.doctype.pos_profile.test_pos_profile import make_pos_profile
-from erpnext.selling.page.point_of_sale.point_of_sale import get_items
+from erpnext.selling.page.point_of_sale.point_of_sale import get_items, sync_invoices
 from erpnext.stock.doctype.item.test_item import make_item
 from erpnext.stock.doctype.stock_entry.stock_entry_utils import make_stock_entry
 
@@ -53,3 +54,67 @@ class TestPointOfSale(IntegrationTestCase):
 
 		self.assertEqual(len(filtered_items), 1)
 		self.assertEqual(filtered_items[0]["item_code"], item2.item_code)
+
+	def test_item_pages_after_cursor(self):
+		pos_profile = make_pos_profile(name="Test POS Profile for Search")
+		items = [make_item(f"Test POS Catalog Item {i}", {"is_stock_item": 1}) for i in range(3)]
+		make_stock_entry(
+			item_code=items[1].name,
+			qty=5,
+			to_warehouse="_Test Warehouse - _TC",
+			rate=100,
+		)
+
+		pages, after = [], None
+		while True:
+			result = get_items(
+				start=0,
+				page_length=2,
+				price_list=None,
+				item_group=items[0].item_group,
+				pos_profile=pos_profile.name,
+				search_term="Test POS Catalog Item",
+				after=after,
+			)
+			pages.append(result.get("items"))
+			after = result.get("next_cursor")
+			if not after:
+				break
+
+		catalog = {item["item_code"]: item for page in pages for item in page}
+		self.assertEqual(len(pages), 2)
+		self.assertEqual(sorted(catalog), sorted(item.name for item in items))
+		self.assertEqual(catalog[items[1].name]["actual_qty"], 5)
+
+	def test_sync_invoices(self):
+		from erpnext.accounts.doctype.pos_closing_entry.test_pos_closing_entry import (
+			init_user_and_profile,
+		)
+
+		item = make_item("Test POS Sync Item", {"is_stock_item": 1})
+		make_stock_entry(item_code=item.name, qty=10, to_warehouse="_Test Warehouse - _TC", rate=100)
+		init_user_and_profile()
+		self.addCleanup(frappe.set_user, "Administrator")
+
+		invoices = []
+		for client_id, qty in (("test-pos-sync-1", 1), ("test-pos-sync-2", 20)):
+			pos_inv = create_pos_invoice(item_code=item.name, qty=qty, rate=100, do_not_save=1)
+			pos_inv.append(
+				"payments", {"mode_of_payment": "Cash", "account": "Cash - _TC", "amount": qty * 100}
+			)
+			pos_inv.pos_client_id = client_id
+			invoices.append(pos_inv.as_dict())
+
+		# the second invoice is short of stock
+		frappe.local.message_log = []
+		frappe.msgprint("_Test Message Before Sync")
+		results = sync_invoices(invoices)
+		self.assertEqual([r["status"] for r in results], ["Synced", "Failed"])
+		self.assertIn("_Test Message Before Sync", str(frappe.local.message_log))
+		self.assertEqual(frappe.db.get_value("POS Invoice", results[0]["name"], "docstatus"), 1)
+
+		# syncing again doesn't create the invoice twice
+		results_again = sync_invoices(invoices[:1])
+		self.assertEqual(results_again[0]["name"], results[0]["name"])
+		self.assertEqual(frappe.db.count("POS Invoice", {"pos_client_id": "test-pos-sync-1"}), 1)
+		self.assertFalse(frappe.db.exists("POS Invoice", {"pos_client_id": "test-pos-sync-2"}))